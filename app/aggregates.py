@@ -0,0 +1,93 @@
+"""
+Apeiron CostEstimation Pro – Portfolio Aggregates
+=================================================
+Portfolio-level figures (pipeline value, margin, actuals, average
+variance) overall and by status, app type, complexity, client and month,
+without loading any Project, Estimate or Actual.
+
+The numbers live in `portfolio_aggregates`, one row per (dimension, key),
+kept current by SQLite triggers on projects, estimates and actuals (see
+models.create_aggregate_triggers).  Every write path is covered, including
+the portfolio reprice's bulk executemany statements, and the aggregates
+commit or roll back with the write that moved them.  Reading a figure is
+one lookup on the (dimension, key) index.
+
+rebuild_aggregates() recomputes the table from scratch; it is only needed
+for databases whose rows were written with the triggers absent.
+"""
+
+from collections import namedtuple
+
+from sqlalchemy import delete, select, text
+
+from app.models import PortfolioAggregate, AGGREGATE_DIMENSIONS, AGGREGATE_MEASURES
+
+DIMENSIONS = tuple(d for d in AGGREGATE_DIMENSIONS if d != "all")
+
+PortfolioStats = namedtuple(
+    "PortfolioStats",
+    "key projects estimated pipeline_value gross_cost profit_amount margin_pct "
+    "actuals actual_cost avg_variance_pct",
+)
+
+_COLUMNS = (PortfolioAggregate.key,
+            *(getattr(PortfolioAggregate, m) for m in AGGREGATE_MEASURES))
+
+
+def _stats(row) -> PortfolioStats:
+    r = row._mapping
+    pipeline = r["pipeline_value"]
+    return PortfolioStats(
+        key=r["key"], projects=r["project_count"], estimated=r["estimate_count"],
+        pipeline_value=pipeline, gross_cost=r["gross_cost"], profit_amount=r["profit_amount"],
+        margin_pct=round(r["profit_amount"] * 100 / pipeline, 2) if pipeline else 0.0,
+        actuals=r["actual_count"], actual_cost=r["actual_cost"],
+        avg_variance_pct=(round(r["variance_bp_total"] / r["variance_count"] / 100, 2)
+                          if r["variance_count"] else 0.0),
+    )
+
+
+def _check(dimension: str):
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension {dimension!r}; expected one of {', '.join(DIMENSIONS)}")
+
+
+# ──────────────────────────────────────────────
+# QUERIES
+# ──────────────────────────────────────────────
+def portfolio_totals(session) -> PortfolioStats:
+    """Figures for the whole portfolio (all zero when it is empty)."""
+    row = session.execute(select(*_COLUMNS).where(
+        PortfolioAggregate.dimension == "all", PortfolioAggregate.key == "")).first()
+    return _stats(row) if row else PortfolioStats("", 0, 0, 0.0, 0.0, 0.0, 0.0, 0, 0.0, 0.0)
+
+
+def portfolio_stats(session, dimension: str, key: str):
+    """Figures for one key of a dimension (e.g. "app_type", "AI"); None if it has no projects."""
+    _check(dimension)
+    row = session.execute(select(*_COLUMNS).where(
+        PortfolioAggregate.dimension == dimension, PortfolioAggregate.key == (key or ""),
+        PortfolioAggregate.project_count > 0)).first()
+    return _stats(row) if row else None
+
+
+def portfolio_by(session, dimension: str) -> list:
+    """Figures for every key of a dimension that has projects, by key."""
+    _check(dimension)
+    rows = session.execute(select(*_COLUMNS).where(
+        PortfolioAggregate.dimension == dimension, PortfolioAggregate.project_count > 0)
+        .order_by(PortfolioAggregate.key))
+    return [_stats(r) for r in rows]
+
+
+# ──────────────────────────────────────────────
+# MAINTENANCE
+# ──────────────────────────────────────────────
+def rebuild_aggregates(conn_or_session) -> int:
+    """Recompute every aggregate row from the source tables; returns the row count."""
+    measures = ", ".join(AGGREGATE_MEASURES)
+    conn_or_session.execute(delete(PortfolioAggregate))
+    return conn_or_session.execute(text(
+        f"INSERT INTO portfolio_aggregates (dimension, key, {measures}) "
+        f"SELECT dimension, key, {', '.join(f'sum({m})' for m in AGGREGATE_MEASURES)} "
+        f"FROM portfolio_contributions GROUP BY dimension, key")).rowcount
@@ -0,0 +1,296 @@
+"""
+Apeiron CostEstimation Pro – Cost-Optimal Staffing
+==================================================
+Assigns active employees to modules so Σ hourly_cost × hours is minimal,
+subject to role eligibility and per-employee hour capacity.
+
+Module cost is rate × hours, so every eligible employee prices the same
+module in the same proportion.  Within one role the min-cost flow
+(modules → employees, capacities on the employee arcs) therefore reduces
+to filling the cheapest employees first; what remains hard is packing
+whole modules into capacity.  The solver places modules largest-first
+on the cheapest employee with room, improves the packing with move and
+swap passes, then runs a bounded branch-and-bound from that incumbent,
+which proves optimality on small and medium instances.
+"""
+
+from types import SimpleNamespace
+
+from app.logic import module_cost_paise
+from app.money import to_paise, to_fixed, from_paise, HOURS_SCALE
+
+MAX_IMPROVEMENT_PASSES = 5
+SEARCH_NODE_BUDGET = 50_000
+SEARCH_MAX_MODULES = 200        # deeper searches rarely finish within budget
+
+
+def _copy_module(module, employee):
+    return SimpleNamespace(name=module.name, estimated_hours=module.estimated_hours,
+                           hourly_rate_override=module.hourly_rate_override,
+                           employee=employee, cost=0)
+
+
+def _capacity(capacity_hours, employee):
+    """Capacity in centi-hours; None means unlimited."""
+    if capacity_hours is None:
+        return None
+    if isinstance(capacity_hours, dict):
+        hours = capacity_hours.get(employee.id)
+        return None if hours is None else to_fixed(hours, HOURS_SCALE)
+    return to_fixed(capacity_hours, HOURS_SCALE)
+
+
+# ──────────────────────────────────────────────
+# SOLVER
+# ──────────────────────────────────────────────
+class _Staffing:
+    """Mutable packing state: which employee holds each module and spare capacity."""
+
+    def __init__(self, hours, roles, emp_rates, emp_roles, spare):
+        self.hours = hours                     # centi-hours per module
+        self.roles = roles                     # required role or None per module
+        self.rates = emp_rates                 # paise per hour per employee
+        self.emp_roles = emp_roles
+        self.spare = list(spare)
+        self.owner = [None] * len(hours)
+        self.held = [set() for _ in emp_rates]
+        # eligible employees per role, cheapest first (None = any role)
+        by_rate = sorted(range(len(emp_rates)), key=lambda j: (emp_rates[j], j))
+        self.eligible = {None: by_rate}
+        for role in set(roles) - {None}:
+            self.eligible[role] = [j for j in by_rate if emp_roles[j] == role]
+
+    def fits_role(self, i, j) -> bool:
+        return self.roles[i] is None or self.roles[i] == self.emp_roles[j]
+
+    def place(self, i, j):
+        old = self.owner[i]
+        if old is not None:
+            self.spare[old] += self.hours[i]
+            self.held[old].discard(i)
+        self.owner[i] = j
+        if j is not None:
+            self.spare[j] -= self.hours[i]
+            self.held[j].add(i)
+
+    def cost(self) -> int:
+        return sum(self.rates[j] * h for j, h in zip(self.owner, self.hours) if j is not None)
+
+    def unassigned(self) -> int:
+        return self.owner.count(None)
+
+    # ── construction: cheapest employee with room ──
+    def greedy(self, order):
+        for i in order:
+            for j in self.eligible[self.roles[i]]:
+                if self.spare[j] >= self.hours[i]:
+                    self.place(i, j)
+                    break
+
+    def repair(self, order):
+        """Make room for unplaced modules by relocating one module elsewhere."""
+        for i in order:
+            if self.owner[i] is not None:
+                continue
+            for j in self.eligible[self.roles[i]]:
+                for b in sorted(self.held[j], key=lambda b: self.hours[b]):
+                    if self.spare[j] + self.hours[b] < self.hours[i]:
+                        continue
+                    k = next((k for k in self.eligible[self.roles[b]]
+                              if k != j and self.spare[k] >= self.hours[b]), None)
+                    if k is not None:
+                        self.place(b, k)
+                        self.place(i, j)
+                        break
+                if self.owner[i] is not None:
+                    break
+
+    # ── improvement ──
+    def move_pass(self, order) -> bool:
+        improved = False
+        for i in order:
+            current = self.owner[i]
+            for j in self.eligible[self.roles[i]]:
+                if current is not None and self.rates[j] >= self.rates[current]:
+                    break
+                if j != current and self.spare[j] >= self.hours[i]:
+                    self.place(i, j)
+                    improved = True
+                    break
+        return improved
+
+    def swap_pass(self, order) -> bool:
+        """
+        Trade a module on a dear employee for one or two smaller modules on
+        a cheaper one: the cheap employee's hours go up, so cost goes down.
+        """
+        improved = False
+        for a in order:
+            ea = self.owner[a]
+            if ea is None:
+                continue
+            ha = self.hours[a]
+            for eb in self.eligible[self.roles[a]]:
+                if self.rates[eb] >= self.rates[ea]:
+                    break
+                room = self.spare[eb]
+                swappable = [b for b in self.held[eb]
+                             if self.hours[b] < ha and self.fits_role(b, ea)]
+                groups = [(b,) for b in swappable]
+                groups += [(b, c) for x, b in enumerate(swappable) for c in swappable[x + 1:]
+                           if self.hours[b] + self.hours[c] < ha]
+                best = None
+                for g in groups:
+                    moved = sum(self.hours[b] for b in g)
+                    if moved < ha and room + moved >= ha and self.spare[ea] + ha >= moved:
+                        if best is None or moved < best[0]:
+                            best = (moved, g)
+                if best is not None:
+                    self.place(a, None)
+                    for b in best[1]:
+                        self.place(b, ea)
+                    self.place(a, eb)
+                    improved = True
+                    break
+        return improved
+
+    def solve(self, order):
+        self.greedy(order)
+        self.repair(order)
+        for _ in range(MAX_IMPROVEMENT_PASSES):
+            if not (self.move_pass(order) | self.swap_pass(order)):
+                break
+        return self
+
+
+def _branch_and_bound(state: _Staffing, order, budget: int):
+    """
+    Depth-first search over assignments (largest module first) pruned by
+    cost-so-far + Σ remaining hours × cheapest eligible rate.  Starts from
+    the heuristic packing as incumbent.  Returns (owner list or None,
+    proved_optimal).
+    """
+    hours, roles, rates, eligible = state.hours, state.roles, state.rates, state.eligible
+    cheapest = [rates[eligible[r][0]] * h if eligible[r] else 0 for r, h in zip(roles, hours)]
+    tail = [0] * (len(order) + 1)
+    for pos in range(len(order) - 1, -1, -1):
+        tail[pos] = tail[pos + 1] + cheapest[order[pos]]
+    best_cost = state.cost()
+    best = None
+    spare = list(state.spare)
+    for i, j in enumerate(state.owner):
+        if j is not None:
+            spare[j] += hours[i]
+    owner = [None] * len(hours)
+    nodes = 0
+
+    def visit(pos, cost):
+        nonlocal best_cost, best, nodes
+        if pos == len(order):
+            if cost < best_cost:
+                best_cost, best = cost, list(owner)
+            return True
+        nodes += 1
+        if nodes > budget:
+            return False
+        i = order[pos]
+        for j in eligible[roles[i]]:
+            step = cost + rates[j] * hours[i]
+            if step + tail[pos + 1] >= best_cost:
+                break                   # employees are cheapest-first
+            if spare[j] < hours[i]:
+                continue
+            spare[j] -= hours[i]
+            owner[i] = j
+            finished = visit(pos + 1, step)
+            spare[j] += hours[i]
+            owner[i] = None
+            if not finished:
+                return False
+        return True
+
+    complete = visit(0, 0)
+    return best, complete
+
+
+def assign_employees(
+    modules: list,
+    employees: list,
+    roles: list = None,
+    capacity_hours=None,
+    region_multiplier: float = 1.0,
+) -> dict:
+    """
+    Cost-optimal employee assignment for a list of modules.
+
+    roles: required role per module (None = any role).  Defaults to the
+           role of each module's current employee.
+    capacity_hours: None (unlimited), one number for everyone, or
+           {employee.id: hours}.
+    Modules with an hourly_rate_override keep their employee and are not
+    re-staffed (their cost does not depend on who does the work).
+
+    Returns {"modules", "unassigned", "reassigned", "labor_cost",
+    "baseline_cost", "savings", "optimal"}; `optimal` is True when the
+    bounded search proved no cheaper packing exists.  `modules` are copies
+    with `.employee` set, ready for calculate_total_labor_cost; costs are
+    raw labor (before complexity and app-type multipliers).  Modules that
+    cannot be staffed within capacity are listed (by index) in `unassigned`
+    and keep their current employee, so they are still priced in
+    `labor_cost`; `reassigned` indexes the modules whose employee changed.
+    """
+    employees = [e for e in employees if e.is_active is not False]
+    if roles is None:
+        roles = [m.employee.role if m.employee else None for m in modules]
+
+    free = [i for i, m in enumerate(modules) if m.hourly_rate_override is None]
+    hours = [to_fixed(modules[i].estimated_hours, HOURS_SCALE) for i in free]
+    free_roles = [roles[i] for i in free]
+    rates = [to_paise(e.hourly_cost or 0.0) for e in employees]
+    spare = [_capacity(capacity_hours, e) for e in employees]
+    spare = [float("inf") if c is None else c for c in spare]
+
+    # Fixed (override) modules still use up their employee's capacity.
+    index_of = {id(e): j for j, e in enumerate(employees)}
+    for m in modules:
+        if m.hourly_rate_override is not None and id(m.employee) in index_of:
+            spare[index_of[id(m.employee)]] -= to_fixed(m.estimated_hours, HOURS_SCALE)
+
+    # Two construction orders – most constrained first, and plain largest
+    # first – each repaired and improved; keep the better packing.
+    emp_roles = [e.role for e in employees]
+    candidates = []
+    for constrained_first in (True, False):
+        state = _Staffing(hours, free_roles, rates, emp_roles, spare)
+        n_eligible = {role: len(emps) for role, emps in state.eligible.items()}
+        order = sorted(range(len(free)), key=lambda i: (
+            n_eligible[free_roles[i]] if constrained_first else 0, -hours[i], i))
+        candidates.append((state.solve(order), order))
+    state, order = min(candidates, key=lambda c: (c[0].unassigned(), c[0].cost()))
+
+    # Small instances: prove (or improve to) optimality within a node budget.
+    optimal = False
+    if state.unassigned() == 0 and len(order) <= SEARCH_MAX_MODULES:
+        exact, optimal = _branch_and_bound(state, order, SEARCH_NODE_BUDGET)
+        if exact is not None:
+            for i, j in enumerate(exact):
+                state.place(i, j)
+
+    # Modules that could not be staffed keep their current employee (and cost).
+    assigned = {idx: state.owner[k] for k, idx in enumerate(free)}
+    result_modules = [
+        _copy_module(m, employees[assigned[i]] if assigned.get(i) is not None else m.employee)
+        for i, m in enumerate(modules)
+    ]
+    labor = sum(module_cost_paise(m, region_multiplier) for m in result_modules)
+    baseline = sum(module_cost_paise(m, region_multiplier) for m in modules)
+    return {
+        "modules": result_modules,
+        "unassigned": [idx for idx, j in assigned.items() if j is None],
+        "reassigned": [i for i, (m, new) in enumerate(zip(modules, result_modules))
+                       if new.employee is not m.employee],
+        "labor_cost": from_paise(labor),
+        "baseline_cost": from_paise(baseline),
+        "savings": from_paise(baseline - labor),
+        "optimal": optimal,
+    }
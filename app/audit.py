@@ -0,0 +1,295 @@
+"""
+Apeiron CostEstimation Pro – Audit Trail
+========================================
+Batched audit logging, in two flavours:
+
+record(session, …)
+    Queue an entry on the session.  All entries queued in a transaction
+    are written with one multi-row INSERT just before that transaction
+    commits, so they are durable exactly when the audited change is, and
+    are discarded if it rolls back.  Auditing N rows costs no extra
+    commits.
+
+AuditWriter
+    A background thread with a bounded queue for entries that do not
+    belong to a caller's transaction (bulk jobs, services).  It commits a
+    batch every `batch_size` entries or `flush_interval` seconds; producers
+    block while the queue is full.  flush() returns once everything queued
+    before it is committed; close() drains and stops the thread.
+
+Archival keeps `audit_log` to a hot window (AUDIT_HOT_DAYS).  Older rows
+move to one gzip-compressed JSON Lines file per calendar month in the
+archive directory (audit-YYYY-MM.jsonl.gz), and query_audit() reads the hot
+table through its indexes and only the monthly archives that overlap the
+requested time range.
+"""
+
+import glob
+import gzip
+import json
+import os
+import queue
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session
+
+from app import database
+from app.models import AuditLog
+
+AuditEntry = namedtuple(
+    "AuditEntry", "table_name record_id action field_name old_value new_value timestamp")
+AuditRecord = namedtuple(
+    "AuditRecord", "id table_name record_id action field_name old_value new_value timestamp")
+
+AUDIT_HOT_DAYS = 365
+ARCHIVE_BATCH = 5_000             # rows read per SELECT while archiving
+
+_PENDING = "audit_pending"        # session.info key
+
+
+def make_entry(table_name: str, record_id: int, action: str, field_name: str = "",
+               old_value="", new_value="") -> AuditEntry:
+    """An entry stamped now (not when the batch is written)."""
+    return AuditEntry(table_name, record_id, action, field_name,
+                      str(old_value), str(new_value), datetime.utcnow())
+
+
+def write_entries(conn_or_session, entries) -> int:
+    """One multi-row INSERT for `entries`; returns the number written."""
+    entries = list(entries)
+    if entries:
+        conn_or_session.execute(insert(AuditLog), [e._asdict() for e in entries])
+    return len(entries)
+
+
+# ──────────────────────────────────────────────
+# IN-TRANSACTION
+# ──────────────────────────────────────────────
+def record(session, table_name: str, record_id: int, action: str, field_name: str = "",
+           old_value="", new_value=""):
+    """Queue an entry; written in `session`'s transaction at its next commit."""
+    if not session.in_transaction():
+        session.begin()               # so a rollback before any SQL still discards it
+    session.info.setdefault(_PENDING, []).append(
+        make_entry(table_name, record_id, action, field_name, old_value, new_value))
+
+
+def pending(session) -> list:
+    return list(session.info.get(_PENDING, ()))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending(session):
+    entries = session.info.pop(_PENDING, None)
+    if entries:
+        write_entries(session, entries)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    if previous_transaction.parent is None:       # outermost transaction only
+        session.info.pop(_PENDING, None)
+
+
+# ──────────────────────────────────────────────
+# BACKGROUND WRITER
+# ──────────────────────────────────────────────
+class AuditWriter:
+    """Write-behind audit logger for one database URL (default: the app's)."""
+
+    _STOP = object()
+
+    def __init__(self, url=None, max_queue: int = 10_000, batch_size: int = 500,
+                 flush_interval: float = 0.5):
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.error = None                 # last write failure (batch is dropped)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, table_name: str, record_id: int, action: str, field_name: str = "",
+               old_value="", new_value=""):
+        """Queue an entry; blocks while the queue is full."""
+        if not self._thread.is_alive():
+            raise RuntimeError("AuditWriter is closed")
+        self._queue.put(make_entry(table_name, record_id, action, field_name, old_value, new_value))
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every entry queued so far is committed; False on timeout."""
+        if not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = None):
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _commit(self, batch):
+        try:
+            with database.session_scope(self.url) as session:
+                self.written += write_entries(session, batch)
+        except Exception as exc:          # keep the thread alive for later batches
+            self.error = exc
+
+    def _run(self):
+        batch, waiters = [], []
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval if batch else None)
+            except queue.Empty:
+                item = None
+            if isinstance(item, AuditEntry):
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            if batch:
+                self._commit(batch)
+                batch = []
+            for w in waiters:
+                w.set()
+            waiters = []
+            if item is self._STOP:
+                return
+
+
+# ──────────────────────────────────────────────
+# ARCHIVAL
+# ──────────────────────────────────────────────
+_ARCHIVE_NAME = re.compile(r"audit-(\d{4})-(\d{2})\.jsonl\.gz$")
+
+
+def archive_dir() -> str:
+    return os.path.join(database.DB_DIR, "audit_archive")
+
+
+def _period(ts: datetime) -> str:
+    return f"{ts.year:04d}-{ts.month:02d}"
+
+
+def _period_bounds(period: str) -> tuple:
+    year, month = map(int, period.split("-"))
+    start = datetime(year, month, 1)
+    return start, datetime(year + month // 12, month % 12 + 1, 1)
+
+
+def _archive_path(directory: str, period: str) -> str:
+    return os.path.join(directory, f"audit-{period}.jsonl.gz")
+
+
+def _read_archive(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            row = json.loads(line)
+            row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+            yield AuditRecord(**row)
+
+
+def _write_archive(path: str, rows):
+    """Atomically replace `path` with `rows` (sorted by timestamp, id)."""
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+        for r in sorted(rows, key=lambda r: (r.timestamp, r.id)):
+            fh.write(json.dumps({**r._asdict(), "timestamp": r.timestamp.isoformat()}) + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def archive_periods(directory: str = None) -> list:
+    """The archived months ("YYYY-MM"), oldest first."""
+    directory = directory or archive_dir()
+    names = (_ARCHIVE_NAME.search(p) for p in glob.glob(os.path.join(directory, "audit-*.jsonl.gz")))
+    return sorted(f"{m.group(1)}-{m.group(2)}" for m in names if m)
+
+
+def archive_audit_log(session, hot_days: int = AUDIT_HOT_DAYS, now: datetime = None,
+                      directory: str = None) -> dict:
+    """
+    Move audit rows older than `hot_days` into the monthly archives, then
+    delete them from audit_log.  Each month's file is rewritten merged by
+    id before any row is deleted, so an interrupted run is simply repeated.
+    Returns {"archived": rows moved, "periods": months written}.
+    """
+    directory = directory or archive_dir()
+    cutoff = (now or datetime.utcnow()) - timedelta(days=hot_days)
+    by_period, last_id = {}, 0
+    while True:
+        rows = session.execute(
+            select(*(getattr(AuditLog, f) for f in AuditRecord._fields))
+            .where(AuditLog.timestamp < cutoff, AuditLog.id > last_id)
+            .order_by(AuditLog.id).limit(ARCHIVE_BATCH)).all()
+        if not rows:
+            break
+        for row in rows:
+            by_period.setdefault(_period(row.timestamp), []).append(AuditRecord(*row))
+        last_id = rows[-1].id
+    if not by_period:
+        return {"archived": 0, "periods": []}
+
+    os.makedirs(directory, exist_ok=True)
+    for period, rows in by_period.items():
+        path = _archive_path(directory, period)
+        merged = {r.id: r for r in _read_archive(path)} if os.path.exists(path) else {}
+        merged.update((r.id, r) for r in rows)
+        _write_archive(path, merged.values())
+    session.execute(delete(AuditLog).where(AuditLog.timestamp < cutoff, AuditLog.id <= last_id))
+    session.commit()
+    return {"archived": sum(map(len, by_period.values())), "periods": sorted(by_period)}
+
+
+# ──────────────────────────────────────────────
+# QUERIES
+# ──────────────────────────────────────────────
+def query_audit(session, table_name: str = None, record_id: int = None, action: str = None,
+                since: datetime = None, until: datetime = None, limit: int = None,
+                directory: str = None) -> list:
+    """
+    Audit records matching every given filter, oldest first, from the hot
+    table and the archives.  `since` is inclusive, `until` exclusive.
+    """
+    q = select(*(getattr(AuditLog, f) for f in AuditRecord._fields))
+    filters = {"table_name": table_name, "record_id": record_id, "action": action}
+    for name, value in filters.items():
+        if value is not None:
+            q = q.where(getattr(AuditLog, name) == value)
+    if since is not None:
+        q = q.where(AuditLog.timestamp >= since)
+    if until is not None:
+        q = q.where(AuditLog.timestamp < until)
+    q = q.order_by(AuditLog.timestamp, AuditLog.id)
+    hot = [AuditRecord(*row) for row in session.execute(q if limit is None else q.limit(limit))]
+
+    archived = []
+    directory = directory or archive_dir()
+    wanted = {name: value for name, value in filters.items() if value is not None}
+    for period in archive_periods(directory):
+        start, end = _period_bounds(period)
+        if (since is not None and end <= since) or (until is not None and start >= until):
+            continue
+        for r in _read_archive(_archive_path(directory, period)):
+            if ((since is None or r.timestamp >= since) and (until is None or r.timestamp < until)
+                    and all(getattr(r, k) == v for k, v in wanted.items())):
+                archived.append(r)
+        if limit is not None and len(archived) >= limit:
+            break                                  # archives are older than the hot window
+
+    records = sorted(archived + hot, key=lambda r: (r.timestamp, r.id))
+    return records[:limit] if limit is not None else records
@@ -0,0 +1,254 @@
+"""
+Apeiron CostEstimation Pro – Vectorized Batch Estimation Engine
+===============================================================
+Prices N what-if scenarios in one call with NumPy.  Every step mirrors
+`app.logic.run_full_estimation` on int64 paise with the same fixed-point
+factors and half-up rounding (app.money), so batch figures match the
+scalar engine to the paisa.
+"""
+
+import numpy as np
+
+from app.config_registry import get_config
+from app.logic import DEFAULT_STAGES, module_hourly_rate
+from app.results import BatchEstimationResult
+from app.money import (
+    to_paise, to_fixed_array, to_paise_array, from_paise_array, mul_div_array, pct_of_array,
+    FACTOR_SCALE, HOURS_SCALE, HOURS_PER_MONTH, BP_PER_UNIT,
+)
+
+STAGE_NAMES = tuple(DEFAULT_STAGES)
+
+
+# ──────────────────────────────────────────────
+# SHAPE HELPERS
+# ──────────────────────────────────────────────
+def _per_scenario(value, n: int):
+    """Broadcast a scalar or length-N input to a float64 (N,) array."""
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,))
+
+
+def _ratio_array(numerator, denominator, scale: int):
+    """numerator × scale / denominator (half-up ints) where denominator > 0, else 0."""
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    safe = np.where(denominator > 0, denominator, 1)
+    scaled = numerator * scale
+    out = (2 * scaled + safe) // (2 * safe)
+    return np.where(denominator > 0, out, 0)
+
+
+def modules_to_arrays(modules: list) -> tuple:
+    """
+    Extract (hours, rates) arrays from ProjectModule-like objects using
+    logic.module_hourly_rate (override → employee → 0).
+    """
+    hours = np.array([mod.estimated_hours for mod in modules], dtype=np.float64)
+    rates = np.array([module_hourly_rate(mod) for mod in modules], dtype=np.float64)
+    return hours, rates
+
+
+def item_totals(item_lists) -> np.ndarray:
+    """
+    Σ item.cost for each scenario's infra or stack items, summed per item
+    in paise like calculate_infra_stack_total; pass as infra_total /
+    stack_total.
+    """
+    return from_paise_array([sum(to_paise(item.cost) for item in items) for items in item_lists])
+
+
+def scenario_multipliers(session, complexity, app_type, region) -> dict:
+    """
+    Resolve complexity / app-type / region names (scalars or length-N
+    sequences) through the config snapshot's multiplier cube.  Returns
+    run_batch_estimation keyword arguments.
+    """
+    cube = get_config(session).cube
+    c, a, r = cube.encode(complexity, app_type, region)
+    cx, app, region_mult = cube.components(c, a, r)
+    return {
+        "complexity_multiplier": cx,
+        "app_type_adjustment": app,
+        "region_multiplier": region_mult,
+    }
+
+
+# ──────────────────────────────────────────────
+# PRICING STAGES (GROSS → FINAL)
+# ──────────────────────────────────────────────
+def price_labor_batch(
+    adjusted_labor_total,
+    infra_total=0.0,
+    stack_total=0.0,
+    maintenance_buffer_pct=15.0,
+    risk_contingency_pct=10.0,
+    profit_margin_pct=20.0,
+) -> dict:
+    """
+    Steps 2–5 of the pipeline for an array of adjusted labor totals:
+    infra/stack, gross cost, risk & buffer, profit & final price.
+    """
+    adjusted = to_paise_array(adjusted_labor_total)
+    n = adjusted.shape[0]
+    return _price_paise(
+        adjusted, to_paise_array(_per_scenario(infra_total, n)),
+        to_paise_array(_per_scenario(stack_total, n)),
+        maintenance_buffer_pct, risk_contingency_pct, profit_margin_pct,
+    )
+
+
+def _price_paise(adjusted, infra, stack, maintenance_buffer_pct,
+                 risk_contingency_pct, profit_margin_pct) -> dict:
+    n = adjusted.shape[0]
+
+    # 2. Infra + Stack
+    combined = infra + stack
+
+    # 3. Gross cost
+    gross = adjusted + combined
+
+    # 4. Risk & buffer
+    maint_buf = pct_of_array(gross, _per_scenario(maintenance_buffer_pct, n))
+    risk_cont = pct_of_array(gross, _per_scenario(risk_contingency_pct, n))
+    safe = gross + maint_buf + risk_cont
+
+    # 5. Profit & final
+    margin_pct = _per_scenario(profit_margin_pct, n)
+    profit = pct_of_array(safe, margin_pct)
+    final = safe + profit
+
+    gross_rs, safe_rs = from_paise_array(gross), from_paise_array(safe)
+    return {
+        "infra_stack": {
+            "infra_total": from_paise_array(infra),
+            "stack_total": from_paise_array(stack),
+            "combined_total": from_paise_array(combined),
+        },
+        "gross_cost": gross_rs,
+        "risk_buffer": {
+            "gross_cost": gross_rs,
+            "maintenance_buffer": from_paise_array(maint_buf),
+            "risk_contingency": from_paise_array(risk_cont),
+            "safe_cost": safe_rs,
+        },
+        "final_pricing": {
+            "safe_cost": safe_rs,
+            "profit_amount": from_paise_array(profit),
+            "profit_margin_pct": margin_pct,
+            "final_price": from_paise_array(final),
+        },
+    }
+
+
+# ──────────────────────────────────────────────
+# BATCH ESTIMATION
+# ──────────────────────────────────────────────
+def run_batch_estimation(
+    hours,
+    rates,
+    complexity_multiplier=1.0,
+    app_type_adjustment=1.0,
+    region_multiplier=1.0,
+    infra_total=0.0,
+    stack_total=0.0,
+    maintenance_buffer_pct=15.0,
+    risk_contingency_pct=10.0,
+    profit_margin_pct=20.0,
+    stage_pcts: dict = None,
+    function_points=0,
+    estimated_duration_months=0.0,
+    maintenance_years: int = 5,
+    maintenance_annual_pct=15.0,
+) -> BatchEstimationResult:
+    """
+    Run the estimation pipeline for N scenarios at once.
+
+    `hours` and `rates` are (N, K) module matrices (a 1-D (K,) row is shared
+    by every scenario; pad ragged scenarios with zero-hour modules).  Every
+    other argument is a scalar or a length-N array.  `infra_total` and
+    `stack_total` are the Σ item.cost per scenario, summed per item in paise
+    (see item_totals) so they match the scalar engine.
+
+    Returns a columnar BatchEstimationResult: the run_full_estimation
+    layout with (N,) arrays in place of scalars, module costs (N, K) and
+    cumulative maintenance (N, years); result[i] is scenario i.
+    """
+    hours = np.atleast_2d(np.asarray(hours, dtype=np.float64))
+    rates = np.asarray(rates, dtype=np.float64)
+    n = np.broadcast_shapes(
+        hours.shape[:1], np.shape(complexity_multiplier), np.shape(app_type_adjustment),
+        np.shape(region_multiplier), np.shape(infra_total), np.shape(stack_total),
+        np.shape(maintenance_buffer_pct), np.shape(risk_contingency_pct),
+        np.shape(profit_margin_pct), np.shape(function_points),
+        np.shape(estimated_duration_months), np.shape(maintenance_annual_pct),
+    )[0]
+    hours = np.broadcast_to(hours, (n, hours.shape[1]))
+    rates = np.broadcast_to(rates, hours.shape)
+
+    cx_mult = _per_scenario(complexity_multiplier, n)
+    app_adj = _per_scenario(app_type_adjustment, n)
+    region_u = to_fixed_array(_per_scenario(region_multiplier, n), FACTOR_SCALE)
+
+    # 1. Labor
+    module_costs = mul_div_array(
+        to_paise_array(rates) * to_fixed_array(hours, HOURS_SCALE),
+        region_u[:, None], HOURS_SCALE * FACTOR_SCALE,
+    )
+    raw_total = module_costs.sum(axis=1)
+    adjusted = mul_div_array(
+        raw_total,
+        to_fixed_array(cx_mult, FACTOR_SCALE) * to_fixed_array(app_adj, FACTOR_SCALE),
+        FACTOR_SCALE * FACTOR_SCALE,
+    )
+
+    # 2–5. Infra + Stack → gross → risk & buffer → profit & final
+    pricing = _price_paise(
+        adjusted, to_paise_array(_per_scenario(infra_total, n)),
+        to_paise_array(_per_scenario(stack_total, n)),
+        maintenance_buffer_pct, risk_contingency_pct, profit_margin_pct,
+    )
+    final = to_paise_array(pricing["final_pricing"]["final_price"])
+    safe = to_paise_array(pricing["risk_buffer"]["safe_cost"])
+
+    # 6. Stage distribution
+    sp = stage_pcts or DEFAULT_STAGES
+    stages = {
+        name: pct_of_array(adjusted, _per_scenario(sp.get(name, DEFAULT_STAGES[name]), n))
+        for name in STAGE_NAMES
+    }
+
+    # 7. Maintenance
+    annual = pct_of_array(stages["Development"], _per_scenario(maintenance_annual_pct, n))
+
+    # 8. Analytics
+    total_hours = hours.sum(axis=1)
+    fp = np.floor(_per_scenario(function_points, n)).astype(np.int64)
+    duration_u = to_fixed_array(_per_scenario(estimated_duration_months, n), FACTOR_SCALE)
+
+    return BatchEstimationResult(
+        {
+            "labor": {
+                "raw_labor_total": from_paise_array(raw_total),
+                "complexity_multiplier": cx_mult,
+                "app_type_adjustment": app_adj,
+                "adjusted_labor_total": from_paise_array(adjusted),
+            },
+            "infra_stack": pricing["infra_stack"],
+            "risk_buffer": pricing["risk_buffer"],
+            "final_pricing": pricing["final_pricing"],
+            "stage_distribution": {name: from_paise_array(v) for name, v in stages.items()},
+            "analytics": {
+                "total_hours": total_hours,
+                "person_months": _ratio_array(
+                    to_fixed_array(total_hours, HOURS_SCALE), HOURS_PER_MONTH, 1) / HOURS_SCALE,
+                "cost_per_function_point": from_paise_array(_ratio_array(final, fp, 1)),
+                "burn_rate_monthly": from_paise_array(_ratio_array(final, duration_u, FACTOR_SCALE)),
+                "revenue_margin_pct": _ratio_array(final - safe, final, BP_PER_UNIT) / 100,
+            },
+        },
+        gross_cost=pricing["gross_cost"],
+        module_costs=from_paise_array(module_costs),
+        module_hours=hours,
+        maintenance_annual=from_paise_array(annual),
+        maintenance_years=maintenance_years,
+    )
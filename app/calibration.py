@@ -0,0 +1,217 @@
+"""
+Apeiron CostEstimation Pro – Multiplier Calibration from Actuals
+================================================================
+Fits complexity and app-type multipliers to every project that has both
+an Estimate and an Actual.
+
+For each such project the actual cost is mapped back to the labor it
+implies, using the estimate's own markup and infra/stack spend:
+
+    implied_gross = actual × gross_cost / final_price
+    implied_labor = implied_gross − (infra + stack)
+    y             = ln(implied_labor / Σ module cost)
+
+Module costs are rate × hours × region, before any multiplier, so y is
+the combined complexity × app-type factor the actual implies and is
+modelled as ln(complexity) + ln(app type) (one-hot least squares).  The
+fit does not depend on the multipliers in force when the estimate was
+priced, or now: calibrating again after applying a fit suggests the same
+values.  A ridge penalty pulls each log-multiplier towards 0, so levels
+backed by few projects stay close to ×1.0; levels with no projects keep
+their current multiplier.
+
+Only the normal equations (a few counts and sums per level) are kept, so
+recording one new actual is O(1) and a refit solves a (C+T)² system.
+"""
+
+import math
+
+import numpy as np
+from sqlalchemy import select, func
+
+from app.config_registry import get_config, invalidate_config
+from app.models import (
+    Project, ProjectModule, Estimate, Actual, ComplexityMultiplier, AppTypeMultiplier,
+)
+
+DEFAULT_RIDGE = 1.0          # pseudo-projects per level at ×1.0
+SUGGESTION_DECIMALS = 4      # multipliers are applied at 1/10,000 resolution
+
+
+def implied_log_ratio(labor, infra, stack, gross, final, actual):
+    """
+    ln(implied labor / labor) per project, where `labor` is the estimate's
+    unmultiplied module labor (NaN where the estimate or the actual cannot
+    be mapped back to labor).  Accepts scalars or arrays.
+    """
+    labor, infra, stack, gross, final, actual = (
+        np.asarray(v, dtype=np.float64) for v in (labor, infra, stack, gross, final, actual))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied = actual * gross / final - (infra + stack)
+        ok = (labor > 0) & (final > 0) & (implied > 0)
+        return np.where(ok, np.log(np.where(ok, implied / labor, 1.0)), np.nan)
+
+
+# ──────────────────────────────────────────────
+# CALIBRATOR
+# ──────────────────────────────────────────────
+class MultiplierCalibrator:
+    """
+    Running normal equations for the log-multiplier model.
+
+    observe()/observe_many() add projects (a project seen again replaces
+    its earlier observation); fit() returns the suggested multipliers.
+    """
+
+    def __init__(self, complexity: dict, app_types: dict, ridge: float = DEFAULT_RIDGE):
+        self.complexity = dict(complexity)           # name → current multiplier
+        self.app_types = dict(app_types)
+        self.ridge = ridge
+        self._c_codes = {name: i for i, name in enumerate(self.complexity)}
+        self._a_codes = {name: i for i, name in enumerate(self.app_types)}
+        nc, na = len(self._c_codes), len(self._a_codes)
+        self._count_c = np.zeros(nc)
+        self._count_a = np.zeros(na)
+        self._count_ca = np.zeros((nc, na))
+        self._sum_c = np.zeros(nc)
+        self._sum_a = np.zeros(na)
+        self._sum_y2 = 0.0
+        self._seen = {}                              # project_id → (c, a, y)
+
+    @classmethod
+    def from_session(cls, session, ridge: float = DEFAULT_RIDGE) -> "MultiplierCalibrator":
+        """Calibrator primed with every estimated project that has an actual."""
+        cfg = get_config(session)
+        cal = cls(cfg.complexity, cfg.app_types, ridge)
+        rows = session.execute(_history_query()).all()
+        if rows:
+            cols = list(zip(*rows))
+            y = implied_log_ratio(*cols[3:])
+            cal.observe_many(cols[0], cols[1], cols[2], y)
+        return cal
+
+    def __len__(self):
+        return len(self._seen)
+
+    # ── updates ──
+    def _add(self, c, a, y, sign):
+        self._count_c[c] += sign
+        self._count_a[a] += sign
+        self._count_ca[c, a] += sign
+        self._sum_c[c] += sign * y
+        self._sum_a[a] += sign * y
+        self._sum_y2 += sign * y * y
+
+    def observe(self, project_id, complexity: str, app_type: str, log_ratio: float) -> bool:
+        """Add (or replace) one project's observation; False if it was not usable."""
+        old = self._seen.pop(project_id, None)
+        if old is not None:
+            self._add(*old, -1)
+        c, a = self._c_codes.get(complexity), self._a_codes.get(app_type)
+        if c is None or a is None or not math.isfinite(log_ratio):
+            return False
+        self._add(c, a, log_ratio, 1)
+        self._seen[project_id] = (c, a, log_ratio)
+        return True
+
+    def observe_many(self, project_ids, complexity, app_types, log_ratios) -> int:
+        """Vectorised observe() for a fresh batch of distinct projects."""
+        ids = list(project_ids)
+        if any(pid in self._seen for pid in ids):
+            return sum(self.observe(*obs) for obs in zip(ids, complexity, app_types, log_ratios))
+        nc, na = len(self._c_codes), len(self._a_codes)
+        c = np.fromiter((self._c_codes.get(n, -1) for n in complexity), dtype=np.intp, count=len(ids))
+        a = np.fromiter((self._a_codes.get(n, -1) for n in app_types), dtype=np.intp, count=len(ids))
+        y = np.asarray(log_ratios, dtype=np.float64)
+        ok = (c >= 0) & (a >= 0) & np.isfinite(y)
+        c, a, y = c[ok], a[ok], y[ok]
+        self._count_c += np.bincount(c, minlength=nc)
+        self._count_a += np.bincount(a, minlength=na)
+        self._count_ca += np.bincount(c * na + a, minlength=nc * na).reshape(nc, na)
+        self._sum_c += np.bincount(c, weights=y, minlength=nc)
+        self._sum_a += np.bincount(a, weights=y, minlength=na)
+        self._sum_y2 += float(y @ y)
+        self._seen.update(zip(np.asarray(ids, dtype=object)[ok].tolist(),
+                              zip(c.tolist(), a.tolist(), y.tolist())))
+        return int(ok.sum())
+
+    def record_actual(self, session, project_id: int) -> bool:
+        """Pull one project's estimate and actual from the database and observe it."""
+        row = session.execute(_history_query().where(Project.id == project_id)).first()
+        if row is None:
+            return False
+        return self.observe(row[0], row[1], row[2], float(implied_log_ratio(*row[3:])))
+
+    # ── fit ──
+    def fit(self) -> dict:
+        """
+        Solve (XᵀX + ridge·I)β = Xᵀy for β = ln(multiplier).
+
+        Returns {"projects", "rmse_before", "rmse_after", "complexity",
+        "app_types"}; each multiplier entry is name → {"current",
+        "suggested", "projects"}.  RMSEs are of the log ratio, with the
+        current and the suggested multipliers.
+        """
+        nc = len(self._c_codes)
+        xtx = np.diag(np.concatenate([self._count_c, self._count_a]))
+        xtx[:nc, nc:] = self._count_ca
+        xtx[nc:, :nc] = self._count_ca.T
+        xty = np.concatenate([self._sum_c, self._sum_a])
+        n = len(self._seen)
+        beta = (np.linalg.solve(xtx + self.ridge * np.eye(len(xty)), xty)
+                if len(xty) else xty)
+        current = np.log([*self.complexity.values(), *self.app_types.values()])
+
+        def rmse(b):
+            return math.sqrt(max(self._sum_y2 - 2 * b @ xty + b @ xtx @ b, 0.0) / n) if n else 0.0
+
+        def levels(current, codes, counts, log_multipliers):
+            return {
+                name: {
+                    "current": current[name],
+                    "suggested": (round(math.exp(log_multipliers[i]), SUGGESTION_DECIMALS)
+                                  if counts[i] else current[name]),
+                    "projects": int(counts[i]),
+                }
+                for name, i in codes.items()
+            }
+
+        return {
+            "projects": n,
+            "rmse_before": rmse(current),
+            "rmse_after": rmse(beta),
+            "complexity": levels(self.complexity, self._c_codes, self._count_c, beta[:nc]),
+            "app_types": levels(self.app_types, self._a_codes, self._count_a, beta[nc:]),
+        }
+
+
+def _history_query():
+    """(project_id, complexity, app_type, labor, infra, stack, gross, final, actual) rows."""
+    labor = (select(ProjectModule.project_id, func.sum(ProjectModule.cost).label("labor"))
+             .group_by(ProjectModule.project_id).subquery())
+    return (
+        select(Project.id, Project.complexity, Project.app_type,
+               func.coalesce(labor.c.labor, 0.0), Estimate.total_infra_cost,
+               Estimate.total_stack_cost, Estimate.gross_cost, Estimate.final_price,
+               Actual.actual_cost)
+        .join(Estimate, Estimate.project_id == Project.id)
+        .join(Actual, Actual.project_id == Project.id)
+        .outerjoin(labor, labor.c.project_id == Project.id)
+    )
+
+
+def apply_calibration(session, fit: dict, min_projects: int = 1) -> int:
+    """
+    Write suggested multipliers for levels backed by at least
+    `min_projects` projects.  Returns the number of rows changed.
+    """
+    changed = 0
+    for model, key in ((ComplexityMultiplier, "complexity"), (AppTypeMultiplier, "app_types")):
+        for row in session.query(model).filter(model.name.in_(list(fit[key]))).all():
+            level = fit[key][row.name]
+            if level["projects"] >= min_projects and level["suggested"] != row.multiplier:
+                row.multiplier = level["suggested"]
+                changed += 1
+    session.commit()
+    invalidate_config()
+    return changed
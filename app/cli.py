@@ -0,0 +1,353 @@
+"""
+Apeiron CostEstimation Pro – Headless Batch Estimator
+=====================================================
+Prices scenario files without the desktop UI:
+
+    python -m app.cli scenarios.json --out quotes.jsonl
+    python -m app.cli scenarios.csv --format csv --workers 8 --db /data/costpro.db
+
+Scenarios are priced with run_full_estimation against the configuration
+(multipliers, regions, employees) of the chosen database, spread over a
+process pool, and streamed out in input order as JSONL (full result per
+line) or CSV (one summary row per scenario).
+
+Input formats
+-------------
+JSON / JSONL – one object per scenario (a JSON file may hold a list or
+{"scenarios": [...]}):
+
+    {"id": "Q-17", "complexity": "Complex", "app_type": "AI",
+     "region": "Asia",                       # or "region_multiplier": 1.5
+     "modules": [{"name": "API", "hours": 80, "employee_id": 3},
+                 {"name": "UI", "hours": 40, "rate": 900}],
+     "infra_total": 12000, "stack_total": 3500,   # or "infra_items": [{"cost": …}]
+     "maintenance_buffer_pct": 15, "risk_contingency_pct": 10,
+     "profit_margin_pct": 20, "function_points": 40,
+     "estimated_duration_months": 5}
+
+CSV – one row per module (columns scenario, module, hours, rate,
+employee_id); consecutive rows with the same scenario id form one
+scenario and its other columns are read from the first row.
+
+Only the database layer and the logic engine are imported; PyQt6,
+matplotlib and reportlab stay unloaded unless --pdf-dir is given.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from types import SimpleNamespace
+
+from app import database
+from app.config_registry import get_config
+from app.logic import run_full_estimation
+from app.models import Employee
+
+CHUNK_SIZE = 64            # scenarios per worker task
+IN_FLIGHT_PER_WORKER = 4   # chunks queued per worker before results are drained
+
+SCENARIO_DEFAULTS = {
+    "complexity": "Medium",
+    "app_type": "Productivity",
+    "maintenance_buffer_pct": 15.0,
+    "risk_contingency_pct": 10.0,
+    "profit_margin_pct": 20.0,
+    "function_points": 0,
+    "estimated_duration_months": 0.0,
+    "maintenance_years": 5,
+    "maintenance_annual_pct": 15.0,
+}
+NUMERIC_FIELDS = {
+    "region_multiplier": float, "infra_total": float, "stack_total": float,
+    "maintenance_buffer_pct": float, "risk_contingency_pct": float, "profit_margin_pct": float,
+    "function_points": int, "estimated_duration_months": float, "maintenance_years": int,
+    "maintenance_annual_pct": float,
+}
+CSV_COLUMNS = (
+    "id", "final_price", "safe_cost", "gross_cost", "adjusted_labor_total", "raw_labor_total",
+    "infra_total", "stack_total", "profit_amount", "total_hours", "person_months",
+    "cost_per_function_point", "burn_rate_monthly", "error",
+)
+
+
+# ──────────────────────────────────────────────
+# SCENARIO READERS
+# ──────────────────────────────────────────────
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _read_json(path: str):
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get("scenarios", [data])
+    yield from data
+
+
+def _read_jsonl(path: str):
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_csv(path: str):
+    module_cols = {"scenario", "module", "hours", "rate", "employee_id"}
+    current, current_id = None, object()
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        for row in csv.DictReader(fh):
+            sid = row.get("scenario", "")
+            if sid != current_id:
+                if current is not None:
+                    yield current
+                current_id = sid
+                current = {k: v for k, v in row.items() if k not in module_cols and not _blank(v)}
+                current["id"] = sid
+                current["modules"] = []
+            module = {"name": row.get("module", ""), "hours": row.get("hours") or 0}
+            if not _blank(row.get("rate")):
+                module["rate"] = row["rate"]
+            if not _blank(row.get("employee_id")):
+                module["employee_id"] = row["employee_id"]
+            current["modules"].append(module)
+    if current is not None:
+        yield current
+
+
+def read_scenarios(path: str):
+    """Yield scenario dicts from a .json, .jsonl/.ndjson or .csv file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return _read_csv(path)
+    if ext in (".jsonl", ".ndjson"):
+        return _read_jsonl(path)
+    return _read_json(path)
+
+
+# ──────────────────────────────────────────────
+# PRICING
+# ──────────────────────────────────────────────
+def employee_rates(session) -> dict:
+    """employee id → hourly cost for every employee."""
+    return {eid: rate for eid, rate in session.query(Employee.id, Employee.hourly_cost)}
+
+
+def _line_items(sc: dict, items_key: str, total_key: str) -> list:
+    """Itemised [{"cost"}] list if given, else one item for the total."""
+    if isinstance(sc.get(items_key), list):
+        return [SimpleNamespace(cost=float(item["cost"])) for item in sc[items_key]]
+    return [] if _blank(sc.get(total_key)) else [SimpleNamespace(cost=sc[total_key])]
+
+
+def price_scenario(session, rates: dict, scenario: dict):
+    """Run one scenario dict through run_full_estimation."""
+    sc = dict(SCENARIO_DEFAULTS, **scenario)
+    for key, cast in NUMERIC_FIELDS.items():
+        if not _blank(sc.get(key)):
+            sc[key] = cast(float(sc[key])) if cast is int else cast(sc[key])
+
+    modules = []
+    for i, m in enumerate(sc.get("modules") or []):
+        employee = None
+        if not _blank(m.get("employee_id")):
+            eid = int(m["employee_id"])
+            if eid not in rates:
+                raise ValueError(f"Unknown employee id {eid}")
+            employee = SimpleNamespace(hourly_cost=rates[eid])
+        rate = None if _blank(m.get("rate")) else float(m["rate"])
+        modules.append(SimpleNamespace(name=m.get("name") or f"Module {i + 1}",
+                                       estimated_hours=float(m.get("hours") or 0),
+                                       hourly_rate_override=rate, employee=employee, cost=0))
+
+    region_multiplier = sc.get("region_multiplier")
+    if _blank(region_multiplier):
+        region_multiplier = 1.0
+        if not _blank(sc.get("region")):
+            region = get_config(session).regions.get(sc["region"])
+            if region is None:
+                raise ValueError(f"Unknown region '{sc['region']}'")
+            region_multiplier = region.multiplier
+
+    return run_full_estimation(
+        session, modules, sc["complexity"], sc["app_type"], region_multiplier,
+        _line_items(sc, "infra_items", "infra_total"), _line_items(sc, "stack_items", "stack_total"),
+        sc["maintenance_buffer_pct"], sc["risk_contingency_pct"], sc["profit_margin_pct"],
+        stage_pcts=sc.get("stage_pcts"),
+        function_points=sc["function_points"],
+        estimated_duration_months=sc["estimated_duration_months"],
+        maintenance_years=sc["maintenance_years"],
+        maintenance_annual_pct=sc["maintenance_annual_pct"],
+    )
+
+
+def _price_chunk_with(session, rates, chunk) -> list:
+    out = []
+    for n, scenario in chunk:
+        sid = scenario.get("id", n)
+        try:
+            out.append((sid, price_scenario(session, rates, scenario).to_dict(), None))
+        except (ValueError, TypeError, KeyError, AttributeError) as exc:   # malformed scenario
+            out.append((sid, None, f"{type(exc).__name__}: {exc}"))
+    return out
+
+
+# ── worker process state ──
+_worker = None
+
+
+def _init_worker(db_url: str):
+    global _worker
+    database.DB_URL = db_url
+    session = database.get_session(db_url)
+    _worker = (session, employee_rates(session))
+
+
+def _price_chunk(chunk) -> list:
+    return _price_chunk_with(*_worker, chunk)
+
+
+def _chunks(scenarios, size: int):
+    numbered = enumerate(scenarios, 1)
+    while True:
+        chunk = list(islice(numbered, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def estimate_scenarios(scenarios, workers: int = None, chunk_size: int = CHUNK_SIZE, session=None):
+    """
+    Yield (id, result dict or None, error or None) per scenario, in input
+    order.  Scenarios are consumed lazily and at most
+    workers × IN_FLIGHT_PER_WORKER chunks are queued at once.  workers ≤ 1
+    prices in-process with `session` (or a new session).
+    """
+    workers = os.cpu_count() if workers is None else workers
+    chunks = _chunks(scenarios, chunk_size)
+    if workers <= 1:
+        own = session is None
+        session = session or database.get_session()
+        try:
+            rates = employee_rates(session)
+            for chunk in chunks:
+                yield from _price_chunk_with(session, rates, chunk)
+        finally:
+            if own:
+                session.close()
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(database.DB_URL,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_price_chunk, chunk))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# ──────────────────────────────────────────────
+# OUTPUT
+# ──────────────────────────────────────────────
+def _summary_row(sid, result, error) -> dict:
+    if result is None:
+        return {"id": sid, "error": error}
+    return {
+        "id": sid,
+        "final_price": result["final_pricing"]["final_price"],
+        "safe_cost": result["risk_buffer"]["safe_cost"],
+        "gross_cost": result["gross_cost"],
+        "adjusted_labor_total": result["labor"]["adjusted_labor_total"],
+        "raw_labor_total": result["labor"]["raw_labor_total"],
+        "infra_total": result["infra_stack"]["infra_total"],
+        "stack_total": result["infra_stack"]["stack_total"],
+        "profit_amount": result["final_pricing"]["profit_amount"],
+        "total_hours": result["analytics"]["total_hours"],
+        "person_months": result["analytics"]["person_months"],
+        "cost_per_function_point": result["analytics"]["cost_per_function_point"],
+        "burn_rate_monthly": result["analytics"]["burn_rate_monthly"],
+        "error": "",
+    }
+
+
+def _write_pdf(pdf_dir: str, sid, scenario_result: dict):
+    from app.proposal_generator import generate_proposal_pdf   # loads reportlab
+    safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(sid))
+    path = os.path.join(pdf_dir, f"{safe_id}.pdf")
+    forecast = scenario_result["maintenance_forecast"]
+    generate_proposal_pdf(
+        filepath=path, project_name=str(sid), client_name="", app_type="", complexity="",
+        description="", timeline_months=0.0,
+        scope_modules=[m["name"] for m in scenario_result["labor"]["module_costs"]],
+        final_price=scenario_result["final_pricing"]["final_price"],
+        stage_distribution=scenario_result["stage_distribution"],
+        maintenance_annual=forecast[0]["annual_cost"] if forecast else 0.0,
+        maintenance_years=len(forecast),
+    )
+
+
+def write_results(results, out, fmt: str = "jsonl", pdf_dir: str = None) -> dict:
+    """Stream (id, result, error) tuples to a text stream.  Returns counts."""
+    counts = {"priced": 0, "failed": 0}
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+    for sid, result, error in results:
+        counts["failed" if result is None else "priced"] += 1
+        if writer is not None:
+            writer.writerow(_summary_row(sid, result, error))
+        elif result is None:
+            out.write(json.dumps({"id": sid, "error": error}) + "\n")
+        else:
+            out.write(json.dumps({"id": sid, **result}) + "\n")
+        if pdf_dir and result is not None:
+            _write_pdf(pdf_dir, sid, result)
+    out.flush()
+    return counts
+
+
+# ──────────────────────────────────────────────
+# ENTRY POINT
+# ──────────────────────────────────────────────
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.cli",
+                                 description="Price estimation scenarios without the desktop UI.")
+    ap.add_argument("scenarios", help="scenario file (.json, .jsonl or .csv)")
+    ap.add_argument("--out", default="-", help="output file (default: stdout)")
+    ap.add_argument("--format", choices=("jsonl", "csv"),
+                    help="output format (default: from --out extension, else jsonl)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    ap.add_argument("--db", help="SQLite database file (default: the desktop app's database)")
+    ap.add_argument("--pdf-dir", help="also write a proposal PDF per scenario here")
+    args = ap.parse_args(argv)
+
+    if args.db:
+        database.use_database(args.db)
+    database.init_database()
+    if args.pdf_dir:
+        os.makedirs(args.pdf_dir, exist_ok=True)
+    fmt = args.format or ("csv" if args.out.lower().endswith(".csv") else "jsonl")
+
+    results = estimate_scenarios(read_scenarios(args.scenarios), args.workers, args.chunk_size)
+    if args.out == "-":
+        counts = write_results(results, sys.stdout, fmt, args.pdf_dir)
+    else:
+        with open(args.out, "w", newline="", encoding="utf-8") as out:
+            counts = write_results(results, out, fmt, args.pdf_dir)
+    print(f"{counts['priced']} scenarios priced, {counts['failed']} failed.", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
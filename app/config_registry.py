@@ -0,0 +1,191 @@
+"""
+Apeiron CostEstimation Pro – Configuration Snapshot Registry
+============================================================
+The multiplier, pricing, lookup and preset tables are tiny and change
+rarely, so they are loaded once per database into an immutable snapshot.
+Writers bump the process-wide version (`invalidate_config()`) and the next
+reader reloads; everything else is served from memory with no SQL.
+"""
+
+import threading
+import weakref
+from collections import namedtuple
+from types import MappingProxyType
+
+import numpy as np
+from sqlalchemy.orm import selectinload
+
+from app.models import (
+    ComplexityMultiplier, AppTypeMultiplier, RegionMultiplier,
+    PricingStrategy, SystemLookup, IndustryPreset,
+)
+
+Region = namedtuple("Region", "id name multiplier")
+PricingMode = namedtuple("PricingMode", "id name profit_margin_pct risk_contingency_pct description")
+Preset = namedtuple("Preset", "id name modules")  # modules: ((name, default_hours), …)
+
+
+# ──────────────────────────────────────────────
+# MULTIPLIER CUBE
+# ──────────────────────────────────────────────
+def _axis(names_to_values: dict):
+    """name → code map plus a value vector with a trailing 1.0 'unknown' slot."""
+    names = sorted(names_to_values)
+    codes = {name: i for i, name in enumerate(names)}
+    values = np.array([names_to_values[n] for n in names] + [1.0], dtype=np.float64)
+    values.flags.writeable = False
+    return MappingProxyType(codes), values
+
+
+class MultiplierCube:
+    """
+    Dense complexity × app-type × region table of combined labor factors.
+
+    factors[c, a, r] = complexity[c] × app_types[a] × regions[r]
+
+    Names are encoded to integer codes once; any number of scenarios is
+    then resolved with a single array gather.  Each axis has a trailing
+    code for unknown names whose factor is 1.0, matching the fallback of
+    get_complexity_multiplier / get_app_type_adjustment.
+    """
+
+    __slots__ = ("complexity_codes", "app_type_codes", "region_codes",
+                 "complexity", "app_types", "regions", "factors")
+
+    def __init__(self, complexity: dict, app_types: dict, regions: dict):
+        self.complexity_codes, self.complexity = _axis(complexity)
+        self.app_type_codes, self.app_types = _axis(app_types)
+        self.region_codes, self.regions = _axis(regions)
+        self.factors = (self.complexity[:, None, None]
+                        * self.app_types[None, :, None]
+                        * self.regions[None, None, :])
+        self.factors.flags.writeable = False
+
+    @property
+    def shape(self) -> tuple:
+        return self.factors.shape
+
+    def encode(self, complexity, app_type, region) -> tuple:
+        """Names (scalars or sequences) → integer code arrays (c, a, r)."""
+        def lookup(codes, names):
+            unknown = len(codes)
+            if isinstance(names, str):
+                return codes.get(names, unknown)
+            return np.fromiter((codes.get(n, unknown) for n in names), dtype=np.intp)
+        return (lookup(self.complexity_codes, complexity),
+                lookup(self.app_type_codes, app_type),
+                lookup(self.region_codes, region))
+
+    def gather(self, c, a, r):
+        """Combined factor for each (c, a, r) code triple."""
+        return self.factors[c, a, r]
+
+    def components(self, c, a, r) -> tuple:
+        """(complexity, app-type, region) multipliers for each code triple."""
+        return self.complexity[c], self.app_types[a], self.regions[r]
+
+    def factor(self, complexity: str, app_type: str, region: str) -> float:
+        return float(self.factors[self.encode(complexity, app_type, region)])
+
+
+# ──────────────────────────────────────────────
+# SNAPSHOT
+# ──────────────────────────────────────────────
+class ConfigSnapshot:
+    """Read-only view of the configuration tables at one registry version."""
+
+    __slots__ = ("version", "complexity", "app_types", "regions",
+                 "pricing", "lookups", "presets", "cube")
+
+    def __init__(self, version, complexity, app_types, regions, pricing, lookups, presets):
+        self.version = version
+        self.complexity = MappingProxyType(complexity)   # name → multiplier
+        self.app_types = MappingProxyType(app_types)     # name → multiplier
+        self.regions = MappingProxyType(regions)         # name → Region
+        self.pricing = MappingProxyType(pricing)         # name → PricingMode
+        self.lookups = MappingProxyType(lookups)         # category → (value, …)
+        self.presets = MappingProxyType(presets)         # name → Preset
+        self.cube = MultiplierCube(
+            complexity, app_types, {name: r.multiplier for name, r in regions.items()})
+
+    def region_by_id(self, region_id):
+        for region in self.regions.values():
+            if region.id == region_id:
+                return region
+        return None
+
+    @classmethod
+    def load(cls, session, version: int) -> "ConfigSnapshot":
+        """Read every configuration table in one pass (six SELECTs)."""
+        lookups = {}
+        for row in session.query(SystemLookup).order_by(SystemLookup.id).all():
+            lookups.setdefault(row.category, []).append(row.value)
+        presets = {
+            p.name: Preset(p.id, p.name, tuple((m.name, m.default_hours) for m in p.modules))
+            for p in session.query(IndustryPreset)
+                            .options(selectinload(IndustryPreset.modules)).all()
+        }
+        return cls(
+            version,
+            complexity={r.name: r.multiplier for r in session.query(ComplexityMultiplier).all()},
+            app_types={r.name: r.multiplier for r in session.query(AppTypeMultiplier).all()},
+            regions={r.region_name: Region(r.id, r.region_name, r.multiplier)
+                     for r in session.query(RegionMultiplier).all()},
+            pricing={r.name: PricingMode(r.id, r.name, r.profit_margin_pct,
+                                         r.risk_contingency_pct, r.description)
+                     for r in session.query(PricingStrategy).all()},
+            lookups={cat: tuple(values) for cat, values in lookups.items()},
+            presets=presets,
+        )
+
+
+# ──────────────────────────────────────────────
+# REGISTRY
+# ──────────────────────────────────────────────
+class ConfigRegistry:
+    """
+    Process-wide cache of ConfigSnapshots, one per engine.  Keyed by the
+    engine itself (held weakly) rather than its URL, so separate in-memory
+    `sqlite://` databases never share a snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = weakref.WeakKeyDictionary()
+        self.version = 0
+
+    @staticmethod
+    def _key(session):
+        return session.get_bind()
+
+    def snapshot(self, session) -> ConfigSnapshot:
+        key = self._key(session)
+        snap = self._snapshots.get(key)
+        if snap is not None and snap.version == self.version:
+            return snap
+        with self._lock:
+            snap = self._snapshots.get(key)
+            if snap is None or snap.version != self.version:
+                snap = ConfigSnapshot.load(session, self.version)
+                self._snapshots[key] = snap
+            return snap
+
+    def invalidate(self) -> int:
+        """Bump the version; every snapshot reloads on its next read."""
+        with self._lock:
+            self.version += 1
+            self._snapshots.clear()
+            return self.version
+
+
+registry = ConfigRegistry()
+
+
+def get_config(session) -> ConfigSnapshot:
+    """Current configuration snapshot for the session's database."""
+    return registry.snapshot(session)
+
+
+def invalidate_config() -> int:
+    """Call after any write to a configuration table."""
+    return registry.invalidate()
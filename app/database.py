@@ -2,15 +2,28 @@
 Apeiron CostEstimation Pro – Database Setup
 ============================================
 SQLite initialization, session management, and seed data.
+
+One engine (with its connection pool) is created per database URL and
+shared by the whole process: the UI, background workers, the CLI and the
+service all draw connections from it.  Sessions come from one factory per
+URL: get_session() for a caller-owned session, current_session() for the
+calling thread's session (scoped_session), session_scope() for a
+commit-or-rollback unit of work.
 """
 
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event, delete, insert, select
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, scoped_session
 from app.models import (
-    Base, RegionMultiplier, SystemLookup, AppTypeMultiplier,
+    Base, AppMeta, RegionMultiplier, SystemLookup, AppTypeMultiplier,
     ComplexityMultiplier, PricingStrategy, IndustryPreset, IndustryPresetModule
 )
+from app.migrations import migrate, SCHEMA_VERSION  # noqa: F401  (re-exported)
 
 # ──────────────────────────────────────────────
 # DEFAULT SEED DATA
@@ -150,112 +163,314 @@ DB_PATH = os.path.join(DB_DIR, "costpro.db")
 DB_URL = f"sqlite:///{DB_PATH}"
 
 
-def get_engine():
-    """Create and return a SQLAlchemy engine."""
-    os.makedirs(DB_DIR, exist_ok=True)
-    engine = create_engine(DB_URL, echo=False)
-    return engine
+# ──────────────────────────────────────────────
+# SQLITE PERFORMANCE PROFILE
+# ──────────────────────────────────────────────
+# Applied to every new connection.  "safe" syncs the WAL on every commit
+# (survives power loss); "fast" syncs only at checkpoints (survives an
+# application crash; the last commits can be lost on power failure) and
+# gives SQLite more page cache and memory-mapped I/O.
+SQLITE_PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16_000,          # KiB (negative = size, not pages)
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5_000,          # ms
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,
+    },
+}
+SQLITE_PROFILE = os.environ.get("APEIRON_SQLITE_PROFILE", "fast")
+
+# Pages returned to the filesystem per incremental vacuum step.
+VACUUM_PAGES = 2_000
+
 
+def _is_sqlite_file(url) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
 
-def get_session():
-    """Return a new database session."""
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
 
+def _profile_listener(profile: dict):
+    def on_connect(dbapi_conn, record):
+        cur = dbapi_conn.cursor()
+        # Only takes effect on a brand-new file; existing files keep their
+        # mode until a full VACUUM (see vacuum_database(full=True)).
+        cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        for name, value in profile.items():
+            cur.execute(f"PRAGMA {name} = {value}")
+        cur.close()
+    return on_connect
 
-def init_database():
+
+def set_sqlite_profile(name: str):
+    """Switch the profile for connections opened from now on (drops cached engines)."""
+    global SQLITE_PROFILE
+    if name not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile {name!r}; choose from {sorted(SQLITE_PROFILES)}")
+    SQLITE_PROFILE = name
+    dispose_engines()
+
+
+def sqlite_settings(url=None) -> dict:
+    """Current values of the profile pragmas (and auto_vacuum) on a pooled connection."""
+    with get_engine(url).connect() as conn:
+        names = ["auto_vacuum", *SQLITE_PROFILES["safe"]]
+        return {n: conn.exec_driver_sql(f"PRAGMA {n}").scalar() for n in names}
+
+
+def vacuum_database(url=None, pages: int = VACUUM_PAGES, full: bool = False) -> int:
     """
-    Create all tables if they don't exist.
-    Seed default region multipliers and dynamic config.
+    Return free pages to the filesystem; returns the number of pages freed.
+    Incremental (at most `pages` per call) when the file was created with
+    auto_vacuum=INCREMENTAL; `full=True` rewrites the whole file with
+    VACUUM, which also converts older files to incremental mode.
     """
-    engine = get_engine()
-    Base.metadata.create_all(engine)
-    _seed_defaults(engine)
-    _seed_system_config(engine)
-    return engine
+    engine = get_engine(url)
+    with engine.connect() as conn:
+        before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if full:
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+        elif conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+            # Frees one page per step; executescript() steps it to completion.
+            conn.connection.dbapi_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        after = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+    return before - after
 
 
-def _seed_defaults(engine):
-    """Insert default region multipliers if table is empty."""
-    Session = sessionmaker(bind=engine)
-    session = Session()
+def maintain_database(url=None, vacuum_pages: int = VACUUM_PAGES) -> dict:
+    """
+    Periodic upkeep, cheap enough to run from a timer: ANALYZE on first use
+    (no statistics yet), otherwise PRAGMA optimize, which re-analyzes only
+    tables whose row counts have drifted; then one incremental vacuum step.
+    """
+    engine = get_engine(url)
+    with engine.connect() as conn:
+        analyzed = not conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").first()
+        conn.exec_driver_sql("ANALYZE" if analyzed else "PRAGMA optimize")
+        conn.commit()
+    freed = vacuum_database(url, vacuum_pages) if vacuum_pages else 0
+    return {"analyzed": analyzed, "freed_pages": freed}
+
+
+# Connection pool for file databases (in-memory SQLite keeps SQLAlchemy's
+# single-connection pool).
+POOL_SIZE = 5
+POOL_MAX_OVERFLOW = 10
+POOL_TIMEOUT = 30
+
+_engines = {}              # url → Engine
+_factories = {}            # url → scoped_session
+_engines_lock = threading.Lock()
+
+
+def _url_key(url) -> str:
+    if url is None:
+        return DB_URL
+    return url if isinstance(url, str) else url.render_as_string(hide_password=False)
+
+
+def _pool_options(url) -> dict:
+    if make_url(url).get_backend_name() == "sqlite" and not _is_sqlite_file(url):
+        return {}
+    return {"pool_size": POOL_SIZE, "max_overflow": POOL_MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT, "pool_pre_ping": True}
+
+
+def get_engine(url=None):
+    """
+    The process-wide engine for `url` (default: the app database), created
+    on first use; SQLite files get the SQLITE_PROFILE pragmas on connect.
+    """
+    key = _url_key(url)
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(key, echo=False, **_pool_options(key))
+            if _is_sqlite_file(key):
+                os.makedirs(os.path.dirname(os.path.abspath(engine.url.database)), exist_ok=True)
+                event.listen(engine, "connect", _profile_listener(SQLITE_PROFILES[SQLITE_PROFILE]))
+            _engines[key] = engine
+            _factories[key] = scoped_session(sessionmaker(bind=engine))
+        return engine
+
+
+def get_session_factory(url=None) -> scoped_session:
+    """Thread-local session registry for `url`; call it for this thread's session."""
+    key = _url_key(url)
+    get_engine(key)
+    return _factories[key]
+
+
+def get_session(url=None):
+    """Return a new, caller-owned session on the shared engine."""
+    return get_session_factory(url).session_factory()
+
+
+def current_session(url=None):
+    """The calling thread's session for `url` (same object until remove_session)."""
+    return get_session_factory(url)()
+
+
+def remove_session(url=None):
+    """Close and forget the calling thread's session (end of a job or request)."""
+    key = _url_key(url)
+    if key in _factories:
+        _factories[key].remove()
+
+
+@contextmanager
+def session_scope(url=None):
+    """A new session that commits on success, rolls back on error and always closes."""
+    session = get_session(url)
     try:
-        count = session.query(RegionMultiplier).count()
-        if count == 0:
-            defaults = [
-                RegionMultiplier(region_name="India", multiplier=1.0),
-                RegionMultiplier(region_name="North America", multiplier=4.0),
-                RegionMultiplier(region_name="Western Europe", multiplier=3.5),
-                RegionMultiplier(region_name="Eastern Europe", multiplier=2.0),
-                RegionMultiplier(region_name="Asia", multiplier=1.5),
-            ]
-            session.add_all(defaults)
-            session.commit()
-    except Exception:
+        yield session
+        session.commit()
+    except BaseException:
         session.rollback()
+        raise
     finally:
         session.close()
 
 
-def _seed_system_config(engine):
-    """Seed dynamic configuration tables from legacy Python constants if empty."""
-    Session = sessionmaker(bind=engine)
-    session = Session()
+def dispose_engines(url=None):
+    """
+    Close pooled connections and drop the cached engine for `url`, or for
+    every URL when none is given (application exit, tests, temp databases).
+    """
+    with _engines_lock:
+        keys = [_url_key(url)] if url is not None else list(_engines)
+        for key in keys:
+            factory = _factories.pop(key, None)
+            if factory is not None:
+                factory.remove()
+            engine = _engines.pop(key, None)
+            if engine is not None:
+                engine.dispose()
+
+
+def use_database(path: str) -> str:
+    """Point the app at another SQLite file (CLI/service --db); returns its URL."""
+    global DB_DIR, DB_PATH, DB_URL
+    DB_PATH = os.path.abspath(path)
+    DB_DIR = os.path.dirname(DB_PATH)
+    DB_URL = f"sqlite:///{DB_PATH}"
+    return DB_URL
+
+
+# Bumped whenever the default seed data changes; with SCHEMA_VERSION it
+# forms the stamp that lets a warm start skip init work entirely.
+SEED_VERSION = 1
+
+
+def _is_initialised(engine) -> bool:
+    """One read: schema version, seed stamp and table count in a single query."""
+    names = ", ".join(f"'{name}'" for name in Base.metadata.tables)
     try:
-        # 1. System Lookups (Roles, Categories)
-        if session.query(SystemLookup).count() == 0:
-            lookups = [
-                ("role", "Project Manager"), ("role", "Architect"), ("role", "Frontend Developer"),
-                ("role", "Backend Developer"), ("role", "DevOps Engineer"), ("role", "QA Tester"),
-                ("role", "UI/UX Designer"), ("role", "Scrum Master"),
-                ("infra_category", "Hosting"), ("infra_category", "Database"), ("infra_category", "API Integration"),
-                ("infra_category", "Security"), ("infra_category", "App Store Fees"), ("infra_category", "Marketing"),
-                ("infra_category", "DevOps"), ("infra_category", "Other"),
-                ("stack_category", "Frontend"), ("stack_category", "Backend"), ("stack_category", "Database"),
-                ("stack_category", "DevOps"), ("stack_category", "Analytics"), ("stack_category", "Third-party APIs"),
-                ("stack_category", "Other"),
-                ("billing_type", "one_time"), ("billing_type", "monthly"), ("billing_type", "yearly"), ("billing_type", "usage_based")
-            ]
-            for cat, val in lookups:
-                session.add(SystemLookup(category=cat, value=val))
-        
-        # 2. App Type Multipliers
-        if session.query(AppTypeMultiplier).count() == 0:
-            for name, mult in APP_TYPE_ADJUSTMENTS.items():
-                session.add(AppTypeMultiplier(name=name, multiplier=mult))
-                
-        # 3. Complexity Multipliers
-        if session.query(ComplexityMultiplier).count() == 0:
-            for name, mult in COMPLEXITY_MULTIPLIERS.items():
-                session.add(ComplexityMultiplier(name=name, multiplier=mult))
-                
-        # 4. Pricing Strategies
-        if session.query(PricingStrategy).count() == 0:
-            for name, data in PRICING_MODES.items():
-                session.add(PricingStrategy(
-                    name=name,
-                    profit_margin_pct=data["profit_pct"],
-                    risk_contingency_pct=data["risk_pct"],
-                    description=data["description"]
-                ))
-                
-        # 5. Industry Presets
-        if session.query(IndustryPreset).count() == 0:
-            for name, data in INDUSTRY_PRESETS.items():
-                preset = IndustryPreset(name=name)
-                session.add(preset)
-                session.flush() # get ID
-                for mod in data["modules"]:
-                    session.add(IndustryPresetModule(
-                        preset_id=preset.id,
-                        name=mod["name"],
-                        default_hours=mod["hours"]
-                    ))
-                    
-        session.commit()
-    except Exception as e:
+        with engine.connect() as conn:
+            version, seeded, tables = conn.exec_driver_sql(
+                "SELECT (SELECT user_version FROM pragma_user_version), "
+                "(SELECT value FROM app_meta WHERE key = 'seed_version'), "
+                f"(SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN ({names}))"
+            ).one()
+    except OperationalError:          # no app_meta table: never initialised
+        return False
+    return (version == SCHEMA_VERSION and seeded == str(SEED_VERSION)
+            and tables == len(Base.metadata.tables))
+
+
+def init_database(url=None):
+    """
+    Create all tables if they don't exist.
+    Seed default region multipliers and dynamic config, then refresh the
+    query planner statistics.  Skipped after a single stamp read when the
+    database is already at SCHEMA_VERSION and SEED_VERSION.
+    """
+    engine = get_engine(url)
+    if _is_initialised(engine):
+        return engine
+    migrate(engine)
+    Base.metadata.create_all(engine)
+    try:
+        with engine.begin() as conn:
+            _seed_defaults(conn)
+            _seed_system_config(conn)
+            conn.execute(delete(AppMeta).where(AppMeta.key == "seed_version"))
+            conn.execute(insert(AppMeta).values(key="seed_version", value=str(SEED_VERSION)))
+    except SQLAlchemyError as e:      # retried on the next start (no stamp written)
         print("Error seeding system config:", e)
-        session.rollback()
-    finally:
-        session.close()
+    maintain_database(url, vacuum_pages=0)
+    return engine
+
+
+def _seed_rows(conn, model, rows):
+    """Bulk-insert `rows` into an empty table; returns whether it was empty."""
+    if conn.execute(select(model.id).limit(1)).first() is not None:
+        return False
+    conn.execute(insert(model), rows)
+    return True
+
+
+def _seed_defaults(conn):
+    """Insert default region multipliers if table is empty."""
+    _seed_rows(conn, RegionMultiplier, [
+        {"region_name": "India", "multiplier": 1.0},
+        {"region_name": "North America", "multiplier": 4.0},
+        {"region_name": "Western Europe", "multiplier": 3.5},
+        {"region_name": "Eastern Europe", "multiplier": 2.0},
+        {"region_name": "Asia", "multiplier": 1.5},
+    ])
+
+
+def _seed_system_config(conn):
+    """Seed dynamic configuration tables from legacy Python constants if empty."""
+    # 1. System Lookups (Roles, Categories)
+    lookups = [
+        ("role", "Project Manager"), ("role", "Architect"), ("role", "Frontend Developer"),
+        ("role", "Backend Developer"), ("role", "DevOps Engineer"), ("role", "QA Tester"),
+        ("role", "UI/UX Designer"), ("role", "Scrum Master"),
+        ("infra_category", "Hosting"), ("infra_category", "Database"), ("infra_category", "API Integration"),
+        ("infra_category", "Security"), ("infra_category", "App Store Fees"), ("infra_category", "Marketing"),
+        ("infra_category", "DevOps"), ("infra_category", "Other"),
+        ("stack_category", "Frontend"), ("stack_category", "Backend"), ("stack_category", "Database"),
+        ("stack_category", "DevOps"), ("stack_category", "Analytics"), ("stack_category", "Third-party APIs"),
+        ("stack_category", "Other"),
+        ("billing_type", "one_time"), ("billing_type", "monthly"), ("billing_type", "yearly"), ("billing_type", "usage_based")
+    ]
+    _seed_rows(conn, SystemLookup, [{"category": cat, "value": val} for cat, val in lookups])
+
+    # 2. App Type Multipliers
+    _seed_rows(conn, AppTypeMultiplier,
+               [{"name": name, "multiplier": mult} for name, mult in APP_TYPE_ADJUSTMENTS.items()])
+
+    # 3. Complexity Multipliers
+    _seed_rows(conn, ComplexityMultiplier,
+               [{"name": name, "multiplier": mult} for name, mult in COMPLEXITY_MULTIPLIERS.items()])
+
+    # 4. Pricing Strategies
+    _seed_rows(conn, PricingStrategy, [
+        {"name": name, "profit_margin_pct": data["profit_pct"],
+         "risk_contingency_pct": data["risk_pct"], "description": data["description"]}
+        for name, data in PRICING_MODES.items()
+    ])
+
+    # 5. Industry Presets (modules need the generated preset ids)
+    if _seed_rows(conn, IndustryPreset, [{"name": name} for name in INDUSTRY_PRESETS]):
+        ids = dict(conn.execute(select(IndustryPreset.name, IndustryPreset.id)).all())
+        conn.execute(insert(IndustryPresetModule), [
+            {"preset_id": ids[name], "name": mod["name"], "default_hours": mod["hours"]}
+            for name, data in INDUSTRY_PRESETS.items() for mod in data["modules"]
+        ])
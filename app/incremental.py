@@ -0,0 +1,276 @@
+"""
+Apeiron CostEstimation Pro – Incremental Re-Estimation
+======================================================
+A stateful estimator that remembers which pipeline stages depend on which
+inputs.  Editing one module, multiplier, percentage or infra list marks
+only the affected stages dirty; the next `result()` recomputes just those.
+A single module edit is O(1): its cost is re-derived and the running
+labor total adjusted by the delta.  Each result() returns its own
+snapshot of the module rows, so later edits never change a result that
+was already handed out.
+"""
+
+from app.logic import (
+    DEFAULT_STAGES,
+    module_cost_paise,
+    adjust_labor_paise,
+    get_complexity_multiplier,
+    get_app_type_adjustment,
+    calculate_infra_stack_total,
+    calculate_risk_buffer,
+    calculate_final_price,
+    calculate_stage_distribution,
+    calculate_maintenance_forecast,
+    calculate_total_hours,
+    cost_per_function_point,
+    burn_rate_monthly,
+    revenue_margin,
+    hours_to_person_months,
+)
+from app.money import from_paise, to_paise
+from app.results import (
+    EstimationResult, LaborCost, ModuleCosts, InfraStackTotal, RiskBuffer, FinalPricing,
+    StageDistribution, MaintenanceForecast, Analytics,
+)
+
+# ──────────────────────────────────────────────
+# DEPENDENCY GRAPH
+# ──────────────────────────────────────────────
+# Pipeline stages in evaluation order (steps 1–8 of run_full_estimation).
+STAGE_ORDER = (
+    "labor", "infra_stack", "gross", "risk", "final",
+    "stages", "maintenance", "analytics",
+)
+
+# stage → stages that read its output
+STAGE_DEPENDENTS = {
+    "labor": ("gross", "stages"),
+    "infra_stack": ("gross",),
+    "gross": ("risk",),
+    "risk": ("final",),
+    "final": ("analytics",),
+    "stages": ("maintenance",),
+    "maintenance": (),
+    "analytics": (),
+}
+
+# scalar input → first stage that reads it
+INPUT_STAGES = {
+    "complexity": "labor",
+    "app_type": "labor",
+    "region_multiplier": "labor",
+    "maintenance_buffer_pct": "risk",
+    "risk_contingency_pct": "risk",
+    "profit_margin_pct": "final",
+    "stage_pcts": "stages",
+    "maintenance_annual_pct": "maintenance",
+    "maintenance_years": "maintenance",
+    "function_points": "analytics",
+    "estimated_duration_months": "analytics",
+}
+
+
+# ──────────────────────────────────────────────
+# ESTIMATOR
+# ──────────────────────────────────────────────
+class IncrementalEstimator:
+    """
+    Same inputs and result layout as run_full_estimation, but stateful.
+
+    Module costs are held as exact integer paise, so the running labor
+    total never drifts no matter how many deltas are applied.  Total hours
+    are re-summed with calculate_total_hours whenever analytics is
+    recomputed, so they match run_full_estimation exactly.
+    """
+
+    def __init__(
+        self,
+        session,
+        modules: list,
+        complexity: str,
+        app_type: str,
+        region_multiplier: float,
+        infra_items: list,
+        stack_items: list,
+        maintenance_buffer_pct: float,
+        risk_contingency_pct: float,
+        profit_margin_pct: float,
+        stage_pcts: dict = None,
+        function_points: int = 0,
+        estimated_duration_months: float = 0.0,
+        maintenance_years: int = 5,
+        maintenance_annual_pct: float = 15.0,
+    ):
+        self.session = session
+        self.inputs = {
+            "complexity": complexity,
+            "app_type": app_type,
+            "region_multiplier": region_multiplier,
+            "maintenance_buffer_pct": maintenance_buffer_pct,
+            "risk_contingency_pct": risk_contingency_pct,
+            "profit_margin_pct": profit_margin_pct,
+            "stage_pcts": stage_pcts or DEFAULT_STAGES,
+            "function_points": function_points,
+            "estimated_duration_months": estimated_duration_months,
+            "maintenance_years": maintenance_years,
+            "maintenance_annual_pct": maintenance_annual_pct,
+        }
+        self._infra_items = list(infra_items)
+        self._stack_items = list(stack_items)
+        self._cx_mult = get_complexity_multiplier(session, complexity)
+        self._app_adj = get_app_type_adjustment(session, app_type)
+
+        self.modules = []
+        self._names, self._hours, self._costs = [], [], []     # module_costs columns
+        self._cost_paise = []
+        self._raw_paise = 0
+        for mod in modules:
+            self._append(mod)
+
+        self._out = {}
+        self._dirty = set(STAGE_ORDER)
+        self.last_recomputed = ()
+
+    # ── invalidation ──
+    def _invalidate(self, stage: str):
+        pending = [stage]
+        while pending:
+            s = pending.pop()
+            if s not in self._dirty:
+                self._dirty.add(s)
+                pending.extend(STAGE_DEPENDENTS[s])
+
+    @property
+    def dirty_stages(self) -> tuple:
+        return tuple(s for s in STAGE_ORDER if s in self._dirty)
+
+    # ── module edits (O(1) each) ──
+    def _module_cost(self, mod) -> int:
+        paise = module_cost_paise(mod, self.inputs["region_multiplier"])
+        mod.cost = from_paise(paise)
+        return paise
+
+    def _append(self, mod):
+        paise = self._module_cost(mod)
+        self.modules.append(mod)
+        self._names.append(mod.name); self._hours.append(mod.estimated_hours); self._costs.append(mod.cost)
+        self._cost_paise.append(paise)
+        self._raw_paise += paise
+
+    def _refresh_module(self, index: int):
+        mod = self.modules[index]
+        paise = self._module_cost(mod)
+        self._raw_paise += paise - self._cost_paise[index]
+        self._cost_paise[index] = paise
+        self._names[index], self._hours[index], self._costs[index] = mod.name, mod.estimated_hours, mod.cost
+        self._invalidate("labor")
+        self._invalidate("analytics")
+
+    def set_module_hours(self, index: int, hours: float):
+        self.modules[index].estimated_hours = hours
+        self._refresh_module(index)
+
+    def set_module_rate_override(self, index: int, rate):
+        self.modules[index].hourly_rate_override = rate
+        self._refresh_module(index)
+
+    def set_module_employee(self, index: int, employee):
+        self.modules[index].employee = employee
+        self._refresh_module(index)
+
+    def add_module(self, module):
+        self._append(module)
+        self._invalidate("labor")
+        self._invalidate("analytics")
+
+    def remove_module(self, index: int):
+        self.modules.pop(index)
+        for column in (self._names, self._hours, self._costs):
+            column.pop(index)
+        self._raw_paise -= self._cost_paise.pop(index)
+        self._invalidate("labor")
+        self._invalidate("analytics")
+
+    # ── scalar / list inputs ──
+    def update(self, **changes):
+        """Change any scalar input (complexity, profit_margin_pct, …)."""
+        for name, value in changes.items():
+            if name not in INPUT_STAGES:
+                raise KeyError(f"Unknown estimation input '{name}'")
+            if self.inputs[name] == value:
+                continue
+            self.inputs[name] = value
+            if name == "complexity":
+                self._cx_mult = get_complexity_multiplier(self.session, value)
+            elif name == "app_type":
+                self._app_adj = get_app_type_adjustment(self.session, value)
+            elif name == "region_multiplier":
+                # Region is applied per module before rounding: O(modules).
+                for i in range(len(self.modules)):
+                    self._refresh_module(i)
+            self._invalidate(INPUT_STAGES[name])
+
+    def set_infra_items(self, infra_items: list = None, stack_items: list = None):
+        if infra_items is not None:
+            self._infra_items = list(infra_items)
+        if stack_items is not None:
+            self._stack_items = list(stack_items)
+        self._invalidate("infra_stack")
+
+    # ── recomputation ──
+    def result(self) -> EstimationResult:
+        """Recompute dirty stages and return the run_full_estimation result."""
+        recomputed = self.dirty_stages
+        out, inp = self._out, self.inputs
+        for stage in recomputed:
+            if stage == "labor":
+                adjusted = adjust_labor_paise(self._raw_paise, self._cx_mult, self._app_adj)
+                out["labor"] = LaborCost(
+                    module_costs=ModuleCosts(self._names, self._hours, self._costs),
+                    raw_labor_total=from_paise(self._raw_paise),
+                    complexity_multiplier=self._cx_mult,
+                    app_type_adjustment=self._app_adj,
+                    adjusted_labor_total=from_paise(adjusted),
+                )
+            elif stage == "infra_stack":
+                out["infra_stack"] = InfraStackTotal.from_mapping(
+                    calculate_infra_stack_total(self._infra_items, self._stack_items))
+            elif stage == "gross":
+                out["gross_cost"] = from_paise(
+                    to_paise(out["labor"]["adjusted_labor_total"])
+                    + to_paise(out["infra_stack"]["combined_total"]))
+            elif stage == "risk":
+                out["risk_buffer"] = RiskBuffer.from_mapping(calculate_risk_buffer(
+                    out["gross_cost"], inp["maintenance_buffer_pct"], inp["risk_contingency_pct"]))
+            elif stage == "final":
+                out["final_pricing"] = FinalPricing.from_mapping(calculate_final_price(
+                    out["risk_buffer"]["safe_cost"], inp["profit_margin_pct"]))
+            elif stage == "stages":
+                sp = inp["stage_pcts"]
+                out["stage_distribution"] = StageDistribution.from_mapping(calculate_stage_distribution(
+                    out["labor"]["adjusted_labor_total"],
+                    sp.get("Planning", 10), sp.get("Design", 15),
+                    sp.get("Development", 60), sp.get("Testing", 10),
+                    sp.get("Deployment", 5),
+                ))
+            elif stage == "maintenance":
+                out["maintenance_forecast"] = MaintenanceForecast.from_rows(calculate_maintenance_forecast(
+                    out["stage_distribution"].get("Development", 0),
+                    inp["maintenance_annual_pct"], inp["maintenance_years"]))
+            elif stage == "analytics":
+                final_price = out["final_pricing"]["final_price"]
+                total_hours = calculate_total_hours(self.modules)
+                out["analytics"] = Analytics(
+                    total_hours=total_hours,
+                    person_months=hours_to_person_months(total_hours),
+                    cost_per_function_point=cost_per_function_point(final_price, inp["function_points"]),
+                    burn_rate_monthly=burn_rate_monthly(final_price, inp["estimated_duration_months"]),
+                    revenue_margin_pct=revenue_margin(final_price, out["risk_buffer"]["safe_cost"]),
+                )
+        self._dirty.clear()
+        self.last_recomputed = recomputed
+        return EstimationResult(
+            out["labor"], out["infra_stack"], out["gross_cost"], out["risk_buffer"],
+            out["final_pricing"], out["stage_distribution"], out["maintenance_forecast"],
+            out["analytics"],
+        )
@@ -3,6 +3,10 @@ Apeiron CostEstimation Pro – Financial Logic Engine (Layer 1)
 =============================================================
 Core estimation calculations: effort, cost, risk, stage distribution,
 maintenance forecasting, variance tracking.
+
+Amounts enter and leave as ₹ floats, but every intermediate is integer
+paise with half-up rounding (see app.money), so results are exactly
+reproducible.
 """
 
 from datetime import datetime
@@ -10,6 +14,14 @@ from app.models import (
     Employee, Project, ProjectModule, Estimate,
     MaintenanceRecord, AuditLog
 )
+from app import audit
+from app.config_registry import get_config
+from app.money import (
+    to_paise, from_paise, to_fixed, pct_to_bp, mul_div, pct_of,
+    BP_PER_UNIT, FACTOR_SCALE, HOURS_SCALE, HOURS_PER_MONTH,
+)
+from app.results import EstimationResult
+from app.tracing import span, traced, trace_estimation  # noqa: F401 – tracing surface
 
 # ──────────────────────────────────────────────
 # CONSTANTS & DEFAULTS
@@ -56,54 +68,80 @@ def compute_hourly_from_salary(
     Returns dict with real_monthly_cost and hourly_cost.
     """
     total_pct = pf_pct + bonus_pct + leave_pct + infra_pct + admin_pct
-    real_monthly = round(base_salary * (1 + total_pct / 100), 2)
-    hourly = round(real_monthly / 22 / 8, 2)
+    real_monthly = mul_div(to_paise(base_salary), BP_PER_UNIT + pct_to_bp(total_pct), BP_PER_UNIT)
+    hourly = mul_div(real_monthly, 1, HOURS_PER_MONTH)
     return {
         "total_add_on_pct": total_pct,
-        "real_monthly_cost": real_monthly,
-        "hourly_cost": hourly,
+        "real_monthly_cost": from_paise(real_monthly),
+        "hourly_cost": from_paise(hourly),
     }
 
 
 # ──────────────────────────────────────────────
 # EFFORT & LABOR COST
 # ──────────────────────────────────────────────
+@traced
 def get_complexity_multiplier(session, complexity: str) -> float:
-    """Return the baseline effort multiplier for given complexity from DB."""
+    """Return the baseline effort multiplier for given complexity (cached config)."""
     if session:
-        from app.models import ComplexityMultiplier
-        rec = session.query(ComplexityMultiplier).filter_by(name=complexity).first()
-        if rec:
-            return rec.multiplier
+        return get_config(session).complexity.get(complexity, 1.0)
     return 1.0
 
 
+@traced
 def get_app_type_adjustment(session, app_type: str) -> float:
-    """Return the app-type effort adjustment factor from DB."""
+    """Return the app-type effort adjustment factor (cached config)."""
     if session:
-        from app.models import AppTypeMultiplier
-        rec = session.query(AppTypeMultiplier).filter_by(name=app_type).first()
-        if rec:
-            return rec.multiplier
+        return get_config(session).app_types.get(app_type, 1.0)
     return 1.0
 
 
+def module_hourly_rate(module: ProjectModule) -> float:
+    """hourly_rate_override if set, else employee's hourly_cost, else 0."""
+    rate = module.hourly_rate_override
+    if rate is None and module.employee:
+        rate = module.employee.hourly_cost
+    return rate if rate is not None else 0.0
+
+
+def labor_cost_paise(hourly_rate: float, hours: float, region_multiplier: float = 1.0) -> int:
+    """
+    rate × hours × region in paise (hours to 0.01 h, region to 4 dp,
+    one half-up rounding).
+    """
+    return mul_div(
+        to_paise(hourly_rate) * to_fixed(hours, HOURS_SCALE),
+        to_fixed(region_multiplier, FACTOR_SCALE),
+        HOURS_SCALE * FACTOR_SCALE,
+    )
+
+
+def module_cost_paise(module: ProjectModule, region_multiplier: float = 1.0) -> int:
+    """Module cost in paise = hourly_rate × estimated_hours × region_multiplier."""
+    return labor_cost_paise(module_hourly_rate(module), module.estimated_hours, region_multiplier)
+
+
+def adjust_labor_paise(raw_paise: int, complexity_multiplier: float, app_type_adjustment: float) -> int:
+    """raw labor × complexity × app-type, rounded once."""
+    return mul_div(
+        raw_paise,
+        to_fixed(complexity_multiplier, FACTOR_SCALE) * to_fixed(app_type_adjustment, FACTOR_SCALE),
+        FACTOR_SCALE * FACTOR_SCALE,
+    )
+
+
+@traced
 def calculate_module_cost(module: ProjectModule, region_multiplier: float = 1.0) -> float:
     """
     Module cost = hourly_rate × estimated_hours × region_multiplier
     Uses hourly_rate_override if set, else employee's hourly_cost.
     """
-    rate = module.hourly_rate_override
-    if rate is None and module.employee:
-        rate = module.employee.hourly_cost
-    if rate is None:
-        rate = 0.0
-
-    cost = round(rate * module.estimated_hours * region_multiplier, 2)
+    cost = from_paise(module_cost_paise(module, region_multiplier))
     module.cost = cost
     return cost
 
 
+@traced
 def calculate_total_labor_cost(
     session,
     modules: list,
@@ -115,29 +153,32 @@ def calculate_total_labor_cost(
     Total Labor Cost = Σ(module_cost) × complexity_mult × app_type_adj
     Returns breakdown dict.
     """
-    raw_total = 0.0
+    raw_paise = 0
     module_costs = []
-    for mod in modules:
-        mc = calculate_module_cost(mod, region_multiplier)
-        module_costs.append({"name": mod.name, "hours": mod.estimated_hours, "cost": mc})
-        raw_total += mc
+    with span("module_cost_loop"):
+        for mod in modules:
+            mc = module_cost_paise(mod, region_multiplier)
+            mod.cost = from_paise(mc)
+            module_costs.append({"name": mod.name, "hours": mod.estimated_hours, "cost": mod.cost})
+            raw_paise += mc
 
     cx_mult = get_complexity_multiplier(session, complexity)
     app_adj = get_app_type_adjustment(session, app_type)
-    adjusted_total = round(raw_total * cx_mult * app_adj, 2)
+    adjusted_paise = adjust_labor_paise(raw_paise, cx_mult, app_adj)
 
     return {
         "module_costs": module_costs,
-        "raw_labor_total": raw_total,
+        "raw_labor_total": from_paise(raw_paise),
         "complexity_multiplier": cx_mult,
         "app_type_adjustment": app_adj,
-        "adjusted_labor_total": adjusted_total,
+        "adjusted_labor_total": from_paise(adjusted_paise),
     }
 
 
 # ──────────────────────────────────────────────
 # TOTAL HOURS & PERSON-MONTHS
 # ──────────────────────────────────────────────
+@traced
 def calculate_total_hours(modules: list) -> float:
     """Sum of estimated hours across all modules."""
     return sum(m.estimated_hours for m in modules)
@@ -147,12 +188,13 @@ def hours_to_person_months(hours: float) -> float:
     """Convert hours to person-months (22 days × 8 hours = 176)."""
     if hours <= 0:
         return 0.0
-    return round(hours / 176, 2)
+    return mul_div(to_fixed(hours, HOURS_SCALE), 1, HOURS_PER_MONTH) / HOURS_SCALE
 
 
 # ──────────────────────────────────────────────
 # STAGE DISTRIBUTION
 # ──────────────────────────────────────────────
+@traced
 def calculate_stage_distribution(
     total_cost: float,
     planning_pct: float = 10.0,
@@ -172,32 +214,35 @@ def calculate_stage_distribution(
         "Testing": testing_pct,
         "Deployment": deployment_pct,
     }
+    total = to_paise(total_cost)
     distribution = {}
     for stage, pct in stages.items():
-        distribution[stage] = round(total_cost * pct / 100, 2)
+        distribution[stage] = from_paise(pct_of(total, pct))
     return distribution
 
 
 # ──────────────────────────────────────────────
 # INFRASTRUCTURE & STACK COSTS
 # ──────────────────────────────────────────────
+@traced
 def calculate_infra_stack_total(infra_items: list, stack_items: list) -> dict:
     """
     Sum all infra and stack costs.
     Items are model objects with .cost attribute.
     """
-    infra_total = sum(item.cost for item in infra_items)
-    stack_total = sum(item.cost for item in stack_items)
+    infra_total = sum(to_paise(item.cost) for item in infra_items)
+    stack_total = sum(to_paise(item.cost) for item in stack_items)
     return {
-        "infra_total": round(infra_total, 2),
-        "stack_total": round(stack_total, 2),
-        "combined_total": round(infra_total + stack_total, 2),
+        "infra_total": from_paise(infra_total),
+        "stack_total": from_paise(stack_total),
+        "combined_total": from_paise(infra_total + stack_total),
     }
 
 
 # ──────────────────────────────────────────────
 # RISK & BUFFER
 # ──────────────────────────────────────────────
+@traced
 def calculate_risk_buffer(
     gross_cost: float,
     maintenance_buffer_pct: float = 15.0,
@@ -206,37 +251,39 @@ def calculate_risk_buffer(
     """
     Safe Cost = Gross Cost + Maintenance Buffer + Risk Contingency.
     """
-    maintenance_buffer = round(gross_cost * maintenance_buffer_pct / 100, 2)
-    risk_contingency = round(gross_cost * risk_contingency_pct / 100, 2)
-    safe_cost = round(gross_cost + maintenance_buffer + risk_contingency, 2)
+    gross = to_paise(gross_cost)
+    maintenance_buffer = pct_of(gross, maintenance_buffer_pct)
+    risk_contingency = pct_of(gross, risk_contingency_pct)
     return {
         "gross_cost": gross_cost,
-        "maintenance_buffer": maintenance_buffer,
-        "risk_contingency": risk_contingency,
-        "safe_cost": safe_cost,
+        "maintenance_buffer": from_paise(maintenance_buffer),
+        "risk_contingency": from_paise(risk_contingency),
+        "safe_cost": from_paise(gross + maintenance_buffer + risk_contingency),
     }
 
 
 # ──────────────────────────────────────────────
 # PROFIT & FINAL PRICE
 # ──────────────────────────────────────────────
+@traced
 def calculate_final_price(safe_cost: float, profit_margin_pct: float = 20.0) -> dict:
     """
     Final Price = Safe Cost + Profit.
     """
-    profit = round(safe_cost * profit_margin_pct / 100, 2)
-    final = round(safe_cost + profit, 2)
+    safe = to_paise(safe_cost)
+    profit = pct_of(safe, profit_margin_pct)
     return {
         "safe_cost": safe_cost,
-        "profit_amount": profit,
+        "profit_amount": from_paise(profit),
         "profit_margin_pct": profit_margin_pct,
-        "final_price": final,
+        "final_price": from_paise(safe + profit),
     }
 
 
 # ──────────────────────────────────────────────
 # MAINTENANCE FORECAST
 # ──────────────────────────────────────────────
+@traced
 def calculate_maintenance_forecast(
     development_cost: float,
     annual_pct: float = 15.0,
@@ -246,13 +293,13 @@ def calculate_maintenance_forecast(
     Annual Maintenance = annual_pct% of Development Cost.
     Returns list of dicts per year.
     """
-    annual = round(development_cost * annual_pct / 100, 2)
+    annual = pct_of(to_paise(development_cost), annual_pct)
     forecast = []
     for y in range(1, years + 1):
         forecast.append({
             "year": y,
-            "annual_cost": annual,
-            "cumulative_cost": round(annual * y, 2),
+            "annual_cost": from_paise(annual),
+            "cumulative_cost": from_paise(annual * y),
         })
     return forecast
 
@@ -260,6 +307,7 @@ def calculate_maintenance_forecast(
 # ──────────────────────────────────────────────
 # VARIANCE / PERFECT ESTIMATE
 # ──────────────────────────────────────────────
+@traced
 def calculate_variance(estimated: float, actual: float) -> dict:
     """
     Variance = |Actual – Estimated| / Estimated × 100.
@@ -271,7 +319,8 @@ def calculate_variance(estimated: float, actual: float) -> dict:
             "classification": "N/A",
             "is_perfect": False,
         }
-    variance = round(abs(actual - estimated) / estimated * 100, 2)
+    est = to_paise(estimated)
+    variance = mul_div(abs(to_paise(actual) - est), BP_PER_UNIT, est) / 100
 
     if variance < 5.0:
         classification = "✔ PERFECT ESTIMATE"
@@ -302,26 +351,28 @@ def cost_per_function_point(total_cost: float, function_points: int) -> float:
     """Cost per function point. Returns 0 if no FPs."""
     if function_points <= 0:
         return 0.0
-    return round(total_cost / function_points, 2)
+    return from_paise(mul_div(to_paise(total_cost), 1, function_points))
 
 
 def burn_rate_monthly(total_cost: float, duration_months: float) -> float:
-    """Monthly burn rate = total / duration."""
-    if duration_months <= 0:
+    """Monthly burn rate = total / duration (0 if under 0.0001 months)."""
+    duration = to_fixed(duration_months, FACTOR_SCALE)
+    if duration <= 0:
         return 0.0
-    return round(total_cost / duration_months, 2)
+    return from_paise(mul_div(to_paise(total_cost), FACTOR_SCALE, duration))
 
 
 def revenue_margin(final_price: float, safe_cost: float) -> float:
-    """Revenue Margin % = (Revenue - Cost) / Revenue × 100."""
-    if final_price <= 0:
+    """Revenue Margin % = (Revenue - Cost) / Revenue × 100 (0 if under a paisa)."""
+    final = to_paise(final_price)
+    if final <= 0:
         return 0.0
-    return round((final_price - safe_cost) / final_price * 100, 2)
+    return mul_div(final - to_paise(safe_cost), BP_PER_UNIT, final) / 100
 
 
 def contribution_margin(final_price: float, variable_cost: float) -> float:
     """Contribution Margin = Final Price - Variable Cost."""
-    return round(final_price - variable_cost, 2)
+    return from_paise(to_paise(final_price) - to_paise(variable_cost))
 
 
 # ──────────────────────────────────────────────
@@ -343,61 +394,71 @@ def run_full_estimation(
     estimated_duration_months: float = 0.0,
     maintenance_years: int = 5,
     maintenance_annual_pct: float = 15.0,
-) -> dict:
+) -> EstimationResult:
     """
-    Run the complete estimation pipeline and return all results.
+    Run the complete estimation pipeline and return all results as an
+    EstimationResult (indexable like the nested dict it replaces).
+    Steps are timed under trace_estimation() (see app.tracing).
     """
     # 1. Labor
-    labor = calculate_total_labor_cost(session, modules, complexity, app_type, region_multiplier)
+    with span("step1_labor"):
+        labor = calculate_total_labor_cost(session, modules, complexity, app_type, region_multiplier)
 
     # 2. Infra + Stack
-    infra_stack = calculate_infra_stack_total(infra_items, stack_items)
+    with span("step2_infra_stack"):
+        infra_stack = calculate_infra_stack_total(infra_items, stack_items)
 
     # 3. Gross cost
-    gross_cost = round(labor["adjusted_labor_total"] + infra_stack["combined_total"], 2)
+    with span("step3_gross"):
+        gross_cost = from_paise(to_paise(labor["adjusted_labor_total"]) + to_paise(infra_stack["combined_total"]))
 
     # 4. Risk & buffer
-    risk = calculate_risk_buffer(gross_cost, maintenance_buffer_pct, risk_contingency_pct)
+    with span("step4_risk_buffer"):
+        risk = calculate_risk_buffer(gross_cost, maintenance_buffer_pct, risk_contingency_pct)
 
     # 5. Profit & final
-    final = calculate_final_price(risk["safe_cost"], profit_margin_pct)
+    with span("step5_final_price"):
+        final = calculate_final_price(risk["safe_cost"], profit_margin_pct)
 
     # 6. Stage distribution
-    sp = stage_pcts or DEFAULT_STAGES
-    stages = calculate_stage_distribution(
-        labor["adjusted_labor_total"],
-        sp.get("Planning", 10), sp.get("Design", 15),
-        sp.get("Development", 60), sp.get("Testing", 10),
-        sp.get("Deployment", 5),
-    )
+    with span("step6_stages"):
+        sp = stage_pcts or DEFAULT_STAGES
+        stages = calculate_stage_distribution(
+            labor["adjusted_labor_total"],
+            sp.get("Planning", 10), sp.get("Design", 15),
+            sp.get("Development", 60), sp.get("Testing", 10),
+            sp.get("Deployment", 5),
+        )
 
     # 7. Maintenance
-    dev_cost = stages.get("Development", 0)
-    maintenance = calculate_maintenance_forecast(dev_cost, maintenance_annual_pct, maintenance_years)
+    with span("step7_maintenance"):
+        dev_cost = stages.get("Development", 0)
+        maintenance = calculate_maintenance_forecast(dev_cost, maintenance_annual_pct, maintenance_years)
 
     # 8. Analytics
-    total_hours = calculate_total_hours(modules)
-    cpfp = cost_per_function_point(final["final_price"], function_points)
-    br = burn_rate_monthly(final["final_price"], estimated_duration_months)
-    rm = revenue_margin(final["final_price"], risk["safe_cost"])
-    pm = hours_to_person_months(total_hours)
-
-    return {
-        "labor": labor,
-        "infra_stack": infra_stack,
-        "gross_cost": gross_cost,
-        "risk_buffer": risk,
-        "final_pricing": final,
-        "stage_distribution": stages,
-        "maintenance_forecast": maintenance,
-        "analytics": {
+    with span("step8_analytics"):
+        total_hours = calculate_total_hours(modules)
+        cpfp = cost_per_function_point(final["final_price"], function_points)
+        br = burn_rate_monthly(final["final_price"], estimated_duration_months)
+        rm = revenue_margin(final["final_price"], risk["safe_cost"])
+        pm = hours_to_person_months(total_hours)
+
+    return EstimationResult.from_sections(
+        labor=labor,
+        infra_stack=infra_stack,
+        gross_cost=gross_cost,
+        risk_buffer=risk,
+        final_pricing=final,
+        stage_distribution=stages,
+        maintenance_forecast=maintenance,
+        analytics={
             "total_hours": total_hours,
             "person_months": pm,
             "cost_per_function_point": cpfp,
             "burn_rate_monthly": br,
             "revenue_margin_pct": rm,
         },
-    }
+    )
 
 
 # ──────────────────────────────────────────────
@@ -440,14 +501,8 @@ def create_audit_entry(
     old_value: str = "",
     new_value: str = "",
 ):
-    """Write an audit log entry."""
-    entry = AuditLog(
-        table_name=table_name,
-        record_id=record_id,
-        action=action,
-        field_name=field_name,
-        old_value=str(old_value),
-        new_value=str(new_value),
-    )
-    session.add(entry)
-    session.commit()
+    """
+    Record an audit log entry.  It is written (batched with any others)
+    when the caller commits `session`, and dropped if it rolls back.
+    """
+    audit.record(session, table_name, record_id, action, field_name, old_value, new_value)
@@ -0,0 +1,161 @@
+"""
+Apeiron CostEstimation Pro – Schema Migrations
+==============================================
+Versioned, in-place upgrades for existing databases.
+
+`Base.metadata.create_all` only creates missing tables; it never alters a
+table that already exists.  Changes to existing tables (new indexes,
+columns, rewritten values) are registered here as numbered steps.  The
+database records the last step applied in SQLite's `PRAGMA user_version`;
+migrate() runs the pending steps in order, each in its own transaction
+together with the version bump, so an interrupted upgrade resumes at the
+step that failed.
+
+Steps receive the connection and the set of tables that existed before
+migrate() ran.  Tables that do not exist yet are left to create_all, which
+builds them with the current models (including their indexes).
+
+Adding a step: write `def _mNNN_what(conn, existing)` and append it to
+MIGRATIONS with the next version number.  Steps that read or rewrite
+columns name them as they stood at the step's own version instead of
+deriving them from the current models, which may have gained columns the
+database lacks.
+"""
+
+from collections import namedtuple
+
+from sqlalchemy import inspect, text
+
+from app.aggregates import rebuild_aggregates
+from app.models import (
+    Base, PortfolioAggregate, create_aggregate_triggers, drop_aggregate_triggers,
+)
+from app.money import to_paise
+
+Migration = namedtuple("Migration", "version description apply")
+
+
+# ──────────────────────────────────────────────
+# STEPS
+# ──────────────────────────────────────────────
+# Money columns as of schema version 1; later ones are created in paise.
+_V1_MONEY_COLUMNS = {
+    "employees": ("base_salary", "real_monthly_cost", "hourly_cost"),
+    "stack_costs": ("cost",),
+    "infra_costs": ("cost",),
+    "project_modules": ("hourly_rate_override", "cost"),
+    "estimates": ("total_labor_cost", "total_infra_cost", "total_stack_cost", "gross_cost",
+                  "maintenance_buffer", "risk_contingency", "safe_cost", "profit_amount",
+                  "final_price", "cost_per_function_point", "burn_rate_monthly"),
+    "actuals": ("actual_cost",),
+    "maintenance_records": ("annual_cost",),
+}
+
+
+def _m001_money_to_paise(conn, existing):
+    """
+    Databases written before the paise switch store ₹ floats in the money
+    columns; rescale them in place (half-up to the paisa).
+    """
+    for table, cols in _V1_MONEY_COLUMNS.items():
+        if table not in existing:
+            continue
+        rows = conn.execute(text(
+            f'SELECT id, {", ".join(cols)} FROM "{table}"')).all()
+        assignments = ", ".join(f"{c} = :{c}" for c in cols)
+        for row in rows:
+            params = {c: None if v is None else to_paise(v) for c, v in zip(cols, row[1:])}
+            conn.execute(text(
+                f'UPDATE "{table}" SET {assignments} WHERE id = :id'),
+                {**params, "id": row[0]})
+
+
+def _create_indexes(conn, existing, names):
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        for index in table.indexes:
+            if index.name in names:
+                index.create(conn, checkfirst=True)
+
+
+def _m002_secondary_indexes(conn, existing):
+    """Foreign-key, lookup-category, audit-trail and project-list indexes."""
+    _create_indexes(conn, existing, {
+        "ix_project_modules_project_id",
+        "ix_maintenance_records_project_id",
+        "ix_system_lookup_category",
+        "ix_audit_log_record",
+        "ix_projects_status_client",
+    })
+    conn.execute(text("ANALYZE"))
+
+
+def _m003_audit_time_indexes(conn, existing):
+    """Audit queries by action and by time range (and archival cut-offs)."""
+    _create_indexes(conn, existing, {"ix_audit_log_action", "ix_audit_log_timestamp"})
+
+
+def _m004_portfolio_aggregates(conn, existing):
+    """Aggregate table and triggers, backfilled from the projects already saved."""
+    if not {"projects", "estimates", "actuals"} <= existing:
+        return                        # create_all builds the table and triggers
+    PortfolioAggregate.__table__.create(conn, checkfirst=True)
+    create_aggregate_triggers(conn)
+    rebuild_aggregates(conn)
+
+
+def _m005_integer_aggregates(conn, existing):
+    """
+    Recreate the aggregate views and triggers with INTEGER casts (money
+    columns upgraded in place keep REAL affinity) and recompute the table.
+    """
+    if not {"projects", "estimates", "actuals"} <= existing:
+        return
+    drop_aggregate_triggers(conn)
+    create_aggregate_triggers(conn)
+    rebuild_aggregates(conn)
+
+
+MIGRATIONS = [
+    Migration(1, "money columns hold paise", _m001_money_to_paise),
+    Migration(2, "secondary indexes", _m002_secondary_indexes),
+    Migration(3, "audit time indexes", _m003_audit_time_indexes),
+    Migration(4, "portfolio aggregates", _m004_portfolio_aggregates),
+    Migration(5, "integer portfolio aggregates", _m005_integer_aggregates),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+# ──────────────────────────────────────────────
+# RUNNER
+# ──────────────────────────────────────────────
+def schema_version(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def migrate(engine, target: int = SCHEMA_VERSION) -> list:
+    """
+    Apply every migration above the database's user_version, up to
+    `target`.  Returns the versions applied (empty when up to date).
+    """
+    existing = set(inspect(engine).get_table_names())
+    applied = []
+    for step in MIGRATIONS:
+        if step.version > target:
+            break
+        with engine.connect() as conn:
+            # The driver does not open transactions for DDL or PRAGMA, so
+            # take the write lock explicitly; then re-read the version in
+            # case another process migrated since we started.
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if conn.execute(text("PRAGMA user_version")).scalar() >= step.version:
+                conn.rollback()
+                continue
+            step.apply(conn, existing)
+            conn.execute(text(f"PRAGMA user_version = {step.version}"))
+            conn.commit()
+        applied.append(step.version)
+    return applied
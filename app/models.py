@@ -6,14 +6,36 @@ All database tables for the cost estimation system.
 
 from datetime import datetime, date
 from sqlalchemy import (
-    Column, Integer, String, Float, Text, Boolean,
-    DateTime, Date, ForeignKey, Enum as SAEnum, CheckConstraint
+    Column, Integer, String, Float, Text, Boolean, LargeBinary,
+    DateTime, Date, ForeignKey, Enum as SAEnum, CheckConstraint, Index
 )
+from sqlalchemy import event, inspect, text
 from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.types import TypeDecorator
+
+from app.money import (
+    to_paise, from_paise, mul_div, pct_to_bp, BP_PER_UNIT, HOURS_PER_MONTH
+)
 
 Base = declarative_base()
 
 
+class Money(TypeDecorator):
+    """
+    ₹ amount persisted as INTEGER paise.
+    Python sees rupee floats; SQL (SUM, comparisons) works on exact integers.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_paise(value)
+
+    def process_result_value(self, value, dialect):
+        # round() also accepts REAL cells left by databases upgraded in place
+        return None if value is None else from_paise(int(round(value)))
+
+
 # ──────────────────────────────────────────────
 # EMPLOYEE MASTER
 # ──────────────────────────────────────────────
@@ -24,7 +46,7 @@ class Employee(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(200), nullable=False)
     role = Column(String(100), nullable=False)
-    base_salary = Column(Float, nullable=False, default=0.0)
+    base_salary = Column(Money, nullable=False, default=0.0)
 
     # Percentage add-ons (stored as decimal, e.g. 12 = 12%)
     pf_pct = Column(Float, default=12.0)
@@ -34,8 +56,8 @@ class Employee(Base):
     admin_pct = Column(Float, default=3.0)
 
     # Computed fields (cached for speed)
-    real_monthly_cost = Column(Float, default=0.0)
-    hourly_cost = Column(Float, default=0.0)
+    real_monthly_cost = Column(Money, default=0.0)
+    hourly_cost = Column(Money, default=0.0)
 
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -50,8 +72,9 @@ class Employee(Base):
             self.pf_pct + self.bonus_pct + self.leave_pct
             + self.infra_pct + self.admin_pct
         )
-        self.real_monthly_cost = round(self.base_salary * (1 + total_pct / 100), 2)
-        self.hourly_cost = round(self.real_monthly_cost / 22 / 8, 2)
+        real_monthly = mul_div(to_paise(self.base_salary), BP_PER_UNIT + pct_to_bp(total_pct), BP_PER_UNIT)
+        self.real_monthly_cost = from_paise(real_monthly)
+        self.hourly_cost = from_paise(mul_div(real_monthly, 1, HOURS_PER_MONTH))
 
     def __repr__(self):
         return f"<Employee {self.name} | {self.role} | ₹{self.hourly_cost}/hr>"
@@ -82,7 +105,7 @@ class StackCost(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(200), nullable=False)
     category = Column(String(100), default="General")
-    cost = Column(Float, default=0.0)
+    cost = Column(Money, default=0.0)
     billing_type = Column(
         String(20), default="one_time"
     )  # one_time | monthly | yearly | usage_based
@@ -103,7 +126,7 @@ class InfraCost(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(200), nullable=False)
     category = Column(String(100), default="General")
-    cost = Column(Float, default=0.0)
+    cost = Column(Money, default=0.0)
     billing_type = Column(String(20), default="one_time")
     notes = Column(Text, default="")
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -118,6 +141,7 @@ class InfraCost(Base):
 class Project(Base):
     """Top-level project record."""
     __tablename__ = "projects"
+    __table_args__ = (Index("ix_projects_status_client", "status", "client_name"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(300), nullable=False)
@@ -181,7 +205,7 @@ class ProjectModule(Base):
     __tablename__ = "project_modules"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     name = Column(String(300), nullable=False)
     description = Column(Text, default="")
 
@@ -189,9 +213,9 @@ class ProjectModule(Base):
     employee = relationship("Employee")
 
     estimated_hours = Column(Float, default=0.0)
-    hourly_rate_override = Column(Float, nullable=True)  # Optional override
+    hourly_rate_override = Column(Money, nullable=True)  # Optional override
 
-    cost = Column(Float, default=0.0)  # Computed
+    cost = Column(Money, default=0.0)  # Computed
 
     project = relationship("Project", back_populates="modules")
 
@@ -209,20 +233,20 @@ class Estimate(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, unique=True)
 
-    total_labor_cost = Column(Float, default=0.0)
-    total_infra_cost = Column(Float, default=0.0)
-    total_stack_cost = Column(Float, default=0.0)
-    gross_cost = Column(Float, default=0.0)
+    total_labor_cost = Column(Money, default=0.0)
+    total_infra_cost = Column(Money, default=0.0)
+    total_stack_cost = Column(Money, default=0.0)
+    gross_cost = Column(Money, default=0.0)
 
-    maintenance_buffer = Column(Float, default=0.0)
-    risk_contingency = Column(Float, default=0.0)
-    safe_cost = Column(Float, default=0.0)
+    maintenance_buffer = Column(Money, default=0.0)
+    risk_contingency = Column(Money, default=0.0)
+    safe_cost = Column(Money, default=0.0)
 
-    profit_amount = Column(Float, default=0.0)
-    final_price = Column(Float, default=0.0)
+    profit_amount = Column(Money, default=0.0)
+    final_price = Column(Money, default=0.0)
 
-    cost_per_function_point = Column(Float, default=0.0)
-    burn_rate_monthly = Column(Float, default=0.0)
+    cost_per_function_point = Column(Money, default=0.0)
+    burn_rate_monthly = Column(Money, default=0.0)
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -233,6 +257,30 @@ class Estimate(Base):
         return f"<Estimate Project#{self.project_id} Safe=₹{self.safe_cost}>"
 
 
+class EstimateRevision(Base):
+    """
+    One saved revision of a project's estimation inputs and outputs.
+    payload is zlib-compressed JSON: a full snapshot on keyframes, else a
+    delta against the previous revision (see app.revisions).
+    """
+    __tablename__ = "estimate_revisions"
+    __table_args__ = (
+        Index("ix_estimate_revisions_project_revision", "project_id", "revision", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    revision = Column(Integer, nullable=False)          # 1, 2, … per project
+    is_keyframe = Column(Boolean, nullable=False, default=False)
+    payload = Column(LargeBinary, nullable=False)
+    final_price = Column(Money, default=0.0)            # for listings without decoding
+    note = Column(String(200), default="")
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EstimateRevision Project#{self.project_id} r{self.revision}>"
+
+
 # ──────────────────────────────────────────────
 # ACTUALS
 # ──────────────────────────────────────────────
@@ -243,7 +291,7 @@ class Actual(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, unique=True)
 
-    actual_cost = Column(Float, default=0.0)
+    actual_cost = Column(Money, default=0.0)
     actual_duration_months = Column(Float, default=0.0)
     completion_date = Column(Date, nullable=True)
     notes = Column(Text, default="")
@@ -264,9 +312,9 @@ class MaintenanceRecord(Base):
     __tablename__ = "maintenance_records"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     year = Column(Integer, nullable=False)
-    annual_cost = Column(Float, default=0.0)
+    annual_cost = Column(Money, default=0.0)
     notes = Column(Text, default="")
 
     project = relationship("Project", back_populates="maintenance_records")
@@ -275,6 +323,137 @@ class MaintenanceRecord(Base):
         return f"<Maintenance Project#{self.project_id} Y{self.year} ₹{self.annual_cost}>"
 
 
+# ──────────────────────────────────────────────
+# PORTFOLIO AGGREGATES
+# ──────────────────────────────────────────────
+class PortfolioAggregate(Base):
+    """
+    Running portfolio totals per (dimension, key): dimension "all" (key "")
+    plus one row per status, app type, complexity, client and creation
+    month.  Maintained by SQLite triggers on projects, estimates and actuals
+    (see create_aggregate_triggers); read through app.aggregates.
+    """
+    __tablename__ = "portfolio_aggregates"
+    __table_args__ = (
+        Index("ix_portfolio_aggregates_dimension_key", "dimension", "key", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dimension = Column(String(20), nullable=False)
+    key = Column(String(300), nullable=False, default="")
+
+    project_count = Column(Integer, default=0)
+    estimate_count = Column(Integer, default=0)
+    pipeline_value = Column(Money, default=0.0)          # Σ estimate final_price
+    gross_cost = Column(Money, default=0.0)
+    profit_amount = Column(Money, default=0.0)
+    actual_count = Column(Integer, default=0)
+    actual_cost = Column(Money, default=0.0)
+    variance_count = Column(Integer, default=0)          # projects with actual and estimate > 0
+    variance_bp_total = Column(Integer, default=0)       # Σ variance in basis points
+
+    def __repr__(self):
+        return f"<PortfolioAggregate {self.dimension}={self.key!r} n={self.project_count}>"
+
+
+AGGREGATE_DIMENSIONS = {
+    "all": "NULL",
+    "status": "p.status",
+    "app_type": "p.app_type",
+    "complexity": "p.complexity",
+    "client": "p.client_name",
+    "month": "strftime('%Y-%m', p.created_at)",
+}
+AGGREGATE_MEASURES = (
+    "project_count", "estimate_count", "pipeline_value", "gross_cost", "profit_amount",
+    "actual_count", "actual_cost", "variance_count", "variance_bp_total",
+)
+
+# One project's contribution to each measure (money in paise; variance
+# rounded half-up to the basis point, as in calculate_variance).  Money
+# columns of databases upgraded in place keep REAL affinity, so paise are
+# cast to INTEGER to keep every sum and the variance division integral.
+_PROJECT_FACTS = """
+SELECT p.id AS project_id, {keys},
+       1 AS project_count,
+       e.id IS NOT NULL AS estimate_count,
+       coalesce(CAST(e.final_price AS INTEGER), 0) AS pipeline_value,
+       coalesce(CAST(e.gross_cost AS INTEGER), 0) AS gross_cost,
+       coalesce(CAST(e.profit_amount AS INTEGER), 0) AS profit_amount,
+       a.id IS NOT NULL AS actual_count,
+       coalesce(CAST(a.actual_cost AS INTEGER), 0) AS actual_cost,
+       CASE WHEN a.id IS NOT NULL AND e.final_price > 0 THEN 1 ELSE 0 END AS variance_count,
+       CASE WHEN a.id IS NOT NULL AND e.final_price > 0
+            THEN CAST((2 * abs(coalesce(CAST(a.actual_cost AS INTEGER), 0)
+                               - CAST(e.final_price AS INTEGER)) * 10000
+                       + CAST(e.final_price AS INTEGER))
+                      / (2 * CAST(e.final_price AS INTEGER)) AS INTEGER)
+            ELSE 0 END AS variance_bp_total
+FROM projects p
+LEFT JOIN estimates e ON e.project_id = p.id
+LEFT JOIN actuals a ON a.project_id = p.id"""
+
+# (table, project id column, columns whose change moves the aggregates)
+_AGGREGATE_SOURCES = (
+    ("projects", "id", ("status", "app_type", "complexity", "client_name", "created_at")),
+    ("estimates", "project_id", ("project_id", "final_price", "gross_cost", "profit_amount")),
+    ("actuals", "project_id", ("project_id", "actual_cost")),
+)
+
+
+def _aggregate_ddl():
+    keys = ", ".join(f"coalesce({expr}, '') AS key_{dim}" for dim, expr in AGGREGATE_DIMENSIONS.items())
+    measures = ", ".join(AGGREGATE_MEASURES)
+    yield f"CREATE VIEW IF NOT EXISTS portfolio_project_facts AS {_PROJECT_FACTS.format(keys=keys)}"
+    yield "CREATE VIEW IF NOT EXISTS portfolio_contributions AS " + " UNION ALL ".join(
+        f"SELECT project_id, '{dim}' AS dimension, key_{dim} AS key, {measures} "
+        f"FROM portfolio_project_facts" for dim in AGGREGATE_DIMENSIONS)
+
+    # Every write to a source row takes the affected projects' contribution
+    # out (BEFORE) and adds it back from the new state (AFTER).
+    upsert = ", ".join(f"{m} = {m} + excluded.{m}" for m in AGGREGATE_MEASURES)
+    rows = {"INSERT": ("NEW",), "UPDATE": ("OLD", "NEW"), "DELETE": ("OLD",)}
+    for table, pid, watched in _AGGREGATE_SOURCES:
+        for op, refs in rows.items():
+            ids = ", ".join(f"{r}.{pid}" for r in refs)
+            clause = f"{op} ON {table}"
+            if op == "UPDATE":
+                changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in watched)
+                clause = f"UPDATE OF {', '.join(watched)} ON {table} WHEN {changed}"
+            for timing, sign in (("BEFORE", "-"), ("AFTER", "")):
+                if table == "projects" and (timing, op) in (("BEFORE", "INSERT"), ("AFTER", "DELETE")):
+                    continue                    # the project row itself is absent
+                yield (
+                    f"CREATE TRIGGER IF NOT EXISTS trg_portfolio_{table}_{op.lower()}_{timing.lower()} "
+                    f"{timing} {clause} BEGIN "
+                    f"INSERT INTO portfolio_aggregates (dimension, key, {measures}) "
+                    f"SELECT dimension, key, {', '.join(sign + m for m in AGGREGATE_MEASURES)} "
+                    f"FROM portfolio_contributions WHERE project_id IN ({ids}) "
+                    f"ON CONFLICT (dimension, key) DO UPDATE SET {upsert}; END")
+
+
+def create_aggregate_triggers(conn):
+    """Create the aggregate views and triggers (idempotent; SQLite only)."""
+    for statement in _aggregate_ddl():
+        conn.execute(text(statement))
+
+
+def drop_aggregate_triggers(conn):
+    """Drop the aggregate triggers and views, e.g. to recreate them from the current DDL."""
+    for kind, pattern in (("trigger", "trg_portfolio_%"), ("view", "portfolio_%")):
+        names = conn.execute(text("SELECT name FROM sqlite_master WHERE type = :kind AND name LIKE :p"),
+                             {"kind": kind, "p": pattern}).scalars().all()
+        for name in names:
+            conn.execute(text(f"DROP {kind.upper()} {name}"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_aggregate_triggers(metadata, connection, **kw):
+    tables = {"projects", "estimates", "actuals", "portfolio_aggregates"}
+    if connection.dialect.name == "sqlite" and tables <= set(inspect(connection).get_table_names()):
+        create_aggregate_triggers(connection)
+
+
 # ──────────────────────────────────────────────
 # SYSTEM DYNAMIC CONFIGURATION
 # ──────────────────────────────────────────────
@@ -283,7 +462,7 @@ class SystemLookup(Base):
     __tablename__ = "system_lookup"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    category = Column(String(50), nullable=False)  # e.g., 'role', 'infra_category', 'stack_category', 'billing_type'
+    category = Column(String(50), nullable=False, index=True)  # e.g., 'role', 'infra_category', 'stack_category', 'billing_type'
     value = Column(String(100), nullable=False)
 
     def __repr__(self):
@@ -362,6 +541,11 @@ class IndustryPresetModule(Base):
 class AuditLog(Base):
     """Tracks financial edits for traceability."""
     __tablename__ = "audit_log"
+    __table_args__ = (
+        Index("ix_audit_log_record", "table_name", "record_id", "timestamp"),
+        Index("ix_audit_log_action", "action", "timestamp"),
+        Index("ix_audit_log_timestamp", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     table_name = Column(String(100), nullable=False)
@@ -374,3 +558,17 @@ class AuditLog(Base):
 
     def __repr__(self):
         return f"<Audit {self.action} {self.table_name}#{self.record_id}>"
+
+
+# ──────────────────────────────────────────────
+# APPLICATION METADATA
+# ──────────────────────────────────────────────
+class AppMeta(Base):
+    """Key/value facts about the database file itself (e.g. seed_version)."""
+    __tablename__ = "app_meta"
+
+    key = Column(String(50), primary_key=True)
+    value = Column(String(200), nullable=False)
+
+    def __repr__(self):
+        return f"<Meta {self.key}={self.value}>"
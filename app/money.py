@@ -0,0 +1,114 @@
+"""
+Apeiron CostEstimation Pro – Fixed-Point Money Core
+===================================================
+All monetary arithmetic runs on integer paise (₹1 = 100 paise).
+
+Rounding rules (deterministic, platform-independent):
+  • A float input is read by its shortest decimal repr (what the user typed),
+    so 1.005 is ₹1.005 – not the binary 1.00499999… – before rounding.
+  • Every rounding step is ROUND_HALF_UP (ties away from zero).
+  • Non-money factors are fixed-point integers too:
+      percentages → basis points (1% = 100 bp), multipliers → 1/10,000ths,
+      hours → 1/100ths of an hour.
+"""
+
+import math
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+PAISE_PER_RUPEE = 100
+BP_PER_UNIT = 10_000          # 100% = 10,000 basis points
+FACTOR_SCALE = 10_000         # multiplier 1.35 → 13,500
+HOURS_SCALE = 100             # 7.25 h → 725
+HOURS_PER_MONTH = 176         # 22 days × 8 hours
+
+_TIE_TOLERANCE = 1e-6
+
+
+# ──────────────────────────────────────────────
+# SCALAR CONVERSIONS
+# ──────────────────────────────────────────────
+def to_fixed(value, scale: int) -> int:
+    """Round value × scale half-up to an int, reading floats by their decimal repr."""
+    if isinstance(value, int):
+        return value * scale
+    scaled = value * scale
+    magnitude = abs(scaled)
+    frac = magnitude - math.floor(magnitude)
+    if abs(frac - 0.5) > _TIE_TOLERANCE:
+        rounded = math.floor(magnitude + 0.5)
+        return int(rounded) if scaled >= 0 else -int(rounded)
+    # Near a .5 tie the binary product is ambiguous; decide on the decimal value.
+    exact = Decimal(repr(float(value))) * scale
+    return int(exact.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_paise(rupees) -> int:
+    """₹ amount → integer paise."""
+    return to_fixed(rupees, PAISE_PER_RUPEE)
+
+
+def from_paise(paise: int) -> float:
+    """Integer paise → ₹ float (exact for any realistic amount)."""
+    return paise / PAISE_PER_RUPEE
+
+
+def pct_to_bp(pct) -> int:
+    """Percentage (12.5) → basis points (1250)."""
+    return to_fixed(pct, 100)
+
+
+def mul_div(value: int, numerator: int, denominator: int) -> int:
+    """value × numerator / denominator, rounded half-up (ties away from zero)."""
+    product = value * numerator
+    q, r = divmod(abs(product), denominator)
+    if 2 * r >= denominator:
+        q += 1
+    if (product < 0) != (denominator < 0):
+        return -q
+    return q
+
+
+def pct_of(paise: int, pct) -> int:
+    """pct% of an amount in paise."""
+    return mul_div(paise, pct_to_bp(pct), BP_PER_UNIT)
+
+
+# ──────────────────────────────────────────────
+# VECTORIZED CONVERSIONS (int64 arrays)
+# ──────────────────────────────────────────────
+def to_fixed_array(values, scale: int) -> np.ndarray:
+    """Element-wise to_fixed(); near-tie elements fall back to the exact path."""
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * scale
+    magnitude = np.abs(scaled)
+    out = np.floor(magnitude + 0.5).astype(np.int64) * np.where(scaled < 0, -1, 1)
+    ties = np.abs(magnitude - np.floor(magnitude) - 0.5) <= _TIE_TOLERANCE
+    if ties.any():
+        out[ties] = [to_fixed(float(v), scale) for v in values[ties]]
+    return out
+
+
+def to_paise_array(rupees) -> np.ndarray:
+    return to_fixed_array(rupees, PAISE_PER_RUPEE)
+
+
+def from_paise_array(paise) -> np.ndarray:
+    return np.asarray(paise, dtype=np.int64) / PAISE_PER_RUPEE
+
+
+def mul_div_array(values, numerator, denominator: int) -> np.ndarray:
+    """
+    Element-wise mul_div for non-negative int64 operands.
+    values is split into (q·d + r) so values × numerator never overflows;
+    requires numerator × denominator < 4.6e18.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    numerator = np.asarray(numerator, dtype=np.int64)
+    q, r = np.divmod(values, denominator)
+    return q * numerator + (2 * r * numerator + denominator) // (2 * denominator)
+
+
+def pct_of_array(paise, pct) -> np.ndarray:
+    return mul_div_array(paise, to_fixed_array(pct, 100), BP_PER_UNIT)
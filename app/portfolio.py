@@ -0,0 +1,321 @@
+"""
+Apeiron CostEstimation Pro – Portfolio Repricing
+================================================
+Re-runs the estimation pipeline for every estimated project after master data
+(multipliers, employee rates) changes, writes the refreshed Estimate,
+MaintenanceRecord and module costs back, appends a revision to each
+project's estimate history, and reports old → new deltas.
+
+Projects and modules are read with two bulk SELECTs, priced in chunks by
+the vectorized batch engine across a process pool, and written back with
+executemany statements, one transaction per chunk.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sqlalchemy import select, update, delete, insert
+
+from app.batch import run_batch_estimation, scenario_multipliers
+from app.config_registry import get_config
+from app.logic import DEFAULT_STAGES
+from app.models import Project, ProjectModule, Employee, Estimate, MaintenanceRecord
+from app.revisions import estimate_document, save_revisions
+
+CHUNK_SIZE = 5_000
+MAINTENANCE_YEARS = 5
+MAINTENANCE_ANNUAL_PCT = 15.0
+
+_STAGE_COLUMNS = {
+    "Planning": Project.stage_planning_pct,
+    "Design": Project.stage_design_pct,
+    "Development": Project.stage_development_pct,
+    "Testing": Project.stage_testing_pct,
+    "Deployment": Project.stage_deployment_pct,
+}
+
+_PROJECT_COLUMNS = (
+    Project.id, Project.name, Project.complexity, Project.app_type, Project.region_id,
+    Project.function_points, Project.estimated_duration_months,
+    Project.maintenance_buffer_pct, Project.risk_contingency_pct, Project.profit_margin_pct,
+    *_STAGE_COLUMNS.values(),
+    Estimate.id, Estimate.total_infra_cost, Estimate.total_stack_cost, Estimate.final_price,
+)
+
+
+def _floats(values, default) -> np.ndarray:
+    return np.array([default if v is None else v for v in values], dtype=np.float64)
+
+
+# ──────────────────────────────────────────────
+# BULK LOAD
+# ──────────────────────────────────────────────
+def load_portfolio(session, include_unestimated: bool = False) -> dict:
+    """
+    Read every project that has an estimate (every project with
+    include_unestimated) with its modules as flat columns.  Module rows
+    are packed into padded (N, K) matrices; rate resolution matches
+    calculate_module_cost (override → employee → 0).  Infra/stack totals
+    are the ones stored on the project's estimate.
+    """
+    projects = select(*_PROJECT_COLUMNS).join(
+        Estimate, Estimate.project_id == Project.id, isouter=include_unestimated)
+    projects = session.execute(projects.order_by(Project.id)).all()
+    modules = select(ProjectModule.id, ProjectModule.project_id, ProjectModule.estimated_hours,
+                     ProjectModule.hourly_rate_override, Employee.hourly_cost) \
+        .outerjoin(Employee, Employee.id == ProjectModule.employee_id)
+    if not include_unestimated:
+        modules = modules.join(Estimate, Estimate.project_id == ProjectModule.project_id)
+    modules = session.execute(modules.order_by(ProjectModule.project_id, ProjectModule.id)).all()
+
+    cols = list(zip(*projects)) or [()] * len(_PROJECT_COLUMNS)
+    ids = np.array(cols[0], dtype=np.int64)
+    n = len(ids)
+
+    m_cols = list(zip(*modules)) or [()] * 5
+    m_project = np.array(m_cols[1], dtype=np.int64)
+    row = np.searchsorted(ids, m_project)
+    slot = np.arange(len(m_project)) - np.searchsorted(m_project, m_project)
+    counts = np.bincount(row, minlength=n)
+    k = max(int(counts.max(initial=0)), 1)
+
+    hours = np.zeros((n, k))
+    rates = np.zeros((n, k))
+    module_id = np.zeros((n, k), dtype=np.int64)     # 0 marks padding
+    hours[row, slot] = _floats(m_cols[2], 0.0)
+    rates[row, slot] = [o if o is not None else (e or 0.0) for o, e in zip(m_cols[3], m_cols[4])]
+    module_id[row, slot] = m_cols[0]
+
+    return {
+        "project_id": ids,
+        "name": list(cols[1]),
+        "complexity": list(cols[2]),
+        "app_type": list(cols[3]),
+        "region_id": list(cols[4]),
+        "function_points": _floats(cols[5], 0),
+        "estimated_duration_months": _floats(cols[6], 0.0),
+        "maintenance_buffer_pct": _floats(cols[7], 15.0),
+        "risk_contingency_pct": _floats(cols[8], 10.0),
+        "profit_margin_pct": _floats(cols[9], 20.0),
+        "stage_pcts": {stage: _floats(cols[10 + i], DEFAULT_STAGES[stage])
+                       for i, stage in enumerate(_STAGE_COLUMNS)},
+        "estimate_id": list(cols[15]),
+        "infra_total": _floats(cols[16], 0.0),
+        "stack_total": _floats(cols[17], 0.0),
+        "old_final_price": _floats(cols[18], 0.0),
+        "module_count": counts,
+        "module_id": module_id,
+        "hours": hours,
+        "rates": rates,
+    }
+
+
+# ──────────────────────────────────────────────
+# PRICING (runs in worker processes)
+# ──────────────────────────────────────────────
+def _price_chunk(kwargs: dict) -> dict:
+    """Price one chunk with the batch engine; return only what is written back."""
+    r = run_batch_estimation(
+        maintenance_years=MAINTENANCE_YEARS,
+        maintenance_annual_pct=MAINTENANCE_ANNUAL_PCT,
+        **kwargs,
+    )
+    return {
+        "module_costs": r["labor"]["module_costs"],
+        "total_labor_cost": r["labor"]["adjusted_labor_total"],
+        "total_infra_cost": r["infra_stack"]["infra_total"],
+        "total_stack_cost": r["infra_stack"]["stack_total"],
+        "gross_cost": r["gross_cost"],
+        "maintenance_buffer": r["risk_buffer"]["maintenance_buffer"],
+        "risk_contingency": r["risk_buffer"]["risk_contingency"],
+        "safe_cost": r["risk_buffer"]["safe_cost"],
+        "profit_amount": r["final_pricing"]["profit_amount"],
+        "final_price": r["final_pricing"]["final_price"],
+        "cost_per_function_point": r["analytics"]["cost_per_function_point"],
+        "burn_rate_monthly": r["analytics"]["burn_rate_monthly"],
+        "maintenance_annual": r["maintenance_forecast"]["annual_cost"],
+    }
+
+
+def _chunks(portfolio: dict, multipliers: dict, chunk_size: int):
+    """
+    Yield (rows, batch kwargs) per chunk.  Projects are ordered by module
+    count so each chunk is padded only to its own widest project.
+    """
+    order = np.argsort(portfolio["module_count"], kind="stable")
+    for start in range(0, len(order), chunk_size):
+        rows = order[start:start + chunk_size]
+        k = max(int(portfolio["module_count"][rows].max()), 1)
+        yield rows, {
+            "hours": portfolio["hours"][rows, :k],
+            "rates": portfolio["rates"][rows, :k],
+            **{name: values[rows] for name, values in multipliers.items()},
+            "infra_total": portfolio["infra_total"][rows],
+            "stack_total": portfolio["stack_total"][rows],
+            "maintenance_buffer_pct": portfolio["maintenance_buffer_pct"][rows],
+            "risk_contingency_pct": portfolio["risk_contingency_pct"][rows],
+            "profit_margin_pct": portfolio["profit_margin_pct"][rows],
+            "stage_pcts": {s: v[rows] for s, v in portfolio["stage_pcts"].items()},
+            "function_points": portfolio["function_points"][rows],
+            "estimated_duration_months": portfolio["estimated_duration_months"][rows],
+        }
+
+
+# ──────────────────────────────────────────────
+# WRITE-BACK
+# ──────────────────────────────────────────────
+_ESTIMATE_FIELDS = (
+    "total_labor_cost", "total_infra_cost", "total_stack_cost", "gross_cost",
+    "maintenance_buffer", "risk_contingency", "safe_cost", "profit_amount",
+    "final_price", "cost_per_function_point", "burn_rate_monthly",
+)
+
+
+_MULTIPLIERS = ("complexity_multiplier", "app_type_adjustment", "region_multiplier")
+_PERCENTAGES = ("maintenance_buffer_pct", "risk_contingency_pct", "profit_margin_pct",
+                "function_points", "estimated_duration_months")
+
+
+def _revision_documents(session, portfolio: dict, rows, kwargs: dict, priced: dict,
+                        fields: dict) -> dict:
+    """{project_id: revision document} for one priced chunk."""
+    ids = portfolio["project_id"][rows].tolist()
+    names = {mid: (name, eid) for mid, name, eid in session.execute(
+        select(ProjectModule.id, ProjectModule.name, ProjectModule.employee_id)
+        .where(ProjectModule.project_id.in_(ids)))}
+    k = priced["module_costs"].shape[1]
+    mod_ids = portfolio["module_id"][rows, :k].tolist()
+    hours, rates = kwargs["hours"].tolist(), kwargs["rates"].tolist()
+    costs = priced["module_costs"].tolist()
+    annual = priced["maintenance_annual"].tolist()
+    columns = {name: kwargs[name].tolist() for name in _MULTIPLIERS + _PERCENTAGES}
+    stages = {s: v.tolist() for s, v in kwargs["stage_pcts"].items()}
+    infra, stack = kwargs["infra_total"].tolist(), kwargs["stack_total"].tolist()
+
+    documents = {}
+    for i, row in enumerate(rows.tolist()):
+        inputs = {"complexity": portfolio["complexity"][row], "app_type": portfolio["app_type"][row],
+                  "region_id": portfolio["region_id"][row],
+                  **{name: values[i] for name, values in columns.items()},
+                  "stage_pcts": {s: v[i] for s, v in stages.items()},
+                  "infra_total": infra[i], "stack_total": stack[i]}
+        modules = [{"id": mid, "name": names[mid][0], "employee_id": names[mid][1],
+                    "hours": hours[i][j], "rate": rates[i][j], "cost": costs[i][j]}
+                   for j, mid in enumerate(mod_ids[i]) if mid > 0]
+        results = {f: fields[f][i] for f in _ESTIMATE_FIELDS}
+        results["maintenance_annual"] = annual[i]
+        documents[ids[i]] = estimate_document(inputs, modules, results)
+    return documents
+
+
+def _write_chunk(session, portfolio: dict, rows, priced: dict, kwargs: dict):
+    """Persist one priced chunk (and its revisions) in a single transaction."""
+    ids = portfolio["project_id"][rows].tolist()
+    fields = {f: priced[f].tolist() for f in _ESTIMATE_FIELDS}
+    updates, inserts = [], []
+    for i, row in enumerate(rows.tolist()):
+        values = {f: fields[f][i] for f in _ESTIMATE_FIELDS}
+        est_id = portfolio["estimate_id"][row]
+        if est_id is None:
+            inserts.append({"project_id": ids[i], **values})
+        else:
+            updates.append({"id": est_id, **values})
+
+    k = priced["module_costs"].shape[1]
+    mod_ids = portfolio["module_id"][rows, :k]
+    mask = mod_ids > 0
+    module_updates = [{"id": mid, "cost": cost} for mid, cost in
+                      zip(mod_ids[mask].tolist(), priced["module_costs"][mask].tolist())]
+
+    annual = priced["maintenance_annual"].tolist()
+    maintenance = [{"project_id": pid, "year": y, "annual_cost": cost}
+                   for pid, cost in zip(ids, annual)
+                   for y in range(1, MAINTENANCE_YEARS + 1)]
+
+    if updates:
+        session.execute(update(Estimate), updates)
+    if inserts:
+        session.execute(insert(Estimate), inserts)
+    if module_updates:
+        session.execute(update(ProjectModule), module_updates)
+    session.execute(delete(MaintenanceRecord).where(MaintenanceRecord.project_id.in_(ids)))
+    if maintenance:
+        session.execute(insert(MaintenanceRecord), maintenance)
+    save_revisions(session, _revision_documents(session, portfolio, rows, kwargs, priced, fields),
+                   note="Portfolio reprice")
+    session.commit()
+
+
+# ──────────────────────────────────────────────
+# ENTRY POINT
+# ──────────────────────────────────────────────
+def reprice_portfolio(session, workers: int = None, chunk_size: int = CHUNK_SIZE,
+                      dry_run: bool = False, progress=None,
+                      include_unestimated: bool = False) -> dict:
+    """
+    Reprice every estimated project against the current master data.
+
+    workers: process count (default: CPU count; ≤ 1 prices in-process).
+    dry_run: compute and report without writing.
+    progress: optional callable(done_projects, total_projects).
+    include_unestimated: also price projects that have no estimate yet
+    (drafts), creating their Estimate and maintenance rows.
+
+    Returns {"projects", "changed", "total_old", "total_new", "total_delta",
+    "deltas": [{project_id, name, old_final_price, new_final_price, delta}]}
+    with deltas sorted by absolute size.
+    """
+    portfolio = load_portfolio(session, include_unestimated)
+    total = len(portfolio["project_id"])
+    config = get_config(session)
+    region_names = [getattr(config.region_by_id(rid), "name", None)
+                    for rid in portfolio["region_id"]]
+    multipliers = scenario_multipliers(
+        session, portfolio["complexity"], portfolio["app_type"], region_names)
+
+    new_final = np.zeros(total)
+    chunks = list(_chunks(portfolio, multipliers, chunk_size))
+    workers = os.cpu_count() if workers is None else workers
+    done = 0
+
+    def consume(results):
+        nonlocal done
+        for (rows, kwargs), priced in zip(chunks, results):
+            new_final[rows] = priced["final_price"]
+            if not dry_run:
+                _write_chunk(session, portfolio, rows, priced, kwargs)
+            done += len(rows)
+            if progress:
+                progress(done, total)
+
+    if workers <= 1 or len(chunks) <= 1:
+        consume(_price_chunk(kw) for _, kw in chunks)
+    else:
+        # spawn, not fork: the caller may be a running Qt application
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            consume(pool.map(_price_chunk, [kw for _, kw in chunks]))
+
+    old_final = portfolio["old_final_price"]
+    delta = np.round(new_final - old_final, 2)
+    changed = np.flatnonzero(delta)
+    changed = changed[np.argsort(-np.abs(delta[changed]), kind="stable")]
+    return {
+        "projects": total,
+        "changed": len(changed),
+        "total_old": round(float(old_final.sum()), 2),
+        "total_new": round(float(new_final.sum()), 2),
+        "total_delta": round(float(delta.sum()), 2),
+        "deltas": [
+            {
+                "project_id": int(portfolio["project_id"][i]),
+                "name": portfolio["name"][i],
+                "old_final_price": float(old_final[i]),
+                "new_final_price": float(new_final[i]),
+                "delta": float(delta[i]),
+            }
+            for i in changed
+        ],
+    }
@@ -0,0 +1,103 @@
+"""
+Apeiron CostEstimation Pro – Project Repository
+===============================================
+Purpose-built loaders for the screens that read a saved project with its
+estimate, actual, maintenance schedule and modules (with employees).
+
+Each loader eager-loads everything the screen touches in a fixed number
+of queries (one for the projects with their estimate and actual joined,
+one for the modules with their employees, one for the maintenance rows),
+independent of the module count, and returns immutable views, so callers
+cannot trigger lazy loads by accident.
+"""
+
+from collections import namedtuple
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import Project, ProjectModule
+
+STAGES = ("Planning", "Design", "Development", "Testing", "Deployment")
+
+ModuleView = namedtuple("ModuleView", "id name estimated_hours cost employee_name")
+EstimateView = namedtuple(
+    "EstimateView",
+    "total_labor_cost total_infra_cost total_stack_cost gross_cost maintenance_buffer "
+    "risk_contingency safe_cost profit_amount final_price cost_per_function_point "
+    "burn_rate_monthly",
+)
+ActualView = namedtuple("ActualView", "actual_cost actual_duration_months completion_date notes")
+MaintenanceView = namedtuple("MaintenanceView", "year annual_cost")
+
+
+class ProjectView(namedtuple("ProjectView", (
+        "id name client_name description app_type complexity function_points "
+        "estimated_duration_months status stage_pcts estimate actual maintenance modules"))):
+    """
+    A saved project, fully hydrated.  stage_pcts: {stage: %}; estimate and
+    actual are None when missing; maintenance is sorted by year.
+    """
+
+    __slots__ = ()
+
+    def stage_distribution(self) -> dict:
+        """Gross cost split across the stages (empty without an estimate)."""
+        if self.estimate is None:
+            return {}
+        return {s: self.estimate.gross_cost * pct / 100 for s, pct in self.stage_pcts.items()}
+
+    def maintenance_forecast(self) -> list:
+        return [{"year": m.year, "annual_cost": m.annual_cost,
+                 "cumulative_cost": m.annual_cost * m.year} for m in self.maintenance]
+
+
+# ──────────────────────────────────────────────
+# LOADERS
+# ──────────────────────────────────────────────
+def _hydrated():
+    return (
+        joinedload(Project.estimate),
+        joinedload(Project.actual),
+        selectinload(Project.modules).joinedload(ProjectModule.employee),
+        selectinload(Project.maintenance_records),
+    )
+
+
+def _view(p: Project) -> ProjectView:
+    est, act = p.estimate, p.actual
+    return ProjectView(
+        id=p.id, name=p.name, client_name=p.client_name, description=p.description or "",
+        app_type=p.app_type, complexity=p.complexity, function_points=p.function_points,
+        estimated_duration_months=p.estimated_duration_months, status=p.status,
+        stage_pcts={s: getattr(p, f"stage_{s.lower()}_pct") for s in STAGES},
+        estimate=None if est is None else EstimateView(
+            *(getattr(est, f) for f in EstimateView._fields)),
+        actual=None if act is None else ActualView(
+            *(getattr(act, f) for f in ActualView._fields)),
+        maintenance=tuple(MaintenanceView(m.year, m.annual_cost)
+                          for m in sorted(p.maintenance_records, key=lambda m: m.year)),
+        modules=tuple(ModuleView(m.id, m.name, m.estimated_hours, m.cost,
+                                 m.employee.name if m.employee else None)
+                      for m in p.modules),
+    )
+
+
+def load_project_for_analysis(session, pid: int):
+    """The Analysis tab's project (estimate, actual, maintenance, modules); None if missing."""
+    p = session.query(Project).options(*_hydrated()).filter(Project.id == pid).one_or_none()
+    return None if p is None else _view(p)
+
+
+def load_project_for_proposal(session, pid: int):
+    """The Proposal tab's project; same shape as the analysis view."""
+    return load_project_for_analysis(session, pid)
+
+
+def load_projects_for_export(session, ids) -> list:
+    """Views for `ids` in the given order (missing ids skipped), in three queries."""
+    ids = list(ids)
+    if not ids:
+        return []
+    found = {p.id: p for p in session.query(Project).options(*_hydrated())
+             .filter(Project.id.in_(ids))}
+    return [_view(found[i]) for i in ids if i in found]
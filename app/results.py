@@ -0,0 +1,376 @@
+"""
+Apeiron CostEstimation Pro – Estimation Result Types
+====================================================
+Compact containers for pipeline results.
+
+EstimationResult and its sections are `__slots__` records (no per-object
+__dict__) that still behave like the nested dicts the UI and PDF code
+index into: result["risk_buffer"]["safe_cost"], .get(), .items(),
+iteration and equality with plain dicts all work.
+
+BatchEstimationResult is the columnar form: one float64 array per field
+for N scenarios, roughly 200 bytes per scenario instead of a tree of
+dicts.  Indexing it with an int materialises one EstimationResult.
+"""
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from app.money import to_paise, from_paise, to_paise_array, from_paise_array
+
+
+# ──────────────────────────────────────────────
+# DICT-COMPATIBLE SLOTTED RECORD
+# ──────────────────────────────────────────────
+class _Record:
+    """Base for slotted records with read/write dict-style access."""
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+        for name, value in kwargs.items():
+            self[name] = value
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        return cls(*(mapping[name] for name in cls.__slots__))
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return [getattr(self, k) for k in self.__slots__]
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.__slots__]
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __eq__(self, other):
+        if not isinstance(other, (_Record, Mapping)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            k in other and getattr(self, k) == other[k] for k in self.__slots__)
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def to_dict(self) -> dict:
+        """Plain nested dicts/lists (e.g. for JSON)."""
+        return {k: _plain(getattr(self, k)) for k in self.__slots__}
+
+    def __repr__(self):
+        body = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}({body})"
+
+
+Mapping.register(_Record)
+
+
+def _plain(value):
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, (_RowSequence, list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+class _RowSequence(Sequence):
+    """Read-only sequence of dict rows generated from parallel columns."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if not isinstance(other, (Sequence, _RowSequence)) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+# ──────────────────────────────────────────────
+# SECTIONS
+# ──────────────────────────────────────────────
+class ModuleCosts(_RowSequence):
+    """module_costs rows ({"name", "hours", "cost"}) stored as three tuples."""
+
+    __slots__ = ("names", "hours", "costs")
+
+    def __init__(self, names, hours, costs):
+        self.names, self.hours, self.costs = tuple(names), tuple(hours), tuple(costs)
+
+    @classmethod
+    def from_rows(cls, rows):
+        rows = list(rows)
+        return cls((r["name"] for r in rows), (r["hours"] for r in rows), (r["cost"] for r in rows))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return {"name": self.names[i], "hours": self.hours[i], "cost": self.costs[i]}
+
+    def __getstate__(self):
+        return self.names, self.hours, self.costs
+
+    def __setstate__(self, state):
+        self.names, self.hours, self.costs = state
+
+
+class MaintenanceForecast(_RowSequence):
+    """Per-year rows ({"year", "annual_cost", "cumulative_cost"}) from one annual cost."""
+
+    __slots__ = ("annual_cost", "years")
+
+    def __init__(self, annual_cost: float, years: int):
+        self.annual_cost, self.years = annual_cost, years
+
+    @classmethod
+    def from_rows(cls, rows):
+        rows = list(rows)
+        return cls(rows[0]["annual_cost"] if rows else 0.0, len(rows))
+
+    def __len__(self):
+        return self.years
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += self.years
+        if not 0 <= i < self.years:
+            raise IndexError(i)
+        y = i + 1
+        return {"year": y, "annual_cost": self.annual_cost,
+                "cumulative_cost": from_paise(to_paise(self.annual_cost) * y)}
+
+    def __getstate__(self):
+        return self.annual_cost, self.years
+
+    def __setstate__(self, state):
+        self.annual_cost, self.years = state
+
+
+class LaborCost(_Record):
+    __slots__ = ("module_costs", "raw_labor_total", "complexity_multiplier",
+                 "app_type_adjustment", "adjusted_labor_total")
+
+
+class InfraStackTotal(_Record):
+    __slots__ = ("infra_total", "stack_total", "combined_total")
+
+
+class RiskBuffer(_Record):
+    __slots__ = ("gross_cost", "maintenance_buffer", "risk_contingency", "safe_cost")
+
+
+class FinalPricing(_Record):
+    __slots__ = ("safe_cost", "profit_amount", "profit_margin_pct", "final_price")
+
+
+class StageDistribution(_Record):
+    __slots__ = ("Planning", "Design", "Development", "Testing", "Deployment")
+
+
+class Analytics(_Record):
+    __slots__ = ("total_hours", "person_months", "cost_per_function_point",
+                 "burn_rate_monthly", "revenue_margin_pct")
+
+
+class EstimationResult(_Record):
+    """The run_full_estimation result: sections as slotted records."""
+
+    __slots__ = ("labor", "infra_stack", "gross_cost", "risk_buffer", "final_pricing",
+                 "stage_distribution", "maintenance_forecast", "analytics")
+
+    @classmethod
+    def from_sections(cls, labor, infra_stack, gross_cost, risk_buffer, final_pricing,
+                      stage_distribution, maintenance_forecast, analytics,
+                      compact_modules: bool = True) -> "EstimationResult":
+        """
+        Build from the dict/list outputs of the calculate_* functions.
+        compact_modules=False keeps labor["module_costs"] as given (e.g. a
+        list the caller updates in place, or a lazily read spill).
+        """
+        labor = LaborCost.from_mapping(labor)
+        if compact_modules and isinstance(labor.module_costs, list):
+            labor.module_costs = ModuleCosts.from_rows(labor.module_costs)
+        return cls(
+            labor,
+            InfraStackTotal.from_mapping(infra_stack),
+            gross_cost,
+            RiskBuffer.from_mapping(risk_buffer),
+            FinalPricing.from_mapping(final_pricing),
+            StageDistribution.from_mapping(stage_distribution),
+            MaintenanceForecast.from_rows(maintenance_forecast),
+            Analytics.from_mapping(analytics),
+        )
+
+
+# ──────────────────────────────────────────────
+# COLUMNAR BATCH FORM
+# ──────────────────────────────────────────────
+_SECTION_FIELDS = {
+    "labor": LaborCost.__slots__[1:],
+    "infra_stack": InfraStackTotal.__slots__,
+    "risk_buffer": RiskBuffer.__slots__,
+    "final_pricing": FinalPricing.__slots__,
+    "stage_distribution": StageDistribution.__slots__,
+    "analytics": Analytics.__slots__,
+}
+
+
+class BatchEstimationResult:
+    """
+    N results as columns.  result["labor"]["adjusted_labor_total"] is an
+    (N,) array, module costs and hours are (N, K), and the maintenance
+    forecast is derived from the (N,) annual cost.  result[i] is scenario
+    i as an EstimationResult.
+    """
+
+    __slots__ = ("columns", "gross_cost", "module_costs", "module_hours", "module_names",
+                 "maintenance_annual", "maintenance_years")
+
+    def __init__(self, columns: dict, gross_cost, module_costs, module_hours,
+                 maintenance_annual, maintenance_years: int, module_names=None):
+        self.columns = columns                   # section → {field: (N,) array}
+        self.gross_cost = gross_cost
+        self.module_costs = module_costs         # (N, K)
+        self.module_hours = module_hours         # (N, K), may be a broadcast view
+        self.module_names = module_names         # K names or None
+        self.maintenance_annual = maintenance_annual
+        self.maintenance_years = maintenance_years
+
+    @classmethod
+    def from_results(cls, results) -> "BatchEstimationResult":
+        """
+        Pack scalar results (EstimationResults or dicts) into columns.  All
+        results must have the same modules and maintenance horizon.
+        """
+        results = list(results)
+        n = len(results)
+
+        def column(values):
+            return np.fromiter(values, dtype=np.float64, count=n)
+
+        columns = {
+            section: {f: column(r[section][f] for r in results) for f in fields}
+            for section, fields in _SECTION_FIELDS.items()
+        }
+        modules = [r["labor"]["module_costs"] for r in results]
+        k = len(modules[0]) if modules else 0
+        if any(len(m) != k for m in modules):
+            raise ValueError("All results must have the same number of modules")
+        if any(len(r["maintenance_forecast"]) != len(results[0]["maintenance_forecast"])
+               for r in results):
+            raise ValueError("All results must have the same maintenance horizon")
+        costs = np.empty((n, k))
+        hours = np.empty((n, k))
+        for i, rows in enumerate(modules):
+            for j, row in enumerate(rows):
+                costs[i, j], hours[i, j] = row["cost"], row["hours"]
+        forecasts = [r["maintenance_forecast"] for r in results]
+        return cls(
+            columns,
+            column(r["gross_cost"] for r in results),
+            costs, hours,
+            column(f[0]["annual_cost"] if len(f) else 0.0 for f in forecasts),
+            len(forecasts[0]) if forecasts else 0,
+            module_names=tuple(m["name"] for m in modules[0]) if modules else (),
+        )
+
+    def __len__(self):
+        return len(self.gross_cost)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the result arrays (a shared, broadcast hours row counts once)."""
+        arrays = [a for section in self.columns.values() for a in section.values()]
+        arrays += [self.gross_cost, self.maintenance_annual, self.module_costs]
+        hours = self.module_hours
+        hours_bytes = hours[:1].nbytes if hours.strides[0] == 0 else hours.nbytes
+        return sum(a.nbytes for a in arrays) + hours_bytes
+
+    def section(self, key: str):
+        """One section as {field: array} (gross_cost as a bare array)."""
+        if key == "gross_cost":
+            return self.gross_cost
+        if key == "labor":
+            return {"module_costs": self.module_costs, **self.columns["labor"]}
+        if key == "maintenance_forecast":
+            years = np.arange(1, self.maintenance_years + 1)
+            return {"year": years, "annual_cost": self.maintenance_annual,
+                    "cumulative_cost": from_paise_array(
+                        to_paise_array(self.maintenance_annual)[:, None] * years)}
+        if key not in self.columns:
+            raise KeyError(key)
+        return self.columns[key]
+
+    def scenario(self, i: int) -> EstimationResult:
+        """Scenario i as a scalar EstimationResult."""
+        c = self.columns
+
+        def row(cls, section):
+            return cls(**{f: c[section][f][i].item() for f in _SECTION_FIELDS[section]})
+
+        k = self.module_costs.shape[1]
+        names = self.module_names or tuple(f"Module {j + 1}" for j in range(k))
+        labor = row(LaborCost, "labor")
+        labor.module_costs = ModuleCosts(names, self.module_hours[i].tolist(),
+                                         self.module_costs[i].tolist())
+        return EstimationResult(
+            labor, row(InfraStackTotal, "infra_stack"), self.gross_cost[i].item(),
+            row(RiskBuffer, "risk_buffer"), row(FinalPricing, "final_pricing"),
+            row(StageDistribution, "stage_distribution"),
+            MaintenanceForecast(self.maintenance_annual[i].item(), self.maintenance_years),
+            row(Analytics, "analytics"),
+        )
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.section(key)
+        return self.scenario(key)
+
+    def __iter__(self):
+        return (self.scenario(i) for i in range(len(self)))
+
+    def keys(self):
+        return EstimationResult.__slots__
+
+    def get(self, key, default=None):
+        return self.section(key) if key in EstimationResult.__slots__ else default
+
@@ -0,0 +1,268 @@
+"""
+Apeiron CostEstimation Pro – Estimate Revision History
+======================================================
+Every re-estimation of a project is kept as a revision of one JSON
+document (see estimate_document):
+
+    {"inputs":  {complexity, app_type, region_id, the three multipliers,
+                 percentages, stage_pcts, infra_total, stack_total, …},
+     "modules": [{id, name, employee_id, hours, rate, cost}, …],
+     "results": {the Estimate columns, maintenance_annual}}
+
+Documents are stored flattened to path → leaf maps
+("modules[3].cost" → 41250.0).  Revision 1, and every
+KEYFRAME_INTERVAL-th revision after it, stores the full map (a keyframe);
+the others store only the delta against the previous revision:
+
+    {"set": {path: new value, …}, "del": [path, …]}
+
+Payloads are zlib-compressed JSON.  Loading revision r reads the rows from
+its keyframe up to r in one indexed range query (at most KEYFRAME_INTERVAL
+rows) and replays the deltas, so the cost does not grow with history
+length; diffing two revisions loads both and compares their flat maps.
+
+Revisions are written in the caller's transaction (no commit here).
+Saving a document identical to the latest revision is a no-op.
+"""
+
+import json
+import re
+import zlib
+from collections import namedtuple
+from datetime import date, datetime
+
+from sqlalchemy import select, func, insert, and_
+
+from app.models import EstimateRevision
+
+KEYFRAME_INTERVAL = 16
+
+RevisionInfo = namedtuple("RevisionInfo", "revision created_at final_price note is_keyframe")
+
+
+# ──────────────────────────────────────────────
+# DOCUMENTS
+# ──────────────────────────────────────────────
+MODULE_FIELDS = ("id", "name", "employee_id", "hours", "rate", "cost")
+
+
+def estimate_document(inputs: dict, modules, results: dict) -> dict:
+    """The revision document for one estimation run."""
+    return {
+        "inputs": dict(inputs),
+        "modules": [{f: m.get(f) for f in MODULE_FIELDS} for m in modules],
+        "results": dict(results),
+    }
+
+
+def estimation_results(r) -> dict:
+    """The "results" section from a run_full_estimation result."""
+    forecast = r["maintenance_forecast"]
+    return {
+        "total_labor_cost": r["labor"]["adjusted_labor_total"],
+        "total_infra_cost": r["infra_stack"]["infra_total"],
+        "total_stack_cost": r["infra_stack"]["stack_total"],
+        "gross_cost": r["gross_cost"],
+        "maintenance_buffer": r["risk_buffer"]["maintenance_buffer"],
+        "risk_contingency": r["risk_buffer"]["risk_contingency"],
+        "safe_cost": r["risk_buffer"]["safe_cost"],
+        "profit_amount": r["final_pricing"]["profit_amount"],
+        "final_price": r["final_pricing"]["final_price"],
+        "cost_per_function_point": r["analytics"]["cost_per_function_point"],
+        "burn_rate_monthly": r["analytics"]["burn_rate_monthly"],
+        "maintenance_annual": forecast[0]["annual_cost"] if len(forecast) else 0.0,
+    }
+
+
+def _flatten(value, path: str = "", out: dict = None) -> dict:
+    out = {} if out is None else out
+    if isinstance(value, dict) and value:
+        for key, v in value.items():
+            key = str(key)
+            if "." in key or "[" in key:
+                raise ValueError(f"Document keys may not contain '.' or '[': {key!r}")
+            _flatten(v, f"{path}.{key}" if path else key, out)
+    elif isinstance(value, (list, tuple)) and value:
+        for i, v in enumerate(value):
+            _flatten(v, f"{path}[{i}]", out)
+    else:
+        out[path] = list(value) if isinstance(value, tuple) else value
+    return out
+
+
+_TOKEN = re.compile(r"([^.\[\]]+)|\[(\d+)\]")
+
+
+def _unflatten(flat: dict) -> dict:
+    root = {}
+    for path, leaf in flat.items():
+        tokens = [int(i) if i else key for key, i in _TOKEN.findall(path)]
+        node = root
+        for tok, nxt in zip(tokens, tokens[1:]):
+            child = [] if isinstance(nxt, int) else {}
+            if isinstance(tok, int):
+                node.extend([None] * (tok + 1 - len(node)))
+                node[tok] = child if node[tok] is None else node[tok]
+                node = node[tok]
+            else:
+                node = node.setdefault(tok, child)
+        last = tokens[-1]
+        if isinstance(last, int):
+            node.extend([None] * (last + 1 - len(node)))
+        node[last] = leaf
+    return root
+
+
+def _json_default(value):
+    if hasattr(value, "item"):                    # numpy scalars
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serialisable: {type(value).__name__}")
+
+
+def _encode(obj) -> bytes:
+    return zlib.compress(json.dumps(obj, separators=(",", ":"), default=_json_default).encode())
+
+
+def _decode(payload: bytes):
+    return json.loads(zlib.decompress(payload))
+
+
+def _delta(old: dict, new: dict) -> dict:
+    return {"set": {k: v for k, v in new.items() if k not in old or old[k] != v},
+            "del": [k for k in old if k not in new]}
+
+
+def _apply(flat: dict, delta: dict) -> dict:
+    for k in delta["del"]:
+        flat.pop(k, None)
+    flat.update(delta["set"])
+    return flat
+
+
+# ──────────────────────────────────────────────
+# STORAGE
+# ──────────────────────────────────────────────
+def _is_keyframe(revision: int) -> bool:
+    return (revision - 1) % KEYFRAME_INTERVAL == 0
+
+
+def _keyframe_of(revision: int) -> int:
+    return revision - (revision - 1) % KEYFRAME_INTERVAL
+
+
+def _replay(payloads) -> dict:
+    """Flat document from (is_keyframe, payload) rows, keyframe first."""
+    flat = None
+    for is_keyframe, payload in payloads:
+        data = _decode(payload)
+        flat = data if is_keyframe else _apply(flat, data)
+    return flat
+
+
+def _flat_revision(session, project_id: int, revision: int):
+    rows = session.execute(
+        select(EstimateRevision.revision, EstimateRevision.is_keyframe, EstimateRevision.payload)
+        .where(EstimateRevision.project_id == project_id,
+               EstimateRevision.revision.between(_keyframe_of(revision), revision))
+        .order_by(EstimateRevision.revision)).all()
+    if not rows or rows[-1].revision != revision:
+        return None
+    return _replay((is_keyframe, payload) for _, is_keyframe, payload in rows)
+
+
+def latest_revision(session, project_id: int) -> int:
+    """Highest revision number for the project (0 when it has none)."""
+    return session.execute(select(func.max(EstimateRevision.revision))
+                           .where(EstimateRevision.project_id == project_id)).scalar() or 0
+
+
+def _new_row(project_id: int, revision: int, head, flat: dict, note: str):
+    if head is not None and head == flat:
+        return None
+    keyframe = head is None or _is_keyframe(revision)
+    price = flat.get("results.final_price", 0.0)
+    return {"project_id": project_id, "revision": revision, "is_keyframe": keyframe,
+            "payload": _encode(flat if keyframe else _delta(head, flat)),
+            "final_price": price, "note": note, "created_at": datetime.utcnow()}
+
+
+def save_revision(session, project_id: int, document: dict, note: str = ""):
+    """Append `document` as the next revision; returns its number (None if unchanged)."""
+    return save_revisions(session, {project_id: document}, note).get(project_id)
+
+
+def save_revisions(session, documents: dict, note: str = "") -> dict:
+    """
+    Append a revision for each {project_id: document} in three statements
+    (latest numbers, their delta chains, one multi-row INSERT).  Returns
+    {project_id: new revision} for the documents that changed.
+    """
+    if not documents:
+        return {}
+    ids = list(documents)
+    latest = dict(session.execute(
+        select(EstimateRevision.project_id, func.max(EstimateRevision.revision))
+        .where(EstimateRevision.project_id.in_(ids))
+        .group_by(EstimateRevision.project_id)).all())
+    chains = {}
+    if latest:
+        head = (select(EstimateRevision.project_id.label("pid"),
+                       func.max(EstimateRevision.revision).label("rev"))
+                .where(EstimateRevision.project_id.in_(list(latest)))
+                .group_by(EstimateRevision.project_id).subquery())
+        first = head.c.rev - (head.c.rev - 1) % KEYFRAME_INTERVAL
+        for pid, is_keyframe, payload in session.execute(
+                select(EstimateRevision.project_id, EstimateRevision.is_keyframe,
+                       EstimateRevision.payload)
+                .join(head, and_(head.c.pid == EstimateRevision.project_id,
+                                 EstimateRevision.revision >= first))
+                .order_by(EstimateRevision.project_id, EstimateRevision.revision)):
+            chains.setdefault(pid, []).append((is_keyframe, payload))
+
+    rows = []
+    for pid, document in documents.items():
+        flat = _decode(_encode(_flatten(document)))        # compare in stored (JSON) form
+        row = _new_row(pid, latest.get(pid, 0) + 1,
+                       _replay(chains[pid]) if pid in chains else None, flat, note)
+        if row is not None:
+            rows.append(row)
+    if rows:
+        session.execute(insert(EstimateRevision), rows)
+    return {r["project_id"]: r["revision"] for r in rows}
+
+
+# ──────────────────────────────────────────────
+# READING
+# ──────────────────────────────────────────────
+def load_revision(session, project_id: int, revision: int = None):
+    """The document at `revision` (default: latest), or None."""
+    revision = revision or latest_revision(session, project_id)
+    flat = _flat_revision(session, project_id, revision) if revision else None
+    return None if flat is None else _unflatten(flat)
+
+
+def list_revisions(session, project_id: int) -> list:
+    """RevisionInfo for each revision, oldest first (no payloads decoded)."""
+    rows = session.execute(
+        select(EstimateRevision.revision, EstimateRevision.created_at,
+               EstimateRevision.final_price, EstimateRevision.note, EstimateRevision.is_keyframe)
+        .where(EstimateRevision.project_id == project_id)
+        .order_by(EstimateRevision.revision)).all()
+    return [RevisionInfo(*row) for row in rows]
+
+
+def diff_revisions(session, project_id: int, a: int, b: int) -> dict:
+    """
+    What changed from revision a to b, by flat path:
+    {"added": {path: new}, "removed": {path: old}, "changed": {path: (old, new)}}.
+    """
+    old, new = _flat_revision(session, project_id, a), _flat_revision(session, project_id, b)
+    if old is None or new is None:
+        raise ValueError(f"Project {project_id} has no revision {a if old is None else b}")
+    return {
+        "added": {k: v for k, v in new.items() if k not in old},
+        "removed": {k: v for k, v in old.items() if k not in new},
+        "changed": {k: (old[k], v) for k, v in new.items() if k in old and old[k] != v},
+    }
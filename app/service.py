@@ -0,0 +1,311 @@
+"""
+Apeiron CostEstimation Pro – Local Estimation Service
+=====================================================
+A small asyncio HTTP/1.1 JSON service (standard library only) for CRM
+integration, bound to localhost by default:
+
+    python -m app.service --port 8765
+
+Endpoints
+---------
+GET  /health               {"status": "ok", "version"}
+GET  /presets              industry presets with their module templates
+GET  /pricing-strategies   pricing modes (profit margin, risk contingency)
+POST /estimate             one scenario object, or {"scenarios": [...]},
+                           in the app.cli scenario format; returns the
+                           run_full_estimation result(s)
+
+Estimation runs in a thread pool (or, with --processes, in the CLI's
+worker processes) so the event loop keeps accepting connections.  All
+threads share one engine and its connection pool; each thread holds one
+session.  Configuration (and, in worker processes, employee rates) is
+re-read at most every CONFIG_TTL seconds, so master data edited in the
+desktop app shows up without a restart.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from app import __version__, cli, database
+from app.config_registry import get_config, invalidate_config
+from app.models import Employee
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CONFIG_TTL = 30.0                 # seconds between configuration reloads
+MAX_BODY = 4 * 1024 * 1024
+MAX_SCENARIOS = 1_000             # per POST /estimate
+KEEPALIVE_TIMEOUT = 15.0
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ──────────────────────────────────────────────
+# ESTIMATION BACKEND
+# ──────────────────────────────────────────────
+class EstimationBackend:
+    """Thread-safe access to master data and the estimation engine."""
+
+    def __init__(self, workers: int = None, processes: bool = False):
+        self.engine = database.get_engine()
+        self._sessions = database.get_session_factory()
+        self._config_lock = threading.Lock()
+        self._config_loaded = 0.0
+        workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="estimate")
+        self.processes = (
+            ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker,
+                                initargs=(database.DB_URL,),
+                                mp_context=multiprocessing.get_context("spawn"))
+            if processes else None
+        )
+
+    def session(self):
+        """This thread's session (one per executor thread, pooled connections)."""
+        return self._sessions()
+
+    def config(self):
+        session = self.session()
+        with self._config_lock:
+            if time.monotonic() - self._config_loaded > CONFIG_TTL:
+                invalidate_config()
+                self._config_loaded = time.monotonic()
+        return get_config(session)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.processes is not None:
+            self.processes.shutdown(wait=True)
+        database.dispose_engines(self.engine.url)
+
+    # ── blocking handlers (run in the executor) ──
+    def presets(self) -> dict:
+        return {"presets": [
+            {"id": p.id, "name": p.name,
+             "modules": [{"name": name, "hours": hours} for name, hours in p.modules]}
+            for p in self.config().presets.values()
+        ]}
+
+    def pricing_strategies(self) -> dict:
+        return {"pricing_strategies": [m._asdict() for m in self.config().pricing.values()]}
+
+    def _rates(self, session, scenarios) -> dict:
+        ids = {int(m["employee_id"]) for sc in scenarios for m in sc.get("modules") or []
+               if not cli._blank(m.get("employee_id"))}
+        if not ids:
+            return {}
+        rows = session.query(Employee.id, Employee.hourly_cost).filter(Employee.id.in_(ids))
+        return dict(rows.all())
+
+    def estimate(self, scenarios: list) -> list:
+        """[(id, result dict or None, error or None)] for each scenario."""
+        self.config()
+        session = self.session()
+        try:
+            return cli._price_chunk_with(session, self._rates(session, scenarios),
+                                         list(enumerate(scenarios, 1)))
+        finally:
+            session.rollback()            # end the read transaction; keep the connection pooled
+
+
+# ── worker process state (--processes) ──
+_worker_loaded = 0.0
+
+
+def _init_worker(db_url: str):
+    global _worker_loaded
+    cli._init_worker(db_url)
+    _worker_loaded = time.monotonic()
+
+
+def _price_in_worker(scenarios: list) -> list:
+    """EstimationBackend.estimate for a worker process, with the same CONFIG_TTL refresh."""
+    global _worker_loaded
+    session, rates = cli._worker
+    if time.monotonic() - _worker_loaded > CONFIG_TTL:
+        invalidate_config()
+        rates = cli.employee_rates(session)
+        cli._worker = (session, rates)
+        _worker_loaded = time.monotonic()
+    try:
+        return cli._price_chunk_with(session, rates, list(enumerate(scenarios, 1)))
+    finally:
+        session.rollback()
+
+
+# ──────────────────────────────────────────────
+# HTTP
+# ──────────────────────────────────────────────
+async def _read_request(reader):
+    """(method, path, headers, body) or None at end of stream."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Malformed Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Malformed Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = (headers.get("connection", "").lower() != "close"
+                  and version.upper() == "HTTP/1.1")
+    return method.upper(), target.split("?", 1)[0], keep_alive, body
+
+
+def _response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+class EstimationService:
+    """Routes requests to an EstimationBackend."""
+
+    def __init__(self, backend: EstimationBackend):
+        self.backend = backend
+        self.routes = {
+            ("GET", "/health"): self._health,
+            ("GET", "/presets"): self._blocking(backend.presets),
+            ("GET", "/pricing-strategies"): self._blocking(backend.pricing_strategies),
+            ("POST", "/estimate"): self._estimate,
+        }
+
+    def _blocking(self, fn):
+        async def handler(body):
+            return await asyncio.get_running_loop().run_in_executor(self.backend.executor, fn)
+        return handler
+
+    async def _health(self, body):
+        return {"status": "ok", "version": __version__}
+
+    async def _estimate(self, body):
+        try:
+            payload = json.loads(body or b"null")
+        except json.JSONDecodeError as exc:
+            raise HTTPError(400, f"Invalid JSON: {exc}")
+        single = isinstance(payload, dict) and "scenarios" not in payload
+        scenarios = [payload] if single else (payload.get("scenarios") if isinstance(payload, dict) else payload)
+        if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios):
+            raise HTTPError(400, "Expected a scenario object or {\"scenarios\": [...]}")
+        if len(scenarios) > MAX_SCENARIOS:
+            raise HTTPError(413, f"At most {MAX_SCENARIOS} scenarios per request")
+
+        loop = asyncio.get_running_loop()
+        if self.backend.processes is not None:
+            rows = await loop.run_in_executor(self.backend.processes, _price_in_worker, scenarios)
+        else:
+            rows = await loop.run_in_executor(self.backend.executor, self.backend.estimate, scenarios)
+        results = [{"id": sid, **result} if result is not None else {"id": sid, "error": error}
+                   for sid, result, error in rows]
+        if single:
+            if "error" in results[0]:
+                raise HTTPError(422, results[0]["error"])
+            return results[0]
+        return {"results": results}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as exc:
+                    writer.write(_response(exc.status, {"error": str(exc)}, False))
+                    break
+                if request is None:
+                    break
+                method, path, keep_alive, body = request
+                writer.write(_response(*await self._dispatch(method, path, body), keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            allowed = [m for m, p in self.routes if p == path]
+            return (405, {"error": f"Use {', '.join(allowed)}"}) if allowed else (404, {"error": "Not found"})
+        try:
+            return 200, await handler(body)
+        except HTTPError as exc:
+            return exc.status, {"error": str(exc)}
+        except Exception as exc:                     # keep serving other requests
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+
+async def start_service(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                        backend: EstimationBackend = None):
+    """Start listening; returns (asyncio server, EstimationService)."""
+    service = EstimationService(backend or EstimationBackend())
+    server = await asyncio.start_server(service.handle, host, port, backlog=512)
+    return server, service
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = None,
+                processes: bool = False):
+    backend = EstimationBackend(workers, processes)
+    server, _ = await start_service(host, port, backend)
+    addr = server.sockets[0].getsockname()
+    print(f"Apeiron estimation service on http://{addr[0]}:{addr[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        backend.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m app.service",
+                                 description="Local JSON estimation service.")
+    ap.add_argument("--host", default=DEFAULT_HOST, help="bind address (default: localhost only)")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, help="estimation threads")
+    ap.add_argument("--processes", action="store_true",
+                    help="run estimations in worker processes instead of threads")
+    ap.add_argument("--db", help="SQLite database file (default: the desktop app's database)")
+    args = ap.parse_args(argv)
+    if args.db:
+        database.use_database(args.db)
+    database.init_database()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.processes))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,192 @@
+"""
+Apeiron CostEstimation Pro – Monte Carlo Cost-Risk Simulation
+=============================================================
+Replaces the flat risk contingency with evidence: each module's hours are
+drawn from a PERT or triangular distribution over its optimistic / likely /
+pessimistic estimates, and the pipeline is priced for every draw.
+"""
+
+import numpy as np
+
+from app.batch import price_labor_batch, modules_to_arrays
+from app.logic import (
+    get_complexity_multiplier, get_app_type_adjustment, calculate_infra_stack_total,
+    module_hourly_rate, labor_cost_paise, adjust_labor_paise,
+)
+from app.money import from_paise
+
+DEFAULT_PERCENTILES = (50, 80, 90)
+_PERT_GRID = 16385
+_QUANTILE_GRID = 4097
+_SAMPLE_CHUNK = 25_000
+
+
+# ──────────────────────────────────────────────
+# DISTRIBUTIONS
+# ──────────────────────────────────────────────
+def _pert_quantile_table(alpha: float, beta: float) -> np.ndarray:
+    """
+    Quantile function of Beta(alpha, beta) tabulated on a uniform u-grid.
+    Sampling is then an index + lerp into this table, far cheaper than
+    drawing beta variates (or np.interp-searching a CDF) per module.
+    """
+    x = np.linspace(0.0, 1.0, _PERT_GRID)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pdf = x ** (alpha - 1) * (1 - x) ** (beta - 1)
+    pdf = np.nan_to_num(pdf, nan=0.0, posinf=0.0)
+    cdf = np.concatenate(([0.0], np.cumsum((pdf[1:] + pdf[:-1]) / 2)))
+    return np.interp(np.linspace(0.0, 1.0, _QUANTILE_GRID), cdf / cdf[-1], x)
+
+
+def _lookup_quantile(u, table: np.ndarray):
+    """Linear interpolation into a uniform-grid quantile table."""
+    pos = u * (len(table) - 1)
+    idx = np.minimum(pos.astype(np.int64), len(table) - 2)
+    return table[idx] + (table[idx + 1] - table[idx]) * (pos - idx)
+
+
+def _triangular_quantile(u, low, mode, high):
+    """Inverse CDF of the triangular distribution (vectorized over u)."""
+    width = high - low
+    split = (mode - low) / width
+    left = low + np.sqrt(u * width * (mode - low))
+    right = high - np.sqrt((1 - u) * width * (high - mode))
+    return np.where(u < split, left, right)
+
+
+def _normalize_ranges(modules: list, hour_ranges: list) -> np.ndarray:
+    """(K, 3) array of optimistic/likely/pessimistic hours; None → fixed."""
+    ranges = np.empty((len(modules), 3), dtype=np.float64)
+    for i, mod in enumerate(modules):
+        rng_i = hour_ranges[i] if hour_ranges else None
+        if rng_i is None:
+            ranges[i] = mod.estimated_hours
+            continue
+        low, likely, high = (float(v) for v in rng_i)
+        if not low <= likely <= high:
+            raise ValueError(
+                f"Module '{mod.name}': expected optimistic ≤ likely ≤ pessimistic, "
+                f"got {low}/{likely}/{high}"
+            )
+        ranges[i] = (low, likely, high)
+    return ranges
+
+
+def sample_labor_totals(
+    ranges: np.ndarray,
+    weights: np.ndarray,
+    n_samples: int,
+    method: str = "pert",
+    rng: np.random.Generator = None,
+) -> np.ndarray:
+    """
+    Draw n_samples of Σ weight_k × hours_k, where hours_k follows the
+    distribution given by row k of `ranges` (optimistic, likely, pessimistic).
+    """
+    if method not in ("pert", "triangular"):
+        raise ValueError(f"Unknown distribution '{method}' (use 'pert' or 'triangular')")
+    rng = rng or np.random.default_rng()
+    totals = np.zeros(n_samples)
+    tables = {}
+    for (low, likely, high), w in zip(ranges, weights):
+        if high == low or w == 0:
+            totals += w * likely
+            continue
+        for start in range(0, n_samples, _SAMPLE_CHUNK):
+            stop = min(start + _SAMPLE_CHUNK, n_samples)
+            u = rng.random(stop - start)
+            if method == "triangular":
+                hours = _triangular_quantile(u, low, likely, high)
+            else:
+                alpha = 1 + 4 * (likely - low) / (high - low)
+                beta = 1 + 4 * (high - likely) / (high - low)
+                key = (round(alpha, 9), round(beta, 9))
+                if key not in tables:
+                    tables[key] = _pert_quantile_table(alpha, beta)
+                hours = low + (high - low) * _lookup_quantile(u, tables[key])
+            totals[start:stop] += w * hours
+    return totals
+
+
+# ──────────────────────────────────────────────
+# SIMULATION
+# ──────────────────────────────────────────────
+def run_risk_simulation(
+    session,
+    modules: list,
+    hour_ranges: list,
+    complexity: str,
+    app_type: str,
+    region_multiplier: float,
+    infra_items: list,
+    stack_items: list,
+    maintenance_buffer_pct: float,
+    profit_margin_pct: float,
+    risk_contingency_pct: float = 0.0,
+    n_samples: int = 100_000,
+    method: str = "pert",
+    seed: int = None,
+    percentiles: tuple = DEFAULT_PERCENTILES,
+    bins: int = 40,
+) -> dict:
+    """
+    Simulate the final price distribution for a project.
+
+    `hour_ranges[k]` is an (optimistic, likely, pessimistic) tuple for
+    modules[k], or None to keep its estimated_hours fixed.  The flat risk
+    contingency defaults to 0% because the simulated spread *is* the risk;
+    `implied_contingency_pct` reports the contingency that would lift the
+    most-likely gross cost to each percentile.
+
+    The most-likely baseline is priced module by module in paise, exactly
+    as run_full_estimation prices the same hours.
+    """
+    rng = np.random.default_rng(seed)
+    ranges = _normalize_ranges(modules, hour_ranges)
+
+    _, rates = modules_to_arrays(modules)
+    weights = rates * region_multiplier
+
+    cx_mult = get_complexity_multiplier(session, complexity)
+    app_adj = get_app_type_adjustment(session, app_type)
+    infra_stack = calculate_infra_stack_total(infra_items, stack_items)
+
+    baseline_raw = sum(
+        labor_cost_paise(module_hourly_rate(mod), likely, region_multiplier)
+        for mod, likely in zip(modules, ranges[:, 1])
+    )
+    baseline_labor = from_paise(adjust_labor_paise(baseline_raw, cx_mult, app_adj))
+
+    raw = sample_labor_totals(ranges, weights, n_samples, method, rng)
+    labor = np.append(raw * cx_mult * app_adj, baseline_labor)
+    priced = price_labor_batch(
+        labor, infra_stack["infra_total"], infra_stack["stack_total"],
+        maintenance_buffer_pct, risk_contingency_pct, profit_margin_pct,
+    )
+    final = priced["final_pricing"]["final_price"]
+    gross = priced["gross_cost"]
+    baseline_final, final = final[-1], final[:-1]
+    baseline_gross, gross = gross[-1], gross[:-1]
+
+    pct_final = np.percentile(final, percentiles)
+    pct_gross = np.percentile(gross, percentiles)
+    counts, edges = np.histogram(final, bins=bins)
+
+    implied = {}
+    for p, g in zip(percentiles, pct_gross):
+        implied[f"P{p}"] = (
+            round(float((g - baseline_gross) / baseline_gross * 100), 2)
+            if baseline_gross > 0 else 0.0
+        )
+
+    return {
+        "n_samples": n_samples,
+        "method": method,
+        "seed": seed,
+        "baseline_final_price": float(baseline_final),
+        "mean_final_price": round(float(final.mean()), 2),
+        "std_final_price": round(float(final.std()), 2),
+        "percentiles": {f"P{p}": round(float(v), 2) for p, v in zip(percentiles, pct_final)},
+        "implied_contingency_pct": implied,
+        "histogram": {"counts": counts.tolist(), "edges": edges.round(2).tolist()},
+    }
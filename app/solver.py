@@ -0,0 +1,217 @@
+"""
+Apeiron CostEstimation Pro – Goal-Seek Solver
+=============================================
+Inverts the estimation pipeline: given a target final price, find the
+profit margin, risk contingency, uniform hours scale or region multiplier
+that fits it.
+
+The pipeline is linear between rounding steps, so each solve starts from
+a closed-form estimate, gallops out from it (steps of 1, 2, 4, … grid
+units: 0.01% for percentages, 1/10,000 for factors) to bracket the
+answer, and bisects the bracket against the exact paise pipeline.  The
+answer is the largest grid value whose final price stays within the
+target.
+"""
+
+from types import SimpleNamespace
+
+from app.logic import (
+    run_full_estimation,
+    get_complexity_multiplier,
+    get_app_type_adjustment,
+    module_hourly_rate,
+)
+from app.money import (
+    to_paise, from_paise, to_fixed, pct_to_bp, mul_div,
+    BP_PER_UNIT, FACTOR_SCALE, HOURS_SCALE,
+)
+
+# solve_for → (grid scale, lower bound, upper bound) in natural units
+SOLVABLE = {
+    "profit_margin_pct": (100, 0.0, 1000.0),
+    "risk_contingency_pct": (100, 0.0, 1000.0),
+    "hours_scale": (FACTOR_SCALE, 0.0, 100.0),
+    "region_multiplier": (FACTOR_SCALE, 0.0, 100.0),
+}
+
+
+# ──────────────────────────────────────────────
+# EXACT PIPELINE (paise, steps 1–5)
+# ──────────────────────────────────────────────
+class _Pipeline:
+    """Final price in paise as a function of one fixed-point input."""
+
+    def __init__(self, session, modules, complexity, app_type, region_multiplier,
+                 infra_items, stack_items, maintenance_buffer_pct,
+                 risk_contingency_pct, profit_margin_pct):
+        self.rates = [to_paise(module_hourly_rate(m)) for m in modules]
+        self.hours = [to_fixed(m.estimated_hours, HOURS_SCALE) for m in modules]
+        self.region_u = to_fixed(region_multiplier, FACTOR_SCALE)
+        self.labor_u = (to_fixed(get_complexity_multiplier(session, complexity), FACTOR_SCALE)
+                        * to_fixed(get_app_type_adjustment(session, app_type), FACTOR_SCALE))
+        self.combined = (sum(to_paise(i.cost) for i in infra_items)
+                         + sum(to_paise(i.cost) for i in stack_items))
+        self.mb_bp = pct_to_bp(maintenance_buffer_pct)
+        self.rk_bp = pct_to_bp(risk_contingency_pct)
+        self.pf_bp = pct_to_bp(profit_margin_pct)
+        self.base_gross = self.gross(self.raw())
+        self.evaluations = 0
+
+    def raw(self, hours_scale_u=FACTOR_SCALE, region_u=None) -> int:
+        region_u = self.region_u if region_u is None else region_u
+        return sum(
+            mul_div(rate * mul_div(hours, hours_scale_u, FACTOR_SCALE), region_u,
+                    HOURS_SCALE * FACTOR_SCALE)
+            for rate, hours in zip(self.rates, self.hours)
+        )
+
+    def gross(self, raw: int) -> int:
+        return mul_div(raw, self.labor_u, FACTOR_SCALE * FACTOR_SCALE) + self.combined
+
+    def safe(self, gross: int, rk_bp=None) -> int:
+        rk_bp = self.rk_bp if rk_bp is None else rk_bp
+        return (gross + mul_div(gross, self.mb_bp, BP_PER_UNIT)
+                + mul_div(gross, rk_bp, BP_PER_UNIT))
+
+    def final(self, safe: int, pf_bp=None) -> int:
+        pf_bp = self.pf_bp if pf_bp is None else pf_bp
+        return safe + mul_div(safe, pf_bp, BP_PER_UNIT)
+
+    def evaluate(self, solve_for: str, x: int) -> int:
+        self.evaluations += 1
+        if solve_for == "profit_margin_pct":
+            return self.final(self.safe(self.base_gross), pf_bp=x)
+        if solve_for == "risk_contingency_pct":
+            return self.final(self.safe(self.base_gross, rk_bp=x))
+        if solve_for == "hours_scale":
+            return self.final(self.safe(self.gross(self.raw(hours_scale_u=x))))
+        return self.final(self.safe(self.gross(self.raw(region_u=x))))
+
+    # ── closed-form first guesses (exact up to rounding) ──
+    def _max_safe(self, target: int) -> int:
+        return target * BP_PER_UNIT // (BP_PER_UNIT + self.pf_bp)
+
+    def _max_gross(self, target: int) -> int:
+        return self._max_safe(target) * BP_PER_UNIT // (BP_PER_UNIT + self.mb_bp + self.rk_bp)
+
+    def guess(self, solve_for: str, target: int) -> int:
+        if solve_for == "profit_margin_pct":
+            safe = self.safe(self.base_gross)
+            return (target - safe) * BP_PER_UNIT // safe if safe else 0
+        if solve_for == "risk_contingency_pct":
+            gross = self.base_gross
+            if not gross:
+                return 0
+            headroom = self._max_safe(target) - gross - mul_div(gross, self.mb_bp, BP_PER_UNIT)
+            return headroom * BP_PER_UNIT // gross
+        raw_needed = ((self._max_gross(target) - self.combined) * FACTOR_SCALE * FACTOR_SCALE
+                      // self.labor_u) if self.labor_u else 0
+        # raw labor at a factor of exactly 1.0
+        unit = self.raw() if solve_for == "hours_scale" else self.raw(region_u=FACTOR_SCALE)
+        return raw_needed * FACTOR_SCALE // unit if unit else 0
+
+
+def _largest_within(f, target: int, lo: int, hi: int, guess: int) -> int:
+    """
+    Largest x in [lo, hi] with f(x) ≤ target for non-decreasing f, or lo
+    when none fits.  Gallops out from the guess to bracket the answer,
+    then bisects.
+    """
+    x = min(max(guess, lo), hi)
+    step = 1
+    if f(x) <= target:
+        good = x
+        while good < hi:
+            probe = min(good + step, hi)
+            if f(probe) > target:
+                bad = probe
+                break
+            good, step = probe, step * 2
+        else:
+            return hi
+    else:
+        bad = x
+        while True:
+            probe = max(bad - step, lo)
+            if f(probe) <= target:
+                good = probe
+                break
+            if probe == lo:
+                return lo
+            bad, step = probe, step * 2
+    while bad - good > 1:
+        mid = (good + bad) // 2
+        if f(mid) <= target:
+            good = mid
+        else:
+            bad = mid
+    return good
+
+
+# ──────────────────────────────────────────────
+# PUBLIC API
+# ──────────────────────────────────────────────
+def solve_for_target(
+    session,
+    modules: list,
+    complexity: str,
+    app_type: str,
+    region_multiplier: float,
+    infra_items: list,
+    stack_items: list,
+    maintenance_buffer_pct: float,
+    risk_contingency_pct: float,
+    profit_margin_pct: float,
+    target_price: float,
+    solve_for: str = "profit_margin_pct",
+    **estimation_kwargs,
+) -> dict:
+    """
+    Goal-seek one input so the final price meets target_price.
+
+    solve_for: profit_margin_pct | risk_contingency_pct | hours_scale |
+    region_multiplier.  hours_scale multiplies every module's hours.
+    Other arguments are as for run_full_estimation.
+
+    Returns {"solve_for", "value", "target_price", "final_price", "gap",
+    "feasible", "evaluations", "estimation"}; `estimation` is the full
+    pipeline result at the solved value (on copies of the modules).
+    `feasible` is False when even the lower bound overshoots the target.
+    """
+    if solve_for not in SOLVABLE:
+        raise ValueError(f"Cannot solve for '{solve_for}'; choose one of {', '.join(SOLVABLE)}")
+    scale, lo, hi = SOLVABLE[solve_for]
+    inputs = dict(
+        complexity=complexity, app_type=app_type, region_multiplier=region_multiplier,
+        infra_items=infra_items, stack_items=stack_items,
+        maintenance_buffer_pct=maintenance_buffer_pct,
+        risk_contingency_pct=risk_contingency_pct, profit_margin_pct=profit_margin_pct,
+    )
+    pipe = _Pipeline(session, modules, **inputs)
+    target = to_paise(target_price)
+    x = _largest_within(
+        lambda v: pipe.evaluate(solve_for, v), target,
+        to_fixed(lo, scale), to_fixed(hi, scale), pipe.guess(solve_for, target),
+    )
+    value = x / scale
+
+    copies = [SimpleNamespace(name=m.name, estimated_hours=m.estimated_hours,
+                              hourly_rate_override=m.hourly_rate_override,
+                              employee=m.employee, cost=0) for m in modules]
+    if solve_for == "hours_scale":
+        for m, hours in zip(copies, pipe.hours):
+            m.estimated_hours = mul_div(hours, x, FACTOR_SCALE) / HOURS_SCALE
+    else:
+        inputs[solve_for] = value
+    estimation = run_full_estimation(session, copies, **inputs, **estimation_kwargs)
+    final = to_paise(estimation["final_pricing"]["final_price"])
+    return {
+        "solve_for": solve_for,
+        "value": value,
+        "target_price": from_paise(target),
+        "final_price": from_paise(final),
+        "gap": from_paise(target - final),
+        "feasible": final <= target,
+        "evaluations": pipe.evaluations,
+        "estimation": estimation,
+    }
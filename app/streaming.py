@@ -0,0 +1,218 @@
+"""
+Apeiron CostEstimation Pro – Streaming Estimation
+=================================================
+Constant-memory estimation for very large work-breakdown imports.
+
+Module records are consumed one at a time from a generator (CSV file or
+database cursor).  Totals accumulate as integer paise; the per-module
+detail is written to a CSV spill file and read back lazily, so peak
+memory does not grow with the number of line items.
+"""
+
+import csv
+import os
+import tempfile
+import weakref
+from collections import namedtuple
+
+from sqlalchemy import select
+
+from app.logic import (
+    DEFAULT_STAGES,
+    labor_cost_paise,
+    adjust_labor_paise,
+    get_complexity_multiplier,
+    get_app_type_adjustment,
+    calculate_infra_stack_total,
+    calculate_risk_buffer,
+    calculate_final_price,
+    calculate_stage_distribution,
+    calculate_maintenance_forecast,
+    cost_per_function_point,
+    burn_rate_monthly,
+    revenue_margin,
+    hours_to_person_months,
+)
+from app.models import ProjectModule, Employee
+from app.money import from_paise, to_paise
+from app.results import EstimationResult
+
+ModuleRecord = namedtuple("ModuleRecord", "name hours rate")
+
+DEFAULT_COLUMNS = {"name": "name", "hours": "hours", "rate": "rate"}
+
+
+# ──────────────────────────────────────────────
+# RECORD SOURCES
+# ──────────────────────────────────────────────
+def iter_csv_modules(path: str, columns: dict = None, encoding: str = "utf-8-sig"):
+    """
+    Yield ModuleRecords from a WBS CSV export.  `columns` maps name/hours/
+    rate to the file's header names; blank hours or rates read as 0.
+    """
+    cols = dict(DEFAULT_COLUMNS, **(columns or {}))
+    with open(path, newline="", encoding=encoding) as fh:
+        for row in csv.DictReader(fh):
+            yield ModuleRecord(
+                row.get(cols["name"], ""),
+                float(row.get(cols["hours"]) or 0),
+                float(row.get(cols["rate"]) or 0),
+            )
+
+
+def iter_db_modules(session, project_id: int, batch_size: int = 1_000):
+    """
+    Yield ModuleRecords for a saved project straight off a server-side
+    cursor (override rate → employee hourly cost → 0).
+    """
+    stmt = (
+        select(ProjectModule.name, ProjectModule.estimated_hours,
+               ProjectModule.hourly_rate_override, Employee.hourly_cost)
+        .outerjoin(Employee, Employee.id == ProjectModule.employee_id)
+        .where(ProjectModule.project_id == project_id)
+        .order_by(ProjectModule.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for name, hours, override, emp_rate in session.execute(stmt):
+        rate = override if override is not None else emp_rate
+        yield ModuleRecord(name, hours or 0.0, rate or 0.0)
+
+
+# ──────────────────────────────────────────────
+# PER-MODULE SPILL
+# ──────────────────────────────────────────────
+class ModuleCostSpill:
+    """
+    On-disk stand-in for the module_costs list: iterating yields the same
+    {"name", "hours", "cost"} dicts, read back one row at a time.  The
+    file is removed when the object is garbage-collected (or on close()).
+    """
+
+    def __init__(self, directory: str = None):
+        fd, self.path = tempfile.mkstemp(prefix="apeiron_wbs_", suffix=".csv", dir=directory)
+        self._fh = os.fdopen(fd, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._fh)
+        self._count = 0
+        self._finalizer = weakref.finalize(self, _remove_file, self._fh, self.path)
+
+    def append(self, name: str, hours: float, cost_paise: int):
+        self._writer.writerow((name, repr(hours), cost_paise))
+        self._count += 1
+
+    def seal(self):
+        self._fh.flush()
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        self.seal()
+        with open(self.path, newline="", encoding="utf-8") as fh:
+            for name, hours, cost in csv.reader(fh):
+                yield {"name": name, "hours": float(hours), "cost": from_paise(int(cost))}
+
+    def close(self):
+        self._finalizer()
+
+
+def _remove_file(fh, path):
+    fh.close()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+# ──────────────────────────────────────────────
+# STREAMING PIPELINE
+# ──────────────────────────────────────────────
+def stream_labor_cost(
+    session,
+    records,
+    complexity: str,
+    app_type: str,
+    region_multiplier: float = 1.0,
+    spill_dir: str = None,
+) -> dict:
+    """
+    calculate_total_labor_cost over an iterable of ModuleRecords, in
+    constant memory.  `module_costs` is a ModuleCostSpill; the result also
+    carries `total_hours` and `module_count`.
+    """
+    spill = ModuleCostSpill(spill_dir)
+    raw_paise = 0
+    total_hours = 0.0
+    for rec in records:
+        cost = labor_cost_paise(rec.rate, rec.hours, region_multiplier)
+        spill.append(rec.name, rec.hours, cost)
+        raw_paise += cost
+        total_hours += rec.hours
+    spill.seal()
+
+    cx_mult = get_complexity_multiplier(session, complexity)
+    app_adj = get_app_type_adjustment(session, app_type)
+    return {
+        "module_costs": spill,
+        "raw_labor_total": from_paise(raw_paise),
+        "complexity_multiplier": cx_mult,
+        "app_type_adjustment": app_adj,
+        "adjusted_labor_total": from_paise(adjust_labor_paise(raw_paise, cx_mult, app_adj)),
+        "total_hours": total_hours,
+        "module_count": len(spill),
+    }
+
+
+def run_streaming_estimation(
+    session,
+    records,
+    complexity: str,
+    app_type: str,
+    region_multiplier: float,
+    infra_items: list,
+    stack_items: list,
+    maintenance_buffer_pct: float,
+    risk_contingency_pct: float,
+    profit_margin_pct: float,
+    stage_pcts: dict = None,
+    function_points: int = 0,
+    estimated_duration_months: float = 0.0,
+    maintenance_years: int = 5,
+    maintenance_annual_pct: float = 15.0,
+    spill_dir: str = None,
+) -> EstimationResult:
+    """
+    run_full_estimation for a stream of ModuleRecords.  Same result layout;
+    labor["module_costs"] is a lazily read ModuleCostSpill.
+    """
+    labor = stream_labor_cost(session, records, complexity, app_type, region_multiplier, spill_dir)
+    infra_stack = calculate_infra_stack_total(infra_items, stack_items)
+    gross_cost = from_paise(to_paise(labor["adjusted_labor_total"]) + to_paise(infra_stack["combined_total"]))
+    risk = calculate_risk_buffer(gross_cost, maintenance_buffer_pct, risk_contingency_pct)
+    final = calculate_final_price(risk["safe_cost"], profit_margin_pct)
+
+    sp = stage_pcts or DEFAULT_STAGES
+    stages = calculate_stage_distribution(
+        labor["adjusted_labor_total"],
+        sp.get("Planning", 10), sp.get("Design", 15),
+        sp.get("Development", 60), sp.get("Testing", 10),
+        sp.get("Deployment", 5),
+    )
+    maintenance = calculate_maintenance_forecast(
+        stages.get("Development", 0), maintenance_annual_pct, maintenance_years)
+
+    total_hours = labor.pop("total_hours")
+    labor.pop("module_count")
+    return EstimationResult.from_sections(
+        labor=labor,
+        infra_stack=infra_stack,
+        gross_cost=gross_cost,
+        risk_buffer=risk,
+        final_pricing=final,
+        stage_distribution=stages,
+        maintenance_forecast=maintenance,
+        analytics={
+            "total_hours": total_hours,
+            "person_months": hours_to_person_months(total_hours),
+            "cost_per_function_point": cost_per_function_point(final["final_price"], function_points),
+            "burn_rate_monthly": burn_rate_monthly(final["final_price"], estimated_duration_months),
+            "revenue_margin_pct": revenue_margin(final["final_price"], risk["safe_cost"]),
+        },
+    )
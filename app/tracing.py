@@ -0,0 +1,144 @@
+"""
+Apeiron CostEstimation Pro – Estimation Tracing
+===============================================
+Opt-in timing for the estimation pipeline.  Inside a `trace_estimation()`
+block every pipeline step and every traced helper in app.logic records
+its wall time, call count and the number of SQL statements it issued:
+
+    with trace_estimation() as tracer:
+        run_full_estimation(...)
+    print(tracer.to_json())
+
+A callback (`on_span`) can receive each span as it closes instead of, or
+as well as, the aggregate.  With no active tracer, `span()` returns a
+shared no-op context and `@traced` functions make one ContextVar lookup
+before calling through.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_active = ContextVar("apeiron_tracer", default=None)
+_NULL_SPAN = nullcontext()
+
+
+# ──────────────────────────────────────────────
+# TRACER
+# ──────────────────────────────────────────────
+class Tracer:
+    """
+    Aggregates spans by name: {"calls", "seconds", "queries"}.  Times and
+    query counts are inclusive of nested spans (a step includes the
+    helpers it calls).
+    """
+
+    def __init__(self, on_span=None):
+        self.on_span = on_span            # callback(name, seconds, queries)
+        self.spans = {}                   # name → [calls, ns, queries], in first-seen order
+        self.queries = 0                  # SQL statements seen while active
+
+    def record(self, name: str, elapsed_ns: int, queries: int):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [1, elapsed_ns, queries]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ns
+            entry[2] += queries
+        if self.on_span is not None:
+            self.on_span(name, elapsed_ns / 1e9, queries)
+
+    @contextmanager
+    def span(self, name: str):
+        queries = self.queries
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - start, self.queries - queries)
+
+    def report(self) -> dict:
+        """name → {"calls", "seconds", "queries"}."""
+        return {
+            name: {"calls": calls, "seconds": ns / 1e9, "queries": queries}
+            for name, (calls, ns, queries) in self.spans.items()
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """JSON export of report() plus the total query count."""
+        kwargs.setdefault("indent", 2)
+        return json.dumps({"spans": self.report(), "total_queries": self.queries}, **kwargs)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    tracer = _active.get()
+    if tracer is not None:
+        tracer.queries += 1
+
+
+_listener_lock = threading.Lock()
+_listener_users = 0
+
+
+def _attach_query_counter():
+    global _listener_users
+    with _listener_lock:
+        if _listener_users == 0:
+            event.listen(Engine, "before_cursor_execute", _count_query)
+        _listener_users += 1
+
+
+def _detach_query_counter():
+    global _listener_users
+    with _listener_lock:
+        _listener_users -= 1
+        if _listener_users == 0:
+            event.remove(Engine, "before_cursor_execute", _count_query)
+
+
+@contextmanager
+def trace_estimation(on_span=None):
+    """
+    Activate a Tracer for the calling context and yield it.  The SQL
+    statement counter is attached to SQLAlchemy only while some tracer is
+    active.
+    """
+    tracer = Tracer(on_span)
+    token = _active.set(tracer)
+    _attach_query_counter()
+    try:
+        yield tracer
+    finally:
+        _detach_query_counter()
+        _active.reset(token)
+
+
+# ──────────────────────────────────────────────
+# INSTRUMENTATION HOOKS
+# ──────────────────────────────────────────────
+def span(name: str):
+    """Context manager timing a block under `name` (no-op when not tracing)."""
+    tracer = _active.get()
+    return _NULL_SPAN if tracer is None else tracer.span(name)
+
+
+def traced(func):
+    """Decorator recording each call of `func` as a span named after it."""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _active.get()
+        if tracer is None:
+            return func(*args, **kwargs)
+        with tracer.span(name):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -2,19 +2,42 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, 
     QScrollArea, QGroupBox, QLineEdit, QComboBox, 
     QDoubleSpinBox, QPushButton, QTableWidget, 
-    QTableWidgetItem, QAbstractItemView, QMessageBox
+    QTableWidgetItem, QAbstractItemView, QMessageBox, QProgressDialog
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from sqlalchemy.exc import OperationalError
 
+from app import database
 from app.models import (
     SystemLookup, AppTypeMultiplier, ComplexityMultiplier, PricingStrategy, IndustryPreset
 )
+from app.config_registry import invalidate_config
+from app.logic import format_inr
+from app.portfolio import reprice_portfolio
+from app.calibration import apply_calibration
+
+class RepriceWorker(QThread):
+    """Runs reprice_portfolio off the GUI thread, on its own session."""
+    progress = pyqtSignal(int, int)
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def run(self):
+        try:
+            with database.session_scope() as session:
+                report = reprice_portfolio(session, progress=self.progress.emit)
+        except Exception as exc:          # reported to the user, not raised in the thread
+            self.failed.emit(str(exc))
+            return
+        self.done.emit(report)
+
 
 class SysConfigTab(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main = main_window
         self.session = main_window.session
+        self._reprice_worker = None
         self._build_ui()
         self._refresh_all_tables()
 
@@ -128,6 +151,20 @@ class SysConfigTab(QWidget):
         ipgl.addRow("", ipd_btn)
         sl.addWidget(ipg)
 
+        # 6. Portfolio repricing
+        rpg = QGroupBox("Saved Estimates")
+        rpgl = QFormLayout(rpg)
+        self.rp_btn = QPushButton("Reprice Portfolio")
+        self.rp_btn.clicked.connect(self._reprice_portfolio)
+        rpgl.addRow("Re-run all estimated projects against current master data:", self.rp_btn)
+        cal_btn = QPushButton("Calibrate from Actuals")
+        cal_btn.clicked.connect(self._calibrate_multipliers)
+        rpgl.addRow("Fit multipliers to recorded actual costs:", cal_btn)
+        opt_btn = QPushButton("Optimize Database")
+        opt_btn.clicked.connect(self._optimize_database)
+        rpgl.addRow("Refresh query statistics and compact the file:", opt_btn)
+        sl.addWidget(rpg)
+
         scroll.setWidget(sw)
         layout.addWidget(scroll)
 
@@ -275,8 +312,80 @@ class SysConfigTab(QWidget):
             self.session.delete(item); self.session.commit()
             self._refresh_ip_table(); self._sync_main_ui()
 
+    def _reprice_portfolio(self):
+        if self._reprice_worker is not None: return
+        self.session.commit()             # the worker writes through its own session
+        self.rp_btn.setEnabled(False)
+        self._reprice_dialog = QProgressDialog("Repricing portfolio…", "", 0, 0, self)
+        self._reprice_dialog.setCancelButton(None)
+        self._reprice_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self._reprice_dialog.show()
+        w = self._reprice_worker = RepriceWorker(self)
+        w.progress.connect(self._reprice_progress)
+        w.done.connect(self._reprice_done)
+        w.failed.connect(self._reprice_failed)
+        w.finished.connect(self._reprice_finished)
+        w.start()
+
+    def _reprice_progress(self, done, total):
+        self._reprice_dialog.setMaximum(total); self._reprice_dialog.setValue(done)
+
+    def _reprice_finished(self):
+        self._reprice_dialog.close()
+        self._reprice_worker.deleteLater(); self._reprice_worker = None
+        self.rp_btn.setEnabled(True)
+
+    def _reprice_failed(self, message):
+        QMessageBox.warning(self, "Portfolio Repricing", f"Repricing failed.\n{message}")
+
+    def _reprice_done(self, r):
+        self.session.expire_all()         # estimates were rewritten by the worker
+        lines = [f"{r['changed']} of {r['projects']} projects changed.",
+                 f"Portfolio: {format_inr(r['total_old'])} → {format_inr(r['total_new'])} "
+                 f"({format_inr(r['total_delta'])})"]
+        for d in r["deltas"][:10]:
+            lines.append(f"  {d['name']}: {format_inr(d['old_final_price'])} → "
+                         f"{format_inr(d['new_final_price'])}")
+        self.main._refresh_proj_combos()
+        QMessageBox.information(self, "Portfolio Repriced", "\n".join(lines))
+
+    def _calibrate_multipliers(self):
+        fit = self.main.calibrator().fit()
+        if not fit["projects"]:
+            QMessageBox.information(self, "Calibration", "No projects have both an estimate and an actual yet.")
+            return
+        lines = [f"Fitted to {fit['projects']} projects "
+                 f"(log error RMSE {fit['rmse_before']:.3f} → {fit['rmse_after']:.3f}).", ""]
+        for title, key in (("Complexity", "complexity"), ("App Type", "app_types")):
+            lines.append(f"{title}:")
+            for name, lv in fit[key].items():
+                if lv["projects"]:
+                    lines.append(f"  {name}: ×{lv['current']:.4f} → ×{lv['suggested']:.4f} "
+                                 f"({lv['projects']} projects)")
+        lines += ["", "Apply the suggested multipliers?"]
+        reply = QMessageBox.question(self, "Calibration", "\n".join(lines))
+        if reply == QMessageBox.StandardButton.Yes:
+            apply_calibration(self.session, fit)
+            self._refresh_app_table(); self._refresh_cx_table(); self._sync_main_ui()
+
+    def _optimize_database(self):
+        self.session.commit()             # VACUUM needs no open transactions
+        try:
+            database.maintain_database(vacuum_pages=0)
+            freed = database.vacuum_database(full=True)
+        except OperationalError as exc:
+            QMessageBox.warning(self, "Optimize Database", f"Database is busy, try again later.\n{exc}")
+            return
+        s = database.sqlite_settings()
+        QMessageBox.information(
+            self, "Optimize Database",
+            f"Statistics refreshed; {freed} free pages returned to disk.\n"
+            f"Profile: {database.SQLITE_PROFILE} (journal {s['journal_mode']}, synchronous {s['synchronous']})")
+
     def _sync_main_ui(self):
         """Force the Master Tab combo boxes to refresh along with new Estimation dropdowns."""
+        invalidate_config()
         self.main._refresh_estimation_combos()
         # You'll also want to update the role & category configs in Emp and Infra combo boxes...
         self.main._refresh_system_lookups()
+        self.main._reset_estimator()
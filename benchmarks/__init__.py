@@ -0,0 +1,8 @@
+"""
+Apeiron CostEstimation Pro – Benchmarks
+=======================================
+Reproducible timings at production scale:
+
+    python -m benchmarks --projects 1000 --modules 30 --out bench.json
+    python -m benchmarks --compare bench.json
+"""
@@ -0,0 +1,52 @@
+"""
+Apeiron CostEstimation Pro – Benchmark Runner
+=============================================
+"""
+
+import argparse
+import sys
+
+from app.database import SQLITE_PROFILES
+from benchmarks.suite import run_suite, save_results, load_results, compare, DEFAULT_TOLERANCE
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[1])
+    ap.add_argument("--employees", type=int, default=50)
+    ap.add_argument("--projects", type=int, default=200)
+    ap.add_argument("--modules", type=int, default=20, help="modules per project")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--only", nargs="*", help="benchmark names to run")
+    ap.add_argument("--sqlite-profile", choices=sorted(SQLITE_PROFILES),
+                    help="SQLite pragma preset (default: APEIRON_SQLITE_PROFILE or 'fast')")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", help="baseline results JSON to compare against")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="slow-down ratio above 1 counted as a regression")
+    args = ap.parse_args(argv)
+
+    report = run_suite(args.employees, args.projects, args.modules, args.repeat, args.seed,
+                       only=set(args.only) if args.only else None,
+                       progress=lambda name: print(f"  running {name}…", file=sys.stderr),
+                       sqlite_profile=args.sqlite_profile)
+    print(f"{'benchmark':<22}{'median':>12}{'min':>12}{'per op':>14}")
+    for name, r in report["results"].items():
+        print(f"{name:<22}{r['median_s'] * 1e3:>10.2f}ms{r['min_s'] * 1e3:>10.2f}ms"
+              f"{r['per_op_s'] * 1e6:>12.2f}µs")
+    if args.out:
+        save_results(report, args.out)
+
+    if args.compare:
+        rows = compare(load_results(args.compare), report, args.tolerance)
+        print(f"\n{'benchmark':<22}{'baseline':>12}{'current':>12}{'ratio':>8}")
+        for row in rows:
+            flag = "  REGRESSED" if row["regressed"] else ""
+            print(f"{row['name']:<22}{row['baseline_s'] * 1e3:>10.2f}ms"
+                  f"{row['current_s'] * 1e3:>10.2f}ms{row['ratio']:>8.2f}{flag}")
+        return 1 if any(row["regressed"] for row in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Apeiron CostEstimation Pro – Synthetic Benchmark Data
+=====================================================
+Deterministic production-shaped data: N employees, M projects with K
+modules each, infra/stack line items, and estimates, maintenance records
+and actuals for the saved projects.  Written in bulk into a temporary
+SQLite database that has been initialised with init_database().
+"""
+
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config_registry import get_config, invalidate_config
+from app.models import (
+    Employee, Project, ProjectModule, Estimate, Actual, MaintenanceRecord,
+    InfraCost, StackCost, RegionMultiplier,
+)
+
+ROLES = ("Project Manager", "Architect", "Frontend Developer", "Backend Developer",
+         "QA Engineer", "UI/UX Designer", "DevOps Engineer")
+
+
+@contextmanager
+def temp_database(directory: str = None):
+    """
+    Point app.database at a fresh SQLite file for the duration of the
+    block; yields the file path.  The file is deleted afterwards.
+    """
+    fd, path = tempfile.mkstemp(prefix="apeiron_bench_", suffix=".db", dir=directory)
+    os.close(fd)
+    os.remove(path)
+    saved = database.DB_DIR, database.DB_PATH, database.DB_URL
+    url = database.use_database(path)
+    invalidate_config()
+    try:
+        yield path
+    finally:
+        database.dispose_engines(url)
+        database.DB_DIR, database.DB_PATH, database.DB_URL = saved
+        invalidate_config()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def generate_dataset(engine, employees: int = 50, projects: int = 200,
+                     modules_per_project: int = 20, seed: int = 1) -> dict:
+    """
+    Fill an initialised database with synthetic rows.  Every third project
+    is saved with an estimate and maintenance records; every ninth also has
+    an actual.  Returns the row counts written.
+    """
+    rng = random.Random(seed)
+    session = Session(bind=engine)
+    cfg = get_config(session)
+    complexities, app_types = sorted(cfg.complexity), sorted(cfg.app_types)
+    region_ids = [r for (r,) in session.execute(select(RegionMultiplier.id))]
+
+    emp_rows = []
+    for i in range(employees):
+        salary = rng.randrange(30_000, 250_000, 500)
+        emp_rows.append(dict(name=f"Employee {i}", role=rng.choice(ROLES), base_salary=salary,
+                             real_monthly_cost=salary * 1.32, hourly_cost=round(salary * 1.32 / 176, 2),
+                             is_active=rng.random() > 0.05))
+    session.execute(insert(Employee), emp_rows)
+    emp_ids = [e for (e,) in session.execute(select(Employee.id))]
+
+    session.execute(insert(InfraCost), [
+        dict(name=f"Infra {i}", category="Hosting", cost=rng.randrange(500, 50_000))
+        for i in range(20)])
+    session.execute(insert(StackCost), [
+        dict(name=f"Stack {i}", category="License", cost=rng.randrange(100, 20_000))
+        for i in range(20)])
+
+    project_rows = [
+        dict(name=f"Project {p}", client_name=f"Client {p % 97}",
+             complexity=rng.choice(complexities), app_type=rng.choice(app_types),
+             region_id=rng.choice(region_ids), function_points=rng.randrange(0, 400),
+             estimated_duration_months=rng.choice([0.0, 3.0, 6.0, 12.0]),
+             profit_margin_pct=rng.choice([15.0, 20.0, 35.0]), status="active")
+        for p in range(projects)
+    ]
+    session.execute(insert(Project), project_rows)
+    project_ids = [p for (p,) in session.execute(select(Project.id).order_by(Project.id))]
+
+    module_rows = [
+        dict(project_id=pid, name=f"Module {k}", employee_id=rng.choice(emp_ids),
+             estimated_hours=rng.choice([8.0, 16.0, 40.0, 80.0, 120.0]),
+             hourly_rate_override=rng.choice([None, None, None, 1500.0]))
+        for pid in project_ids for k in range(modules_per_project)
+    ]
+    if module_rows:
+        session.execute(insert(ProjectModule), module_rows)
+
+    saved = project_ids[::3]
+    estimate_rows, maintenance_rows, actual_rows = [], [], []
+    for n, pid in enumerate(saved):
+        labor = rng.uniform(1e5, 5e6)
+        gross = labor + rng.uniform(0, 1e5)
+        safe = gross * 1.25
+        final = safe * 1.2
+        estimate_rows.append(dict(project_id=pid, total_labor_cost=labor, gross_cost=gross,
+                                  safe_cost=safe, profit_amount=final - safe, final_price=final))
+        maintenance_rows += [dict(project_id=pid, year=y, annual_cost=labor * 0.09) for y in range(1, 6)]
+        if n % 3 == 0:
+            actual_rows.append(dict(project_id=pid, actual_cost=final * rng.uniform(0.8, 1.3)))
+    for model, rows in ((Estimate, estimate_rows), (MaintenanceRecord, maintenance_rows), (Actual, actual_rows)):
+        if rows:
+            session.execute(insert(model), rows)
+    session.commit()
+    session.close()
+    return {"employees": employees, "projects": projects, "modules": len(module_rows),
+            "estimates": len(estimate_rows), "actuals": len(actual_rows)}
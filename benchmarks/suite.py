@@ -0,0 +1,307 @@
+"""
+Apeiron CostEstimation Pro – Benchmark Suite
+============================================
+Times the engine, persistence and PDF paths against a synthetic database
+(see benchmarks.datagen) and records the results as JSON so runs from
+different releases can be compared.
+
+Each benchmark runs `repeat` times; the median is the headline figure.
+`ops` is the number of operations per run (e.g. format_inr calls), so
+per_op_s = median_s / ops.
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import selectinload
+
+from app import database
+from app.aggregates import DIMENSIONS, portfolio_totals, portfolio_by
+from app.assignment import assign_employees
+from app.config_registry import get_config, invalidate_config
+from app.logic import run_full_estimation, format_inr, create_audit_entry
+from app.models import (
+    Employee, Project, ProjectModule, Estimate, MaintenanceRecord, InfraCost, StackCost,
+)
+from app.proposal_generator import generate_proposal_pdf
+from app.repository import load_project_for_analysis, load_project_for_proposal
+from benchmarks.datagen import temp_database, generate_dataset
+
+RESULTS_FORMAT = 1
+DEFAULT_TOLERANCE = 0.20      # slow-down ratio reported as a regression
+
+
+def _measure(fn, repeat: int, ops: int = 1, setup=None) -> dict:
+    """Run fn() `repeat` times (after setup(), untimed) and summarise wall times."""
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    return {"runs": repeat, "ops": ops, "min_s": min(times), "median_s": median,
+            "mean_s": statistics.fmean(times), "per_op_s": median / ops}
+
+
+def _git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, timeout=5, cwd=os.path.dirname(os.path.dirname(__file__)))
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+# ──────────────────────────────────────────────
+# BENCHMARKS
+# ──────────────────────────────────────────────
+def bench_init_database(repeat: int) -> dict:
+    """Cold start: schema creation and default seeding on an empty database file."""
+    def run():
+        with temp_database():
+            database.init_database()
+    return _measure(run, repeat)
+
+
+def bench_init_database_warm(repeat: int) -> dict:
+    """Warm start: init_database() on an initialised file, fresh engine each run."""
+    with temp_database():
+        database.init_database()
+
+        def run():
+            database.dispose_engines(database.DB_URL)
+            database.init_database()
+        return _measure(run, repeat)
+
+
+def bench_format_inr(repeat: int, ops: int = 10_000) -> dict:
+    amounts = [i * 1234.567 for i in range(ops)]
+    return _measure(lambda: [format_inr(a) for a in amounts], repeat, ops)
+
+
+def bench_run_full_estimation(session, repeat: int) -> dict:
+    """One saved project's modules through the full pipeline (config cached)."""
+    project = (session.query(Project)
+               .options(selectinload(Project.modules).selectinload(ProjectModule.employee))
+               .order_by(Project.id).first())
+    infra, stack = session.query(InfraCost).all(), session.query(StackCost).all()
+    get_config(session)
+    return _measure(lambda: run_full_estimation(
+        session, project.modules, project.complexity, project.app_type, 1.5, infra, stack,
+        15, 10, 20, function_points=project.function_points, estimated_duration_months=6,
+    ), repeat, ops=len(project.modules))
+
+
+def bench_config_reload(session, repeat: int) -> dict:
+    """Configuration snapshot reload after invalidate_config() (six SELECTs)."""
+    def run():
+        invalidate_config()
+        get_config(session)
+    return _measure(run, repeat)
+
+
+def bench_refresh_queries(session, repeat: int) -> dict:
+    """The list queries behind the UI's table and combo refreshes."""
+    def run():
+        session.expire_all()
+        session.query(Employee).filter_by(is_active=True).all()
+        session.query(InfraCost).all()
+        session.query(StackCost).all()
+        for p in session.query(Project).all():
+            p.name, p.client_name
+    return _measure(run, repeat)
+
+
+def bench_load_analysis(session, repeat: int, projects: int = 50) -> dict:
+    """Per-project loads as on the Analysis tab (load_project_for_analysis)."""
+    ids = [pid for (pid,) in session.query(Estimate.project_id).limit(projects)]
+
+    def run():
+        session.expire_all()
+        for pid in ids:
+            load_project_for_analysis(session, pid)
+    return _measure(run, repeat, ops=max(len(ids), 1))
+
+
+def bench_save_estimation(session, repeat: int) -> dict:
+    """_save_estimation-style write: project, modules, estimate, maintenance, audit."""
+    template = (session.query(Project).options(selectinload(Project.modules))
+                .order_by(Project.id).first())
+    result = run_full_estimation(session, template.modules, template.complexity,
+                                 template.app_type, 1.0, [], [], 15, 10, 20)
+    counter = iter(range(10 ** 9))
+
+    def run():
+        p = Project(name=f"Bench {next(counter)}", app_type=template.app_type,
+                    complexity=template.complexity, status="active")
+        session.add(p)
+        session.flush()
+        for m, mc in zip(template.modules, result["labor"]["module_costs"]):
+            session.add(ProjectModule(project_id=p.id, name=m.name, estimated_hours=m.estimated_hours,
+                                      employee_id=m.employee_id, cost=mc["cost"]))
+        session.add(Estimate(project_id=p.id, total_labor_cost=result["labor"]["adjusted_labor_total"],
+                             gross_cost=result["gross_cost"], safe_cost=result["risk_buffer"]["safe_cost"],
+                             final_price=result["final_pricing"]["final_price"]))
+        for mf in result["maintenance_forecast"]:
+            session.add(MaintenanceRecord(project_id=p.id, year=mf["year"], annual_cost=mf["annual_cost"]))
+        create_audit_entry(session, "projects", p.id, "CREATE")
+        session.commit()
+    return _measure(run, repeat)
+
+
+def bench_commit_latency(session, repeat: int, ops: int = 200) -> dict:
+    """One audited single-row commit per op: the journal sync cost per commit."""
+    def run():
+        for i in range(ops):
+            create_audit_entry(session, "bench", i, "UPDATE")
+            session.commit()
+    return _measure(run, repeat, ops)
+
+
+def bench_audit_batch(session, repeat: int, ops: int = 1_000) -> dict:
+    """`ops` audit entries recorded in one transaction (a bulk operation)."""
+    def run():
+        for i in range(ops):
+            create_audit_entry(session, "bench", i, "UPDATE", "cost", i, i + 1)
+        session.commit()
+    return _measure(run, repeat, ops)
+
+
+def bench_portfolio_summary(session, repeat: int) -> dict:
+    """Portfolio totals plus the breakdown by every dimension (aggregate tables)."""
+    def run():
+        portfolio_totals(session)
+        for dimension in DIMENSIONS:
+            portfolio_by(session, dimension)
+    return _measure(run, repeat, ops=len(DIMENSIONS) + 1)
+
+
+def bench_assign_employees(session, repeat: int, modules: int = 500) -> dict:
+    """Cost-optimal staffing of saved modules across every employee (160 h capacity)."""
+    employees = session.query(Employee).all()
+    mods = (session.query(ProjectModule).options(selectinload(ProjectModule.employee))
+            .order_by(ProjectModule.id).limit(modules).all())
+    return _measure(lambda: assign_employees(mods, employees, capacity_hours=160),
+                    repeat, ops=len(mods))
+
+
+def bench_proposal_pdf(session, repeat: int) -> dict:
+    """Client proposal PDF for a saved project."""
+    (pid,) = session.query(Estimate.project_id).order_by(Estimate.project_id).first()
+    p = load_project_for_proposal(session, pid)
+    est = p.estimate
+    stages = p.stage_distribution()
+    scope = [m.name for m in p.modules]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "proposal.pdf")
+        return _measure(lambda: generate_proposal_pdf(
+            filepath=path, project_name=p.name, client_name=p.client_name, app_type=p.app_type,
+            complexity=p.complexity, description=p.description or "",
+            timeline_months=p.estimated_duration_months, scope_modules=scope,
+            final_price=est.final_price, stage_distribution=stages,
+            maintenance_annual=est.total_labor_cost * 0.09, maintenance_years=3,
+            payment_terms="40% advance, 30% milestone, 30% delivery",
+        ), repeat)
+
+
+# ──────────────────────────────────────────────
+# SUITE
+# ──────────────────────────────────────────────
+def run_suite(employees: int = 50, projects: int = 200, modules_per_project: int = 20,
+              repeat: int = 5, seed: int = 1, only=None, progress=None,
+              sqlite_profile: str = None) -> dict:
+    """
+    Build the synthetic database and run every benchmark (or those named
+    in `only`), optionally under another SQLite profile ("safe", "fast").
+    Returns {"format", "meta", "dataset", "results"}.
+    """
+    results = {}
+    saved_profile = database.SQLITE_PROFILE
+    if sqlite_profile:
+        database.set_sqlite_profile(sqlite_profile)
+
+    def wanted(name):
+        return only is None or name in only
+
+    def record(name, fn, *args):
+        if wanted(name):
+            if progress:
+                progress(name)
+            results[name] = fn(*args)
+
+    record("init_database", bench_init_database, repeat)
+    record("init_database_warm", bench_init_database_warm, repeat)
+    record("format_inr", bench_format_inr, repeat)
+    with temp_database():
+        engine = database.init_database()
+        dataset = generate_dataset(engine, employees, projects, modules_per_project, seed)
+        session = database.get_session()
+        try:
+            record("run_full_estimation", bench_run_full_estimation, session, repeat)
+            record("config_reload", bench_config_reload, session, repeat)
+            record("refresh_queries", bench_refresh_queries, session, repeat)
+            record("load_analysis", bench_load_analysis, session, repeat)
+            record("save_estimation", bench_save_estimation, session, repeat)
+            record("commit_latency", bench_commit_latency, session, repeat)
+            record("audit_batch", bench_audit_batch, session, repeat)
+            record("portfolio_summary", bench_portfolio_summary, session, repeat)
+            record("assign_employees", bench_assign_employees, session, repeat)
+            record("proposal_pdf", bench_proposal_pdf, session, repeat)
+        finally:
+            session.close()
+            profile = database.SQLITE_PROFILE
+            if sqlite_profile:
+                database.set_sqlite_profile(saved_profile)
+
+    return {
+        "format": RESULTS_FORMAT,
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+            "sqlite_profile": profile,
+        },
+        "dataset": dataset,
+        "results": results,
+    }
+
+
+def save_results(report: dict, path: str):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def compare(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Per-benchmark comparison of median times present in both reports:
+    [{"name", "baseline_s", "current_s", "ratio", "regressed"}], slowest
+    ratio first.  `regressed` is ratio > 1 + tolerance.
+    """
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        rows.append({"name": name, "baseline_s": base["median_s"], "current_s": cur["median_s"],
+                     "ratio": ratio, "regressed": ratio > 1 + tolerance})
+    rows.sort(key=lambda r: r["ratio"], reverse=True)
+    return rows
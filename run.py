@@ -6,8 +6,9 @@ Launch the PyQt6 desktop application.
 """
 
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
-from app.database import init_database
+from app.database import init_database, dispose_engines
 from app.main_ui import MainWindow
 from app.ui_theme import build_stylesheet
 
@@ -24,8 +25,11 @@ def main():
     window = MainWindow()
     window.show()
 
-    sys.exit(app.exec())
+    code = app.exec()
+    dispose_engines()
+    sys.exit(code)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # portfolio repricing workers in frozen builds
     main()
@@ -0,0 +1,34 @@
+"""
+Apeiron CostEstimation Pro – Shared Test Doubles
+================================================
+"""
+
+import itertools
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+_bind_ids = itertools.count()
+
+
+def mock_config_session(complexity: dict = None, app_types: dict = None):
+    """
+    MagicMock session whose configuration tables hold the given
+    name → multiplier rows (everything else is empty).  Each call yields a
+    distinct bind, so the config registry caches a fresh snapshot per test.
+    """
+    tables = {
+        "ComplexityMultiplier": complexity or {},
+        "AppTypeMultiplier": app_types or {},
+    }
+    session = MagicMock()
+    session.get_bind.return_value.url = f"mock://config-{next(_bind_ids)}"
+    def query(model):
+        rows = [SimpleNamespace(name=n, multiplier=m)
+                for n, m in tables.get(model.__name__, {}).items()]
+        q = MagicMock()
+        q.all.return_value = rows
+        q.order_by.return_value.all.return_value = rows
+        q.options.return_value.all.return_value = rows
+        return q
+    session.query.side_effect = query
+    return session
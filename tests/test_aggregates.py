@@ -0,0 +1,210 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Portfolio Aggregates
+================================================================
+"""
+
+import random
+from collections import defaultdict
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert, text, update
+from sqlalchemy.orm import sessionmaker
+
+from app.aggregates import (
+    DIMENSIONS, portfolio_totals, portfolio_by, portfolio_stats, rebuild_aggregates,
+)
+from app.logic import calculate_variance
+from app.migrations import migrate
+from app.models import (
+    Base, Money, Project, Estimate, Actual, PortfolioAggregate, drop_aggregate_triggers,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    s = sessionmaker(bind=engine)()
+    rng = random.Random(7)
+    for i in range(60):
+        p = Project(name=f"P{i}", client_name=rng.choice(["Acme", "Globex", "", None]),
+                    app_type=rng.choice(["AI", "Gaming", "Productivity"]),
+                    complexity=rng.choice(["Simple", "Medium", "Complex"]),
+                    status=rng.choice(["draft", "active", "completed"]),
+                    created_at=datetime(2026, rng.randint(1, 6), rng.randint(1, 28)))
+        if i % 4:
+            price = rng.choice([0.0, 125000.5, 480000.0, 1234567.89])
+            p.estimate = Estimate(final_price=price, gross_cost=price * 0.7,
+                                  profit_amount=round(price * 0.15, 2))
+        if i % 3 == 0:
+            p.actual = Actual(actual_cost=rng.choice([0.0, 100000.0, 510000.25]))
+        s.add(p)
+    s.commit()
+    yield s
+    s.close()
+
+
+def _key(p, dimension):
+    value = {"status": p.status, "app_type": p.app_type, "complexity": p.complexity,
+             "client": p.client_name, "month": p.created_at.strftime("%Y-%m")}[dimension]
+    return value or ""
+
+
+def _expected(session, dimension=None) -> dict:
+    """The same figures computed the slow way, from every loaded project."""
+    groups = defaultdict(list)
+    for p in session.query(Project).all():
+        groups[_key(p, dimension) if dimension else ""].append(p)
+    out = {}
+    for key, projects in groups.items():
+        est = [p.estimate for p in projects if p.estimate]
+        pipeline = round(sum(e.final_price for e in est), 2)
+        profit = round(sum(e.profit_amount for e in est), 2)
+        variances = [round(calculate_variance(p.estimate.final_price, p.actual.actual_cost)
+                           ["variance_pct"] * 100)                          # basis points
+                     for p in projects if p.actual and p.estimate and p.estimate.final_price > 0]
+        out[key] = (len(projects), len(est), pipeline, profit,
+                    round(profit * 100 / pipeline, 2) if pipeline else 0.0,
+                    sum(1 for p in projects if p.actual),
+                    round(sum(p.actual.actual_cost for p in projects if p.actual), 2),
+                    round(sum(variances) / len(variances) / 100, 2) if variances else 0.0)
+    return out
+
+
+def _actual(stats) -> dict:
+    return {s.key: (s.projects, s.estimated, s.pipeline_value, s.profit_amount, s.margin_pct,
+                    s.actuals, s.actual_cost, s.avg_variance_pct) for s in stats}
+
+
+def _assert_consistent(session):
+    session.expire_all()
+    assert _actual([portfolio_totals(session)]) == _expected(session)
+    for dimension in DIMENSIONS:
+        assert _actual(portfolio_by(session, dimension)) == _expected(session, dimension)
+
+
+class TestPortfolioAggregates:
+    def test_matches_full_scan(self, session):
+        _assert_consistent(session)
+        ai = portfolio_stats(session, "app_type", "AI")
+        assert ai == next(s for s in portfolio_by(session, "app_type") if s.key == "AI")
+        assert portfolio_stats(session, "client", "Nobody") is None
+        with pytest.raises(ValueError):
+            portfolio_by(session, "region")
+
+    def test_orm_updates_and_deletes(self, session):
+        projects = session.query(Project).order_by(Project.id).all()
+        projects[0].status = "completed"
+        projects[1].client_name = "Initech"
+        projects[2].estimate = None                                  # delete-orphan
+        projects[5].estimate.final_price = 999999.99
+        projects[7].actual = Actual(actual_cost=42.0)
+        projects[9].actual.actual_cost = 777.0
+        session.delete(projects[10])
+        session.commit()
+        _assert_consistent(session)
+
+    def test_bulk_core_writes(self, session):
+        """Portfolio-reprice style executemany statements are covered too."""
+        ids = [e.id for e in session.query(Estimate).all()]
+        session.execute(update(Estimate), [{"id": i, "final_price": 1000.0 * i} for i in ids])
+        bare = [p.id for p in session.query(Project).filter(~Project.actual.has())]
+        session.execute(insert(Actual), [{"project_id": pid, "actual_cost": 500.0} for pid in bare[:10]])
+        session.commit()
+        _assert_consistent(session)
+
+    def test_unchanged_update_skips_triggers(self, session):
+        before = session.execute(text("SELECT total_changes()")).scalar()
+        session.execute(text("UPDATE estimates SET final_price = final_price"))
+        # only the estimates rows themselves: the WHEN clause suppresses the triggers
+        assert session.execute(text("SELECT total_changes()")).scalar() - before == \
+            session.query(Estimate).count()
+
+    def test_rollback_leaves_aggregates(self, session):
+        totals = portfolio_totals(session)
+        session.add(Project(name="Tmp", estimate=Estimate(final_price=5.0)))
+        session.flush()
+        assert portfolio_totals(session).projects == totals.projects + 1
+        session.rollback()
+        assert portfolio_totals(session) == totals
+
+    def test_lookup_uses_index(self, session):
+        plan = " ".join(r[-1] for r in session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM portfolio_aggregates "
+            "WHERE dimension = 'app_type' AND key = 'AI'")))
+        assert "ix_portfolio_aggregates_dimension_key" in plan and "SCAN" not in plan
+
+    def test_rebuild_matches_incremental(self, session):
+        rows = lambda: sorted(session.execute(text(
+            "SELECT dimension, key, project_count, pipeline_value, variance_bp_total "
+            "FROM portfolio_aggregates WHERE project_count > 0")).all())
+        incremental = rows()
+        assert rebuild_aggregates(session) == len(incremental)
+        assert rows() == incremental
+
+    def test_empty_portfolio(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        s = sessionmaker(bind=engine)()
+        assert portfolio_totals(s).projects == 0 and portfolio_by(s, "status") == []
+
+
+class TestAggregateMigration:
+    def test_backfills_existing_database(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for (name,) in conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'")).all():
+                conn.execute(text(f"DROP TRIGGER {name}"))
+            conn.execute(text("DROP TABLE portfolio_aggregates"))
+            conn.execute(text("PRAGMA user_version = 3"))
+        s = sessionmaker(bind=engine)()
+        s.add_all([Project(name="A", app_type="AI", estimate=Estimate(final_price=100.0)),
+                   Project(name="B", app_type="AI", actual=Actual(actual_cost=5.0))])
+        s.commit()
+        assert migrate(engine) == [4, 5]
+        assert s.query(PortfolioAggregate).count() > 0
+        _assert_consistent(s)
+        s.add(Project(name="C", app_type="Gaming"))
+        s.commit()
+        _assert_consistent(s)
+        s.close()
+        engine.dispose()
+
+    def test_upgraded_real_columns_give_integer_aggregates(self, tmp_path):
+        """Money columns upgraded in place keep REAL affinity; aggregates stay integral."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'rupees.db'}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            drop_aggregate_triggers(conn)
+            conn.execute(text("DROP TABLE portfolio_aggregates"))
+            for table in ("estimates", "actuals"):
+                ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = :t"),
+                                   {"t": table}).scalar()
+                for column in Base.metadata.tables[table].columns:
+                    if isinstance(column.type, Money):
+                        ddl = ddl.replace(f"{column.name} INTEGER", f"{column.name} FLOAT")
+                conn.execute(text(f"DROP TABLE {table}"))
+                conn.execute(text(ddl))
+            conn.execute(text("INSERT INTO projects (id, name, status) VALUES (1, 'A', 'active')"))
+            conn.execute(text("INSERT INTO estimates (project_id, final_price) VALUES (1, 125000.5)"))
+            conn.execute(text("INSERT INTO actuals (project_id, actual_cost) VALUES (1, 133339.66)"))
+            conn.execute(text("PRAGMA user_version = 0"))
+        migrate(engine)
+
+        def variance(conn):
+            return conn.execute(text(
+                "SELECT variance_bp_total, typeof(variance_bp_total) FROM portfolio_aggregates "
+                "WHERE dimension = 'all'")).one()
+
+        with engine.begin() as conn:
+            assert conn.execute(text("SELECT typeof(final_price) FROM estimates")).scalar() == "real"
+            expected = round(calculate_variance(125000.5, 133339.66)["variance_pct"] * 100)
+            assert tuple(variance(conn)) == (expected, "integer")
+            conn.execute(text("UPDATE actuals SET actual_cost = actual_cost + 1"))   # trigger path
+            triggered = tuple(variance(conn))
+            rebuild_aggregates(conn)
+            assert tuple(variance(conn)) == triggered and triggered[1] == "integer"
+        engine.dispose()
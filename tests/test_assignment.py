@@ -0,0 +1,101 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Cost-Optimal Staffing
+=================================================================
+"""
+
+import itertools
+import random
+from types import SimpleNamespace
+
+from app.assignment import assign_employees
+from app.logic import calculate_total_labor_cost
+from tests.mocks import mock_config_session
+
+
+def _emp(i, role, rate, active=True):
+    return SimpleNamespace(id=i, name=f"E{i}", role=role, hourly_cost=rate, is_active=active)
+
+
+def _mod(hours, employee=None, override=None):
+    return SimpleNamespace(name="M", estimated_hours=hours, hourly_rate_override=override,
+                           employee=employee, cost=0)
+
+
+def _brute_force(modules, roles, employees, cap):
+    best = None
+    for combo in itertools.product(range(len(employees)), repeat=len(modules)):
+        used = [0.0] * len(employees)
+        cost = 0.0
+        for m, role, j in zip(modules, roles, combo):
+            if role not in (None, employees[j].role):
+                break
+            used[j] += m.estimated_hours
+            cost += m.estimated_hours * employees[j].hourly_cost
+        else:
+            if max(used) <= cap and (best is None or cost < best):
+                best = cost
+    return best
+
+
+class TestAssignEmployees:
+    def test_cheapest_in_role(self):
+        dev_hi, dev_lo, qa = _emp(1, "Dev", 900.0), _emp(2, "Dev", 400.0), _emp(3, "QA", 100.0)
+        mods = [_mod(40, dev_hi), _mod(10, qa)]
+        r = assign_employees(mods, [dev_hi, dev_lo, qa])
+        assert [m.employee for m in r["modules"]] == [dev_lo, qa]
+        assert r["savings"] == 40 * 500.0
+        assert r["optimal"]
+
+    def test_capacity_spills_to_next_cheapest(self):
+        a, b = _emp(1, "Dev", 100.0), _emp(2, "Dev", 200.0)
+        mods = [_mod(30, a), _mod(20, a), _mod(20, a)]
+        r = assign_employees(mods, [a, b], capacity_hours=40)
+        # 20 + 20 on the cheap employee beats 30 + nothing
+        assert r["labor_cost"] == 40 * 100 + 30 * 200
+
+    def test_inactive_and_override_modules(self):
+        active, gone = _emp(1, "Dev", 500.0), _emp(2, "Dev", 50.0, active=False)
+        fixed = _mod(10, active, override=2000.0)
+        r = assign_employees([fixed, _mod(5, active)], [active, gone], capacity_hours=12)
+        assert r["modules"][0].employee is active
+        assert r["unassigned"] == [1]  # 10 h fixed + 5 h exceeds 12 h
+        assert r["modules"][1].employee is active and r["reassigned"] == []
+        assert r["labor_cost"] == r["baseline_cost"] == 10 * 2000 + 5 * 500
+
+    def test_unstaffed_modules_keep_employee_and_cost(self):
+        a, b = _emp(1, "Dev", 100.0), _emp(2, "Dev", 200.0)
+        mods = [_mod(30, b), _mod(30, b), _mod(30, b)]
+        r = assign_employees(mods, [a, b], capacity_hours=40)
+        assert len(r["unassigned"]) == 1 and len(r["reassigned"]) == 1
+        assert all(m.employee is not None for m in r["modules"])
+        assert r["modules"][r["reassigned"][0]].employee is a
+        assert r["labor_cost"] == 30 * 100 + 2 * 30 * 200
+        assert r["savings"] == 30 * 100
+
+    def test_matches_brute_force(self):
+        rng = random.Random(9)
+        for _ in range(150):
+            emps = [_emp(j, rng.choice("AB"), rng.choice([100, 150, 200, 333.33])) for j in range(3)]
+            mods = [_mod(rng.choice([5, 10, 20, 30])) for _ in range(5)]
+            roles = [rng.choice(["A", "B", None]) for _ in mods]
+            best = _brute_force(mods, roles, emps, 40)
+            r = assign_employees(mods, emps, roles=roles, capacity_hours=40)
+            if best is None:
+                continue
+            assert not r["unassigned"]
+            assert abs(r["labor_cost"] - best) < 0.01
+
+    def test_output_feeds_labor_calculation(self):
+        emps = [_emp(1, "Dev", 300.0), _emp(2, "Dev", 250.0)]
+        r = assign_employees([_mod(8, emps[0]), _mod(16, emps[0])], emps, region_multiplier=1.5)
+        labor = calculate_total_labor_cost(mock_config_session(), r["modules"], "Medium", "X", 1.5)
+        assert labor["raw_labor_total"] == r["labor_cost"] == 24 * 250 * 1.5
+
+    def test_staffs_large_instance(self):
+        # timed by the assign_employees benchmark (python -m benchmarks)
+        rng = random.Random(3)
+        emps = [_emp(j, rng.choice(["Dev", "QA", "Design", "PM"]), round(rng.uniform(200, 2000), 2))
+                for j in range(300)]
+        mods = [_mod(rng.choice([8, 16, 40, 80, 120]), rng.choice(emps)) for _ in range(500)]
+        r = assign_employees(mods, emps, capacity_hours=160)
+        assert not r["unassigned"] and r["savings"] > 0
@@ -0,0 +1,158 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for the Audit Trail
+===========================================================
+"""
+
+import gzip
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import audit, database
+from app.audit import AuditWriter, archive_audit_log, archive_periods, query_audit
+from app.logic import create_audit_entry
+from app.models import Base, AuditLog, Employee
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    s = sessionmaker(bind=engine)()
+    s.statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cur, stmt, params, ctx, many: s.statements.append((stmt, many)))
+    yield s
+    s.close()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_URL", f"sqlite:///{tmp_path / 'audit.db'}")
+    database.init_database()
+    yield database.DB_URL
+    database.dispose_engines()
+
+
+def _count(url=None):
+    with database.session_scope(url) as s:
+        return s.query(AuditLog).count()
+
+
+class TestInTransactionAudit:
+    def test_written_with_the_callers_commit(self, session):
+        emp = Employee(name="Asha", role="Dev", base_salary=90000)
+        session.add(emp)
+        session.flush()
+        for i in range(50):
+            create_audit_entry(session, "employees", emp.id, "UPDATE", "base_salary", i, i + 1)
+        assert session.query(AuditLog).count() == 0 and len(audit.pending(session)) == 50
+        session.statements.clear()
+        session.commit()
+        inserts = [(stmt, many) for stmt, many in session.statements if "audit_log" in stmt]
+        assert len(inserts) == 1 and inserts[0][1]             # one executemany INSERT
+        rows = session.query(AuditLog).order_by(AuditLog.id).all()
+        assert len(rows) == 50 and (rows[-1].old_value, rows[-1].new_value) == ("49", "50")
+        assert rows[0].timestamp <= rows[-1].timestamp
+
+    def test_does_not_commit_on_its_own(self, session):
+        session.add(Employee(name="Ravi", role="QA", base_salary=1))
+        create_audit_entry(session, "employees", 1, "CREATE")
+        session.rollback()
+        assert session.query(Employee).count() == 0
+        assert session.query(AuditLog).count() == 0 and audit.pending(session) == []
+
+    def test_rollback_discards_then_later_commit_is_clean(self, session):
+        create_audit_entry(session, "projects", 1, "CREATE")
+        session.rollback()
+        create_audit_entry(session, "projects", 2, "CREATE")
+        session.commit()
+        assert [r.record_id for r in session.query(AuditLog)] == [2]
+
+
+class TestAuditWriter:
+    def test_flush_is_a_durability_point(self, db):
+        with AuditWriter(batch_size=64, flush_interval=60) as writer:
+            for i in range(200):
+                writer.record("bench", i, "UPDATE")
+            assert writer.flush(timeout=10)
+            assert _count() == 200 and writer.written == 200
+        assert writer.error is None
+
+    def test_close_drains_and_rejects(self, db):
+        writer = AuditWriter(batch_size=1000, flush_interval=60)
+        for i in range(10):
+            writer.record("bench", i, "DELETE")
+        writer.close()
+        assert _count() == 10
+        with pytest.raises(RuntimeError):
+            writer.record("bench", 11, "DELETE")
+        assert writer.flush()
+
+    def test_bounded_queue_blocks_producers(self, db, monkeypatch):
+        gate = threading.Event()
+        commit = AuditWriter._commit
+        monkeypatch.setattr(AuditWriter, "_commit", lambda self, batch: (gate.wait(), commit(self, batch)))
+        writer = AuditWriter(max_queue=5, batch_size=1, flush_interval=60)
+        producer = threading.Thread(target=lambda: [writer.record("t", i, "U") for i in range(20)])
+        producer.start()
+        producer.join(0.3)
+        assert producer.is_alive()                              # blocked on the full queue
+        gate.set()
+        producer.join(10)
+        writer.close()
+        assert _count() == 20
+
+
+NOW = datetime(2026, 6, 15, 12, 0)
+
+
+@pytest.fixture
+def history(session):
+    """One entry a day for 400 days, cycling over three tables and actions."""
+    session.execute(AuditLog.__table__.insert(), [
+        {"table_name": ("employees", "projects", "actuals")[i % 3], "record_id": i % 7,
+         "action": ("CREATE", "UPDATE", "DELETE")[i // 3 % 3],
+         "timestamp": NOW - timedelta(days=400 - i)}
+        for i in range(400)])
+    session.commit()
+    return session
+
+
+class TestArchival:
+    def test_moves_old_rows_to_monthly_archives(self, history, tmp_path):
+        before = query_audit(history, directory=str(tmp_path))
+        out = archive_audit_log(history, hot_days=90, now=NOW, directory=str(tmp_path))
+        cutoff = NOW - timedelta(days=90)
+        assert out["archived"] == 310 and out["periods"] == archive_periods(str(tmp_path))
+        assert out["periods"][0] == "2025-05" and len(out["periods"]) == 11
+        assert history.query(AuditLog).count() == 90
+        assert history.query(AuditLog).filter(AuditLog.timestamp < cutoff).count() == 0
+        with gzip.open(tmp_path / "audit-2025-06.jsonl.gz", "rt") as fh:
+            assert len(fh.readlines()) == 30
+        assert query_audit(history, directory=str(tmp_path)) == before
+
+    def test_rerun_is_idempotent(self, history, tmp_path):
+        archive_audit_log(history, hot_days=90, now=NOW, directory=str(tmp_path))
+        assert archive_audit_log(history, hot_days=90, now=NOW, directory=str(tmp_path))["archived"] == 0
+        archive_audit_log(history, hot_days=30, now=NOW, directory=str(tmp_path))
+        assert len(query_audit(history, directory=str(tmp_path))) == 400
+
+    def test_query_fans_out_with_filters(self, history, tmp_path):
+        expected = query_audit(history, table_name="projects", action="UPDATE",
+                               since=NOW - timedelta(days=200), until=NOW - timedelta(days=20),
+                               directory=str(tmp_path))
+        archive_audit_log(history, hot_days=60, now=NOW, directory=str(tmp_path))
+        got = query_audit(history, table_name="projects", action="UPDATE",
+                          since=NOW - timedelta(days=200), until=NOW - timedelta(days=20),
+                          directory=str(tmp_path))
+        assert got == expected and got
+        assert {(r.table_name, r.action) for r in got} == {("projects", "UPDATE")}
+        assert [r.timestamp for r in got] == sorted(r.timestamp for r in got)
+        oldest = query_audit(history, limit=5, directory=str(tmp_path))
+        assert [r.id for r in oldest] == [1, 2, 3, 4, 5]
+        assert query_audit(history, record_id=3, directory=str(tmp_path)) == [
+            r for r in query_audit(history, directory=str(tmp_path)) if r.record_id == 3]
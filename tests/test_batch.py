@@ -0,0 +1,122 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for the Batch Engine
+============================================================
+Batch results must match run_full_estimation to the paisa.
+"""
+
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.batch import run_batch_estimation, modules_to_arrays, scenario_multipliers, item_totals
+from app.logic import run_full_estimation
+from tests.mocks import mock_config_session
+
+
+def _session(cx_mult, app_mult):
+    return mock_config_session({"X": cx_mult}, {"Y": app_mult})
+
+
+def _module(hours, rate):
+    return SimpleNamespace(name="M", estimated_hours=hours, hourly_rate_override=rate,
+                           employee=None, cost=0)
+
+
+class TestBatchParity:
+    def test_matches_scalar_engine(self):
+        rng = random.Random(42)
+        n, k = 200, 6
+        hours = np.array([[rng.choice([0, 7.5, 40, 80, 123.25]) for _ in range(k)] for _ in range(n)])
+        rates = np.array([[round(rng.uniform(150, 2500), 2) for _ in range(k)] for _ in range(n)])
+        cx = np.array([rng.choice([0.8, 1.0, 1.3, 1.6]) for _ in range(n)])
+        app = np.array([rng.choice([0.95, 1.1, 1.15, 1.35]) for _ in range(n)])
+        region = np.array([rng.choice([1.0, 1.5, 2.0, 3.5, 4.0]) for _ in range(n)])
+        infra = np.array([rng.uniform(0, 50000) for _ in range(n)])
+        mb = np.array([rng.uniform(0, 30) for _ in range(n)])
+        rk = np.array([rng.uniform(0, 30) for _ in range(n)])
+        pf = np.array([rng.uniform(0, 60) for _ in range(n)])
+
+        batch = run_batch_estimation(
+            hours, rates, cx, app, region, infra, 0.0, mb, rk, pf,
+            function_points=120, estimated_duration_months=6,
+        )
+
+        for i in range(n):
+            # Plain floats: numpy scalars would route round() through numpy.
+            h, r = hours[i].tolist(), rates[i].tolist()
+            cx_i, app_i, region_i, infra_i, mb_i, rk_i, pf_i = (
+                float(a[i]) for a in (cx, app, region, infra, mb, rk, pf))
+            mods = [_module(h[j], r[j]) for j in range(k)]
+            scalar = run_full_estimation(
+                session=_session(cx_i, app_i), modules=mods,
+                complexity="X", app_type="Y", region_multiplier=region_i,
+                infra_items=[SimpleNamespace(cost=infra_i)], stack_items=[],
+                maintenance_buffer_pct=mb_i, risk_contingency_pct=rk_i,
+                profit_margin_pct=pf_i, function_points=120,
+                estimated_duration_months=6,
+            )
+            assert batch["gross_cost"][i] == scalar["gross_cost"]
+            assert batch["risk_buffer"]["safe_cost"][i] == scalar["risk_buffer"]["safe_cost"]
+            assert batch["final_pricing"]["final_price"][i] == scalar["final_pricing"]["final_price"]
+            for stage, value in scalar["stage_distribution"].items():
+                assert batch["stage_distribution"][stage][i] == value
+            assert list(batch["maintenance_forecast"]["cumulative_cost"][i]) == [
+                y["cumulative_cost"] for y in scalar["maintenance_forecast"]
+            ]
+            for key, value in scalar["analytics"].items():
+                assert batch["analytics"][key][i] == value
+
+    def test_shared_module_row_broadcasts(self):
+        result = run_batch_estimation([100, 200], [500, 300], profit_margin_pct=[0, 10, 20])
+        assert result["labor"]["adjusted_labor_total"].tolist() == [110000.0] * 3
+        assert result["final_pricing"]["final_price"].tolist() == [137500.0, 151250.0, 165000.0]
+
+    def test_zero_division_guards(self):
+        result = run_batch_estimation([[0.0]], [[0.0]])
+        assert result["analytics"]["person_months"][0] == 0.0
+        assert result["analytics"]["revenue_margin_pct"][0] == 0.0
+
+
+class TestItemTotals:
+    def test_sums_items_like_scalar_engine(self):
+        infra = [[SimpleNamespace(cost=c) for c in items]
+                 for items in ([0.005] * 3, [0.1, 0.2, 1999.995], [])]
+        stack = [[SimpleNamespace(cost=0.015)] * 5] * 3
+        batch = run_batch_estimation([10.0], [100.0], infra_total=item_totals(infra),
+                                     stack_total=item_totals(stack))
+        for i in range(3):
+            scalar = run_full_estimation(
+                session=_session(1.0, 1.0), modules=[_module(10.0, 100.0)],
+                complexity="X", app_type="Y", region_multiplier=1.0,
+                infra_items=infra[i], stack_items=stack[i], maintenance_buffer_pct=15,
+                risk_contingency_pct=10, profit_margin_pct=20,
+            )
+            for key, value in scalar["infra_stack"].items():
+                assert batch["infra_stack"][key][i] == value
+            assert batch["final_pricing"]["final_price"][i] == scalar["final_pricing"]["final_price"]
+
+
+class TestModulesToArrays:
+    def test_rate_resolution(self):
+        emp = SimpleNamespace(hourly_cost=400)
+        mods = [
+            SimpleNamespace(estimated_hours=10, hourly_rate_override=900, employee=emp),
+            SimpleNamespace(estimated_hours=20, hourly_rate_override=None, employee=emp),
+            SimpleNamespace(estimated_hours=30, hourly_rate_override=None, employee=None),
+        ]
+        hours, rates = modules_to_arrays(mods)
+        assert hours.tolist() == [10, 20, 30]
+        assert rates.tolist() == pytest.approx([900, 400, 0])
+
+
+class TestScenarioMultipliers:
+    def test_resolves_names_through_cube(self):
+        session = _session(1.3, 1.35)
+        kw = scenario_multipliers(session, ["X", "Other"], ["Y", "Y"], ["Nowhere", "Nowhere"])
+        assert kw["complexity_multiplier"].tolist() == [1.3, 1.0]
+        assert kw["app_type_adjustment"].tolist() == [1.35, 1.35]
+        assert kw["region_multiplier"].tolist() == [1.0, 1.0]
+        out = run_batch_estimation([10.0], [100.0], **kw)
+        assert out["labor"]["adjusted_labor_total"].tolist() == [1755.0, 1350.0]
@@ -0,0 +1,44 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for the Benchmark Suite
+===============================================================
+Runs the suite at toy scale to keep it importable and its output stable.
+"""
+
+from app import database
+from benchmarks.suite import run_suite, save_results, load_results, compare
+
+BENCHMARKS = {"init_database", "init_database_warm", "format_inr", "run_full_estimation", "config_reload",
+              "refresh_queries", "load_analysis", "save_estimation", "commit_latency", "audit_batch", "portfolio_summary",
+              "assign_employees", "proposal_pdf"}
+
+
+class TestBenchmarkSuite:
+    def test_tiny_run_round_trips(self, tmp_path):
+        url = database.DB_URL
+        report = run_suite(employees=4, projects=6, modules_per_project=3, repeat=1)
+        assert database.DB_URL == url
+        assert set(report["results"]) == BENCHMARKS
+        assert report["dataset"] == {"employees": 4, "projects": 6, "modules": 18,
+                                     "estimates": 2, "actuals": 1}
+        assert all(r["median_s"] > 0 and r["runs"] == 1 for r in report["results"].values())
+        path = tmp_path / "bench.json"
+        save_results(report, str(path))
+        assert load_results(str(path)) == report
+
+    def test_sqlite_profile_is_restored(self):
+        before = database.SQLITE_PROFILE
+        report = run_suite(employees=2, projects=3, modules_per_project=2, repeat=1,
+                           only={"commit_latency"}, sqlite_profile="safe")
+        assert report["meta"]["sqlite_profile"] == "safe"
+        assert report["results"]["commit_latency"]["ops"] == 200
+        assert database.SQLITE_PROFILE == before
+
+    def test_only_and_compare(self):
+        report = run_suite(employees=2, projects=3, modules_per_project=2, repeat=1,
+                           only={"format_inr"})
+        assert set(report["results"]) == {"format_inr"}
+        slower = {"results": {"format_inr": dict(report["results"]["format_inr"],
+                                                 median_s=report["results"]["format_inr"]["median_s"] * 2)}}
+        rows = compare(report, slower, tolerance=0.2)
+        assert rows[0]["name"] == "format_inr" and rows[0]["regressed"]
+        assert not compare(slower, report)[0]["regressed"]
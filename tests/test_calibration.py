@@ -0,0 +1,138 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Multiplier Calibration
+==================================================================
+"""
+
+import math
+import random
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.calibration import MultiplierCalibrator, apply_calibration, implied_log_ratio
+from app.config_registry import get_config, invalidate_config
+from app.models import (
+    Base, Project, ProjectModule, Estimate, Actual, ComplexityMultiplier, AppTypeMultiplier,
+)
+
+CURRENT_CX = {"Simple": 0.8, "Medium": 1.0, "Complex": 1.3}
+CURRENT_APP = {"AI": 1.35, "Gaming": 1.2}
+# what the actuals say the combined factors should have been
+TRUE_CX = {"Simple": 0.9, "Medium": 1.0, "Complex": 1.5}
+TRUE_APP = {"AI": 1.35, "Gaming": 1.08}
+
+
+def _add_project(session, rng, complexity, app_type, with_actual=True):
+    labor = rng.uniform(50_000, 900_000)
+    infra = rng.choice([0.0, 12_000.0])
+    gross = labor + infra
+    markup = rng.uniform(1.3, 1.8)
+    drift = (TRUE_CX[complexity] * TRUE_APP[app_type]) / (CURRENT_CX[complexity] * CURRENT_APP[app_type])
+    p = Project(name="P", complexity=complexity, app_type=app_type)
+    raw = labor / (CURRENT_CX[complexity] * CURRENT_APP[app_type])
+    p.modules = [ProjectModule(name="A", estimated_hours=1, cost=raw * 0.25),
+                 ProjectModule(name="B", estimated_hours=1, cost=raw * 0.75)]
+    p.estimate = Estimate(total_labor_cost=labor, total_infra_cost=infra, total_stack_cost=0.0,
+                          gross_cost=gross, final_price=gross * markup)
+    if with_actual:
+        p.actual = Actual(actual_cost=(labor * drift + infra) * markup)
+    session.add(p)
+    return p
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    s = sessionmaker(bind=engine)()
+    s.add_all([ComplexityMultiplier(name=n, multiplier=m) for n, m in CURRENT_CX.items()])
+    s.add_all([AppTypeMultiplier(name=n, multiplier=m) for n, m in CURRENT_APP.items()])
+    rng = random.Random(5)
+    for i in range(120):
+        _add_project(s, rng, rng.choice(list(CURRENT_CX)), rng.choice(list(CURRENT_APP)),
+                     with_actual=i % 4 != 0)
+    s.commit()
+    invalidate_config()
+    yield s
+    s.close()
+
+
+class TestImpliedLogRatio:
+    def test_recovers_labor_drift(self):
+        y = implied_log_ratio(100_000, 10_000, 5_000, 115_000, 138_000, (120_000 + 15_000) * 1.2)
+        assert math.isclose(y, math.log(1.2), rel_tol=1e-12)
+
+    def test_unusable_rows_are_nan(self):
+        y = implied_log_ratio([0, 100, 100], [0, 0, 500], 0, [100, 100, 600], [120, 0, 720], [150, 150, 100])
+        assert np.isnan(y).all()
+
+
+class TestMultiplierCalibrator:
+    def test_fit_explains_actuals(self, session):
+        fit = MultiplierCalibrator.from_session(session, ridge=1e-6).fit()
+        assert fit["projects"] == 90
+        assert fit["rmse_before"] > 0.05 and fit["rmse_after"] < 1e-4
+        # only the combined factor is identifiable from actuals
+        for cx in CURRENT_CX:
+            for app in CURRENT_APP:
+                got = fit["complexity"][cx]["suggested"] * fit["app_types"][app]["suggested"]
+                assert got == pytest.approx(TRUE_CX[cx] * TRUE_APP[app], rel=1e-3)
+
+    def test_ridge_keeps_unobserved_levels(self, session):
+        session.add(ComplexityMultiplier(name="Enterprise", multiplier=1.6))
+        session.commit()
+        invalidate_config()
+        fit = MultiplierCalibrator.from_session(session).fit()
+        assert fit["complexity"]["Enterprise"] == {"current": 1.6, "suggested": 1.6, "projects": 0}
+
+    def test_incremental_matches_full_refit(self, session):
+        cal = MultiplierCalibrator.from_session(session)
+        rng = random.Random(8)
+        new = _add_project(session, rng, "Complex", "Gaming")
+        session.commit()
+        assert cal.record_actual(session, new.id)
+        # re-recording an edited actual replaces the old observation
+        new.actual.actual_cost *= 1.1
+        session.commit()
+        assert cal.record_actual(session, new.id)
+        assert len(cal) == 91
+        fresh = MultiplierCalibrator.from_session(session).fit()
+        got = cal.fit()
+        assert got["rmse_after"] == pytest.approx(fresh["rmse_after"])
+        for key in ("complexity", "app_types"):
+            assert got[key] == fresh[key]
+
+    def test_apply_writes_multipliers(self, session):
+        fit = MultiplierCalibrator.from_session(session).fit()
+        version = get_config(session).version
+        assert apply_calibration(session, fit) > 0
+        cfg = get_config(session)
+        assert cfg.version > version
+        assert cfg.complexity["Complex"] == fit["complexity"]["Complex"]["suggested"]
+
+    def test_calibrate_apply_calibrate_is_idempotent(self, session):
+        first = MultiplierCalibrator.from_session(session).fit()
+        assert apply_calibration(session, first) > 0
+        again = MultiplierCalibrator.from_session(session).fit()
+        for key in ("complexity", "app_types"):
+            assert {n: lv["suggested"] for n, lv in again[key].items()} == \
+                {n: lv["suggested"] for n, lv in first[key].items()}
+            assert all(lv["current"] == lv["suggested"] for lv in again[key].values())
+        assert again["rmse_before"] == pytest.approx(again["rmse_after"], rel=1e-2)  # 4 dp rounding
+        assert apply_calibration(session, again) == 0
+
+    def test_refit_is_fast_at_scale(self):
+        n = 50_000
+        rng = np.random.default_rng(1)
+        cal = MultiplierCalibrator({f"C{i}": 1.0 for i in range(6)}, {f"A{i}": 1.0 for i in range(12)})
+        cal.observe_many(range(n), [f"C{i}" for i in rng.integers(0, 6, n)],
+                         [f"A{i}" for i in rng.integers(0, 12, n)], rng.normal(0.05, 0.1, n))
+        start = time.perf_counter()
+        fit = cal.fit()
+        cal.observe(n, "C0", "A0", 0.2)
+        cal.fit()
+        assert time.perf_counter() - start < 0.05
+        assert fit["projects"] == n
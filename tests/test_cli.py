@@ -0,0 +1,103 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for the Headless Batch Estimator
+=======================================================================
+"""
+
+import csv
+import json
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from app import cli, database
+from app.config_registry import invalidate_config
+from app.logic import run_full_estimation
+from app.models import Employee
+
+SCENARIOS = [
+    {"id": "Q1", "complexity": "Complex", "app_type": "AI", "region": "Asia",
+     "modules": [{"name": "API", "hours": 80, "employee_id": 1},
+                 {"name": "UI", "hours": 40, "rate": 900}],
+     "infra_total": 12000, "profit_margin_pct": 25, "function_points": 40},
+    {"id": "Q2", "modules": [{"name": "X", "hours": 10, "rate": 500}], "region": "Mars"},
+    {"id": "Q3", "complexity": "Simple", "app_type": "Gaming", "region_multiplier": 2,
+     "modules": [{"name": "Y", "hours": 12.5, "rate": 640}], "stack_items": [{"cost": 99}, {"cost": 1}]},
+]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = tmp_path / "cli.db"
+    monkeypatch.setattr(database, "DB_DIR", str(tmp_path))
+    monkeypatch.setattr(database, "DB_PATH", str(path))
+    monkeypatch.setattr(database, "DB_URL", f"sqlite:///{path}")
+    database.init_database()
+    with database.session_scope() as s:
+        s.add(Employee(name="Asha", role="Dev", base_salary=90000, hourly_cost=650.0))
+    invalidate_config()
+    yield path
+    invalidate_config()
+    database.dispose_engines()
+
+
+def _expected_q1():
+    session = database.get_session()
+    modules = [SimpleNamespace(name="API", estimated_hours=80.0, hourly_rate_override=None,
+                               employee=SimpleNamespace(hourly_cost=650.0), cost=0),
+               SimpleNamespace(name="UI", estimated_hours=40.0, hourly_rate_override=900.0,
+                               employee=None, cost=0)]
+    r = run_full_estimation(session, modules, "Complex", "AI", 1.5, [SimpleNamespace(cost=12000.0)],
+                            [], 15, 10, 25, function_points=40)
+    session.close()
+    return r
+
+
+class TestBatchEstimator:
+    def test_prices_in_order_with_errors(self, db):
+        results = list(cli.estimate_scenarios(iter(SCENARIOS), workers=1))
+        assert [sid for sid, _, _ in results] == ["Q1", "Q2", "Q3"]
+        assert results[0][1] == _expected_q1()
+        assert results[1][1] is None and "Unknown region" in results[1][2]
+        assert results[2][1]["infra_stack"]["stack_total"] == 100.0
+
+    def test_malformed_module_fails_only_its_row(self, db):
+        bad = [{"id": "B1", "modules": ["API"]}, {"id": "B2", "modules": "API"}]
+        for workers in (1, 2):
+            results = list(cli.estimate_scenarios(iter([bad[0], SCENARIOS[0], bad[1]]), workers=workers))
+            assert [sid for sid, _, _ in results] == ["B1", "Q1", "B2"]
+            assert results[1][1] == _expected_q1()
+            assert all(r is None and "AttributeError" in e for _, r, e in (results[0], results[2]))
+
+    def test_worker_pool_matches_in_process(self, db):
+        scenarios = [dict(SCENARIOS[0], id=i, profit_margin_pct=i % 40) for i in range(30)]
+        serial = list(cli.estimate_scenarios(iter(scenarios), workers=1))
+        pooled = list(cli.estimate_scenarios(iter(scenarios), workers=2, chunk_size=4))
+        assert pooled == serial
+
+    def test_csv_in_csv_out(self, db, tmp_path):
+        src = tmp_path / "sc.csv"
+        src.write_text("scenario,module,hours,rate,employee_id,complexity,app_type\n"
+                       "A,API,80,,1,Complex,AI\nA,UI,40,900,,,\nB,Only,10,500,,Simple,Gaming\n")
+        out = tmp_path / "out.csv"
+        rc = cli.main([str(src), "--out", str(out), "--workers", "1", "--db", str(db)])
+        assert rc == 0
+        rows = list(csv.DictReader(out.open()))
+        assert [r["id"] for r in rows] == ["A", "B"]
+        assert float(rows[0]["raw_labor_total"]) == 80 * 650 + 40 * 900
+
+    def test_jsonl_exit_code_on_failure(self, db, tmp_path):
+        src = tmp_path / "sc.jsonl"
+        src.write_text("\n".join(json.dumps(s) for s in SCENARIOS))
+        out = tmp_path / "out.jsonl"
+        assert cli.main([str(src), "--out", str(out), "--workers", "1"]) == 1
+        lines = [json.loads(line) for line in out.read_text().splitlines()]
+        assert lines[0]["final_pricing"] == _expected_q1()["final_pricing"]
+        assert "error" in lines[1]
+
+    def test_no_gui_imports(self):
+        code = ("import sys, app.cli; "
+                "print(sorted(m for m in ('PyQt6', 'matplotlib', 'reportlab') if m in sys.modules))")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == "[]"
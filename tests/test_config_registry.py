@@ -0,0 +1,117 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for the Config Snapshot Registry
+========================================================================
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.config_registry import ConfigRegistry
+from app.models import (
+    Base, ComplexityMultiplier, AppTypeMultiplier, RegionMultiplier,
+    PricingStrategy, SystemLookup, IndustryPreset, IndustryPresetModule,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    s = sessionmaker(bind=engine)()
+    s.add_all([
+        ComplexityMultiplier(name="Simple", multiplier=0.8),
+        AppTypeMultiplier(name="AI", multiplier=1.35),
+        RegionMultiplier(region_name="India", multiplier=1.0),
+        PricingStrategy(name="Competitive", profit_margin_pct=10, risk_contingency_pct=5),
+        SystemLookup(category="role", value="Architect"),
+        SystemLookup(category="role", value="QA Tester"),
+    ])
+    preset = IndustryPreset(name="SaaS MVP")
+    preset.modules = [IndustryPresetModule(name="Auth", default_hours=60)]
+    s.add(preset)
+    s.commit()
+    yield s
+    s.close()
+
+
+def _count_queries(session):
+    counter = {"n": 0}
+    def on_execute(*_):
+        counter["n"] += 1
+    event.listen(session.get_bind(), "before_cursor_execute", on_execute)
+    return counter
+
+
+class TestConfigRegistry:
+    def test_snapshot_contents(self, session):
+        snap = ConfigRegistry().snapshot(session)
+        assert snap.complexity["Simple"] == 0.8
+        assert snap.app_types["AI"] == 1.35
+        assert snap.regions["India"].multiplier == 1.0
+        assert snap.region_by_id(snap.regions["India"].id).name == "India"
+        assert snap.pricing["Competitive"].profit_margin_pct == 10
+        assert snap.lookups["role"] == ("Architect", "QA Tester")
+        assert snap.presets["SaaS MVP"].modules == (("Auth", 60.0),)
+
+    def test_snapshot_is_immutable(self, session):
+        snap = ConfigRegistry().snapshot(session)
+        with pytest.raises(TypeError):
+            snap.complexity["Simple"] = 2.0
+
+    def test_repeat_reads_hit_memory(self, session):
+        reg = ConfigRegistry()
+        reg.snapshot(session)
+        counter = _count_queries(session)
+        for _ in range(50):
+            reg.snapshot(session).complexity.get("Simple")
+        assert counter["n"] == 0
+
+    def test_invalidate_reloads(self, session):
+        reg = ConfigRegistry()
+        first = reg.snapshot(session)
+        session.add(ComplexityMultiplier(name="Enterprise", multiplier=1.6))
+        session.commit()
+        assert "Enterprise" not in reg.snapshot(session).complexity
+        assert reg.invalidate() == first.version + 1
+        assert reg.snapshot(session).complexity["Enterprise"] == 1.6
+
+    def test_in_memory_databases_do_not_share(self, session):
+        reg = ConfigRegistry()
+        reg.snapshot(session)
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        other = sessionmaker(bind=engine)()
+        other.add(ComplexityMultiplier(name="Simple", multiplier=1.1))
+        other.commit()
+        assert reg.snapshot(other).complexity == {"Simple": 1.1}
+        assert reg.snapshot(session).complexity == {"Simple": 0.8}
+        other.close()
+
+
+class TestMultiplierCube:
+    def test_factors_are_products(self, session):
+        session.add_all([
+            ComplexityMultiplier(name="Complex", multiplier=1.3),
+            RegionMultiplier(region_name="Asia", multiplier=1.5),
+        ])
+        session.commit()
+        cube = ConfigRegistry().snapshot(session).cube
+        assert cube.shape == (3, 2, 3)  # each axis + the "unknown" slot
+        assert cube.factor("Complex", "AI", "Asia") == pytest.approx(1.3 * 1.35 * 1.5)
+        assert cube.factor("Nope", "AI", "Nope") == pytest.approx(1.35)
+
+    def test_vector_gather(self, session):
+        cube = ConfigRegistry().snapshot(session).cube
+        codes = cube.encode(["Simple", "Simple", "Other"], ["AI", "X", "AI"], ["India"] * 3)
+        assert cube.gather(*codes).tolist() == pytest.approx([0.8 * 1.35, 0.8, 1.35])
+        cx, app, region = cube.components(*codes)
+        assert cx.tolist() == [0.8, 0.8, 1.0]
+
+    def test_rebuilt_on_invalidate(self, session):
+        reg = ConfigRegistry()
+        assert reg.snapshot(session).cube.factor("Simple", "AI", "India") == pytest.approx(1.08)
+        session.query(ComplexityMultiplier).filter_by(name="Simple").one().multiplier = 0.5
+        session.commit()
+        reg.invalidate()
+        assert reg.snapshot(session).cube.factor("Simple", "AI", "India") == pytest.approx(0.675)
@@ -0,0 +1,142 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Engine and Session Management
+=========================================================================
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.pool import QueuePool
+
+from app import database
+from app.models import AppMeta, Employee, IndustryPreset, RegionMultiplier
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_URL", f"sqlite:///{tmp_path / 'pool.db'}")
+    database.init_database()
+    yield database.DB_URL
+    database.dispose_engines()
+
+
+class TestEngineCache:
+    def test_one_engine_per_url(self, db, tmp_path):
+        engine = database.get_engine()
+        assert database.get_engine(db) is engine
+        assert isinstance(engine.pool, QueuePool) and engine.pool.size() == database.POOL_SIZE
+        other = database.get_engine(f"sqlite:///{tmp_path / 'other.db'}")
+        assert other is not engine
+
+    def test_sessions_share_the_engine(self, db):
+        a, b = database.get_session(), database.get_session()
+        assert a is not b and a.get_bind() is b.get_bind() is database.get_engine()
+        a.close(), b.close()
+
+    def test_dispose_drops_the_engine(self, db):
+        engine = database.get_engine()
+        database.dispose_engines(db)
+        assert database.get_engine() is not engine
+
+    def test_memory_url_keeps_default_pool(self):
+        engine = database.get_engine("sqlite://")
+        try:
+            assert not isinstance(engine.pool, QueuePool)
+        finally:
+            database.dispose_engines("sqlite://")
+
+
+class TestSessionLifecycle:
+    def test_current_session_is_per_thread(self, db):
+        main = database.current_session()
+        assert database.current_session() is main
+        seen = []
+        t = threading.Thread(target=lambda: (seen.append(database.current_session()),
+                                             database.remove_session()))
+        t.start()
+        t.join()
+        assert seen[0] is not main
+        database.remove_session()
+        assert database.current_session() is not main
+        database.remove_session()
+
+    def test_session_scope_commits(self, db):
+        with database.session_scope() as s:
+            s.add(Employee(name="Asha", role="Dev", base_salary=90000, hourly_cost=650.0))
+        with database.session_scope() as s:
+            assert s.query(Employee).count() == 1
+
+    def test_session_scope_rolls_back(self, db):
+        with pytest.raises(RuntimeError):
+            with database.session_scope() as s:
+                s.add(Employee(name="Ravi", role="QA", base_salary=50000, hourly_cost=300.0))
+                s.flush()
+                raise RuntimeError("boom")
+        with database.session_scope() as s:
+            assert s.query(Employee).count() == 0
+
+
+class TestSQLiteProfile:
+    def test_profile_applied_on_connect(self, db):
+        s = database.sqlite_settings()
+        assert s["journal_mode"] == "wal" and s["auto_vacuum"] == 2
+        assert s["synchronous"] == 1 and s["temp_store"] == 2        # fast: NORMAL, MEMORY
+        database.set_sqlite_profile("safe")
+        try:
+            assert database.sqlite_settings()["synchronous"] == 2    # FULL
+        finally:
+            database.set_sqlite_profile("fast")
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            database.set_sqlite_profile("reckless")
+
+    def test_maintenance_analyzes_then_optimizes(self, db, tmp_path):
+        url = f"sqlite:///{tmp_path / 'fresh.db'}"
+        database.get_engine(url)
+        assert database.maintain_database(url)["analyzed"] is True
+        assert database.maintain_database(url)["analyzed"] is False
+
+    def test_incremental_vacuum_frees_pages(self, db):
+        with database.session_scope() as s:
+            s.add_all(Employee(name="x" * 500, role="Dev", base_salary=1, hourly_cost=1.0)
+                      for _ in range(2000))
+        with database.session_scope() as s:
+            s.query(Employee).delete()
+        assert database.vacuum_database(pages=10) == 10
+        assert database.vacuum_database() > 0
+        assert database.vacuum_database() == 0
+
+
+class TestInitStamp:
+    def test_warm_start_is_one_query(self, db):
+        statements = []
+        engine = database.get_engine()
+        listener = lambda conn, cur, stmt, *a: statements.append(stmt)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            assert database.init_database() is engine
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert len(statements) == 1
+
+    def test_seeds_once_and_stamps(self, db):
+        with database.session_scope() as s:
+            assert s.get(AppMeta, "seed_version").value == str(database.SEED_VERSION)
+            assert s.query(RegionMultiplier).count() == 5
+            presets = s.query(IndustryPreset).all()
+            assert len(presets) == len(database.INDUSTRY_PRESETS)
+            assert all(len(p.modules) == len(database.INDUSTRY_PRESETS[p.name]["modules"])
+                       for p in presets)
+            s.delete(s.get(AppMeta, "seed_version"))         # e.g. an older release's file
+        database.init_database()
+        with database.session_scope() as s:
+            assert s.query(RegionMultiplier).count() == 5    # not seeded twice
+            assert s.get(AppMeta, "seed_version") is not None
+
+    def test_missing_table_forces_cold_path(self, db):
+        with database.get_engine().begin() as conn:
+            conn.exec_driver_sql("DROP TABLE audit_log")
+        database.init_database()
+        assert "audit_log" in inspect(database.get_engine()).get_table_names()
@@ -0,0 +1,129 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Incremental Re-Estimation
+=====================================================================
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.incremental import IncrementalEstimator
+from app.logic import run_full_estimation
+from tests.mocks import mock_config_session
+
+
+def _modules(n):
+    return [SimpleNamespace(name=f"M{i}", estimated_hours=10.0 + i % 7,
+                            hourly_rate_override=300.0 + 25 * (i % 11), employee=None, cost=0)
+            for i in range(n)]
+
+
+BASE = dict(
+    complexity="Medium", app_type="Productivity", region_multiplier=1.0,
+    infra_items=[SimpleNamespace(cost=12000.0)], stack_items=[SimpleNamespace(cost=3500.0)],
+    maintenance_buffer_pct=15, risk_contingency_pct=10, profit_margin_pct=20,
+    function_points=50, estimated_duration_months=4,
+)
+
+
+def _full(session, modules, **overrides):
+    kw = dict(BASE, **overrides)
+    fresh = [SimpleNamespace(**vars(m)) for m in modules]
+    return run_full_estimation(session=session, modules=fresh, **kw)
+
+
+class TestIncrementalEstimator:
+    def setup_method(self):
+        self.session = mock_config_session({"Complex": 1.3}, {"AI": 1.35})
+
+    def test_initial_result_matches_full_pipeline(self):
+        mods = _modules(25)
+        est = IncrementalEstimator(self.session, mods, **BASE)
+        assert est.result() == _full(self.session, mods)
+
+    def test_module_edit_matches_full_pipeline(self):
+        mods = _modules(25)
+        est = IncrementalEstimator(self.session, mods, **BASE)
+        est.result()
+        est.set_module_hours(3, 77.5)
+        est.set_module_rate_override(8, 1250.0)
+        est.remove_module(0)
+        est.add_module(SimpleNamespace(name="New", estimated_hours=40.0,
+                                       hourly_rate_override=900.0, employee=None, cost=0))
+        assert est.result() == _full(self.session, est.modules)
+
+    def test_scalar_edits_match_full_pipeline(self):
+        mods = _modules(10)
+        est = IncrementalEstimator(self.session, mods, **BASE)
+        est.result()
+        est.update(complexity="Complex", app_type="AI", region_multiplier=1.5, profit_margin_pct=35)
+        expected = _full(self.session, mods, complexity="Complex", app_type="AI",
+                         region_multiplier=1.5, profit_margin_pct=35)
+        assert est.result() == expected
+
+    def test_profit_change_only_reprices_tail(self):
+        est = IncrementalEstimator(self.session, _modules(10), **BASE)
+        est.result()
+        est.update(profit_margin_pct=30)
+        est.result()
+        assert est.last_recomputed == ("final", "analytics")
+
+    def test_infra_change_skips_labor_and_stages(self):
+        est = IncrementalEstimator(self.session, _modules(10), **BASE)
+        est.result()
+        est.set_infra_items([SimpleNamespace(cost=1.0)])
+        est.result()
+        assert est.last_recomputed == ("infra_stack", "gross", "risk", "final", "analytics")
+
+    def test_unchanged_input_is_noop(self):
+        est = IncrementalEstimator(self.session, _modules(5), **BASE)
+        est.result()
+        est.update(profit_margin_pct=20)
+        assert est.dirty_stages == ()
+
+    def test_unknown_input(self):
+        est = IncrementalEstimator(self.session, _modules(1), **BASE)
+        with pytest.raises(KeyError):
+            est.update(discount_pct=5)
+
+    def test_results_are_snapshots(self):
+        est = IncrementalEstimator(self.session, _modules(5), **BASE)
+        first = est.result()
+        rows = list(first["labor"]["module_costs"])
+        est.set_module_hours(2, 99.0)
+        est.remove_module(0)
+        assert list(first["labor"]["module_costs"]) == rows
+        assert est.result()["labor"]["module_costs"][1]["hours"] == 99.0
+
+    def test_hours_do_not_drift(self):
+        mods = _modules(3)
+        est = IncrementalEstimator(self.session, mods, **BASE)
+        for i in range(1, 1001):
+            est.set_module_hours(i % 3, 10.0 + (i % 10) / 10)
+        total = est.result()["analytics"]["total_hours"]
+        assert total == sum(m.estimated_hours for m in est.modules)
+
+    def test_fractional_hours_match_full_pipeline(self):
+        mods = _modules(6)
+        for m, hours in zip(mods, (0.1, 0.2, 33.33, 0.7, 12.35, 0.05)):
+            m.estimated_hours = hours
+        est = IncrementalEstimator(self.session, mods, **BASE)
+        est.result()
+        est.set_module_hours(1, 0.15)
+        est.remove_module(4)
+        est.add_module(SimpleNamespace(name="New", estimated_hours=0.01,
+                                       hourly_rate_override=900.0, employee=None, cost=0))
+        got, expected = est.result()["analytics"], _full(self.session, est.modules)["analytics"]
+        assert got["total_hours"] == expected["total_hours"]
+        assert got["person_months"] == expected["person_months"]
+        assert got == expected
+
+    def test_single_edit_on_large_quote_is_fast(self):
+        est = IncrementalEstimator(self.session, _modules(2000), **BASE)
+        est.result()
+        start = time.perf_counter()
+        for i in range(100):
+            est.set_module_hours(i, 50.0)
+            est.result()
+        assert (time.perf_counter() - start) / 100 < 0.005
@@ -7,6 +7,7 @@ stage distribution, maintenance forecast, variance, formatting.
 
 import pytest
 from unittest.mock import MagicMock
+from tests.mocks import mock_config_session
 from app.logic import (
     compute_hourly_from_salary,
     get_complexity_multiplier,
@@ -63,34 +64,25 @@ class TestEmployeeCost:
 # COMPLEXITY & APP TYPE
 # ──────────────────────────────────────────────
 class TestMultipliers:
-    def _mock_session(self, multiplier_value):
-        session = MagicMock()
-        query = MagicMock()
-        record = MagicMock()
-        record.multiplier = multiplier_value
-        session.query.return_value = query
-        query.filter_by.return_value = query
-        query.first.return_value = record
-        return session
-
     def test_complexity_known(self):
-        session = self._mock_session(0.8)
+        session = mock_config_session(complexity={"Simple": 0.8})
         assert get_complexity_multiplier(session, "Simple") == 0.8
 
     def test_complexity_unknown(self):
-        session = MagicMock()
-        session.query().filter_by().first.return_value = None
+        session = mock_config_session(complexity={"Simple": 0.8})
         assert get_complexity_multiplier(session, "Unknown") == 1.0
 
     def test_app_type_known(self):
-        session = self._mock_session(1.35)
+        session = mock_config_session(app_types={"AI": 1.35})
         assert get_app_type_adjustment(session, "AI") == 1.35
 
     def test_app_type_unknown(self):
-        session = MagicMock()
-        session.query().filter_by().first.return_value = None
+        session = mock_config_session(app_types={"AI": 1.35})
         assert get_app_type_adjustment(session, "Unknown") == 1.0
 
+    def test_no_session(self):
+        assert get_complexity_multiplier(None, "Simple") == 1.0
+
 
 # ──────────────────────────────────────────────
 # MODULE & LABOR COST
@@ -125,24 +117,10 @@ class TestLaborCost:
         cost = calculate_module_cost(mod)
         assert cost == 50000.0
 
-    def _mock_session(self, cx_mult, app_mult):
-        session = MagicMock()
-        def side_effect(model):
-            q = MagicMock()
-            rec = MagicMock()
-            if model.__name__ == 'ComplexityMultiplier':
-                rec.multiplier = cx_mult
-            else:
-                rec.multiplier = app_mult
-            q.filter_by.return_value.first.return_value = rec
-            return q
-        session.query.side_effect = side_effect
-        return session
-
     def test_total_labor_cost(self):
         m1 = self._mock_module("A", 100, 500)
         m2 = self._mock_module("B", 200, 300)
-        session = self._mock_session(1.0, 1.0)
+        session = mock_config_session({"Medium": 1.0}, {"Productivity": 1.0})
         result = calculate_total_labor_cost(session, [m1, m2], "Medium", "Productivity")
         # raw = 50000 + 60000 = 110000, cx=1.0, app=1.0
         assert result["raw_labor_total"] == 110000.0
@@ -150,7 +128,7 @@ class TestLaborCost:
 
     def test_total_labor_cost_complex_ai(self):
         m1 = self._mock_module("A", 100, 500)
-        session = self._mock_session(1.3, 1.35)
+        session = mock_config_session({"Complex": 1.3}, {"AI": 1.35})
         result = calculate_total_labor_cost(session, [m1], "Complex", "AI")
         # raw = 50000, cx=1.3, app=1.35 → 50000 * 1.3 * 1.35 = 87750
         assert result["adjusted_labor_total"] == pytest.approx(87750.0)
@@ -281,10 +259,12 @@ class TestAnalytics:
     def test_burn_rate(self):
         assert burn_rate_monthly(600000, 6) == 100000.0
         assert burn_rate_monthly(600000, 0) == 0.0
+        assert burn_rate_monthly(600000, 0.00004) == 0.0       # rounds to 0 at 1/10,000
 
     def test_revenue_margin(self):
         assert revenue_margin(150000, 125000) == pytest.approx(16.67, rel=0.01)
         assert revenue_margin(0, 125000) == 0.0
+        assert revenue_margin(0.004, 0.001) == 0.0              # rounds to 0 paise
 
     def test_contribution_margin(self):
         assert contribution_margin(150000, 60000) == 90000.0
@@ -328,15 +308,8 @@ class TestFullEstimation:
         mod.employee = emp
         mod.cost = 0
 
-        session = MagicMock()
-        def side_effect(model):
-            q = MagicMock()
-            rec = MagicMock()
-            rec.multiplier = 1.0
-            q.filter_by.return_value.first.return_value = rec
-            return q
-        session.query.side_effect = side_effect
-        
+        session = mock_config_session({"Medium": 1.0}, {"Productivity": 1.0})
+
         result = run_full_estimation(
             session=session,
             modules=[mod],
@@ -0,0 +1,92 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Schema Migrations
+=============================================================
+"""
+
+import pytest
+from sqlalchemy import Column, create_engine, inspect, text
+
+from app import migrations
+from app.migrations import migrate, schema_version, SCHEMA_VERSION, Migration
+from app.models import Base, Money
+
+NEW_INDEXES = {"ix_project_modules_project_id", "ix_maintenance_records_project_id",
+               "ix_system_lookup_category", "ix_audit_log_record", "ix_projects_status_client",
+               "ix_audit_log_action", "ix_audit_log_timestamp"}
+
+
+def _index_names(engine):
+    insp = inspect(engine)
+    return {ix["name"] for t in insp.get_table_names() for ix in insp.get_indexes(t)}
+
+
+def _plan(engine, sql):
+    with engine.connect() as conn:
+        return " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A version-1 database: current tables, but created before the indexes existed."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("PRAGMA user_version = 1"))
+    yield engine
+    engine.dispose()
+
+
+class TestMigrations:
+    def test_fresh_database_is_stamped(self):
+        engine = create_engine("sqlite://")
+        assert migrate(engine) == list(range(1, SCHEMA_VERSION + 1))
+        assert schema_version(engine) == SCHEMA_VERSION and migrate(engine) == []
+
+    def test_adds_indexes_to_live_database(self, legacy_engine):
+        assert not NEW_INDEXES & _index_names(legacy_engine)
+        assert "SCAN" in _plan(legacy_engine, "SELECT * FROM project_modules WHERE project_id = 1")
+        assert migrate(legacy_engine) == list(range(2, SCHEMA_VERSION + 1))
+        assert NEW_INDEXES <= _index_names(legacy_engine)
+        for sql in ("SELECT * FROM project_modules WHERE project_id = 1",
+                    "SELECT * FROM maintenance_records WHERE project_id = 1",
+                    "SELECT * FROM system_lookup WHERE category = 'role'",
+                    "SELECT * FROM audit_log WHERE table_name = 'projects' AND record_id = 3 "
+                    "ORDER BY timestamp",
+                    "SELECT * FROM projects WHERE status = 'active' ORDER BY client_name",
+                    "SELECT * FROM audit_log WHERE action = 'DELETE' AND timestamp >= '2026-01-01' "
+                    "ORDER BY timestamp",
+                    "SELECT * FROM audit_log WHERE timestamp < '2026-01-01' ORDER BY timestamp"):
+            plan = _plan(legacy_engine, sql)
+            assert "USING INDEX" in plan and "TEMP B-TREE" not in plan, sql
+
+    def test_failed_step_rolls_back_and_resumes(self, legacy_engine, monkeypatch):
+        def broken(conn, existing):
+            conn.execute(text("CREATE INDEX ix_half_done ON projects (name)"))
+            raise RuntimeError("interrupted")
+        monkeypatch.setattr(migrations, "MIGRATIONS",
+                            migrations.MIGRATIONS + [Migration(SCHEMA_VERSION + 1, "broken", broken)])
+        with pytest.raises(RuntimeError):
+            migrate(legacy_engine, target=SCHEMA_VERSION + 1)
+        assert schema_version(legacy_engine) == SCHEMA_VERSION
+        assert "ix_half_done" not in _index_names(legacy_engine)
+
+    def test_money_step_ignores_columns_added_later(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'rupees.db'}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO employees (name, role, base_salary, hourly_cost) "
+                              "VALUES ('Asha', 'Dev', 90000.5, 650.25)"))
+            conn.execute(text("PRAGMA user_version = 0"))
+        # a Money column from a later release, absent from this database
+        table = Base.metadata.tables["employees"]
+        table.append_column(Column("bonus", Money))
+        try:
+            assert migrate(engine)[0] == 1
+        finally:
+            table._columns.remove(table.c.bonus)
+        with engine.connect() as conn:
+            assert tuple(conn.execute(text("SELECT base_salary, hourly_cost FROM employees")).one()) \
+                == (9000050, 65025)
+        engine.dispose()
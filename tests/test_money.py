@@ -0,0 +1,78 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Fixed-Point Money
+=============================================================
+"""
+
+import random
+
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.migrations import migrate
+from app.models import Base, Employee
+from app.money import (
+    to_paise, from_paise, pct_of, mul_div,
+    to_paise_array, mul_div_array, pct_of_array,
+)
+
+
+class TestScalar:
+    def test_half_up_on_decimal_value(self):
+        # Binary floats for these sit just below the tie; the typed value wins.
+        assert to_paise(2.675) == 268
+        assert to_paise(1.005) == 101
+        assert to_paise(0.125) == 13
+        assert to_paise(-2.675) == -268
+
+    def test_round_trip(self):
+        for paise in (0, 1, 99, 12345678, -4550):
+            assert to_paise(from_paise(paise)) == paise
+
+    def test_mul_div_half_up(self):
+        assert mul_div(5, 1, 2) == 3
+        assert mul_div(-5, 1, 2) == -3
+        assert mul_div(4, 1, 3) == 1
+
+    def test_pct_of(self):
+        assert pct_of(100_000, 12.5) == 12_500
+        assert pct_of(333, 15) == 50  # 49.95 → 50
+
+    def test_no_float_drift(self):
+        total = sum(to_paise(0.1) for _ in range(1000))
+        assert from_paise(total) == 100.0
+
+
+class TestArrays:
+    def test_to_paise_array_matches_scalar(self):
+        rng = random.Random(3)
+        values = [round(rng.uniform(0, 1e6), 3) for _ in range(5000)]
+        values += [2.675, 1.005, 0.125, 1234.565, 0.285]
+        assert to_paise_array(values).tolist() == [to_paise(v) for v in values]
+
+    def test_mul_div_array_matches_scalar(self):
+        rng = random.Random(5)
+        values = [rng.randrange(0, 10**12) for _ in range(2000)]
+        got = mul_div_array(np.array(values), 13_500 * 11_500, 10**8)
+        assert got.tolist() == [mul_div(v, 13_500 * 11_500, 10**8) for v in values]
+
+    def test_pct_of_array(self):
+        assert pct_of_array([100_000, 333], [12.5, 15]).tolist() == [12_500, 50]
+
+
+class TestLegacyUpgrade:
+    def test_rupee_floats_become_paise_once(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO employees (name, role, base_salary, real_monthly_cost, hourly_cost) "
+                "VALUES ('A', 'Dev', 50000.5, 2.675, NULL)"))
+        assert migrate(engine, target=1) == [1]
+        assert migrate(engine, target=1) == []  # second run is a no-op
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA user_version")).scalar() == 1
+            raw = conn.execute(text("SELECT base_salary, real_monthly_cost FROM employees")).one()
+        assert tuple(raw) == (5_000_050, 268)
+        emp = sessionmaker(bind=engine)().query(Employee).one()
+        assert (emp.base_salary, emp.real_monthly_cost, emp.hourly_cost) == (50000.5, 2.68, None)
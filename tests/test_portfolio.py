@@ -0,0 +1,151 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Portfolio Repricing
+===============================================================
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config_registry import invalidate_config
+from app.logic import run_full_estimation
+from app.models import (
+    Base, Project, ProjectModule, Employee, Estimate, MaintenanceRecord,
+    ComplexityMultiplier, AppTypeMultiplier, RegionMultiplier,
+)
+from app.portfolio import reprice_portfolio
+from app.revisions import load_revision, list_revisions
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    s = sessionmaker(bind=engine)()
+    s.add_all([
+        ComplexityMultiplier(name="Medium", multiplier=1.0),
+        ComplexityMultiplier(name="Complex", multiplier=1.3),
+        AppTypeMultiplier(name="AI", multiplier=1.35),
+        RegionMultiplier(region_name="India", multiplier=1.0),
+        RegionMultiplier(region_name="Asia", multiplier=1.5),
+    ])
+    emp = Employee(name="Asha", role="Dev", base_salary=90000, hourly_cost=650.0)
+    s.add(emp)
+    s.flush()
+    rng = random.Random(11)
+    regions = [None] + [r.id for r in s.query(RegionMultiplier).all()]
+    for i in range(40):
+        p = Project(name=f"P{i}", complexity=rng.choice(["Medium", "Complex", "Legacy"]),
+                    app_type=rng.choice(["AI", "Productivity"]), region_id=rng.choice(regions),
+                    function_points=rng.choice([0, 25]), estimated_duration_months=rng.choice([0, 3.5]),
+                    profit_margin_pct=rng.choice([15, 20, 35]))
+        p.modules = [
+            ProjectModule(name=f"M{j}", estimated_hours=rng.choice([8, 40, 77.5]),
+                          hourly_rate_override=rng.choice([None, 1200.0]), employee=emp)
+            for j in range(i % 6)
+        ]
+        if i % 5:
+            p.estimate = Estimate(total_infra_cost=rng.choice([0, 12000.0]),
+                                  total_stack_cost=3500.0, final_price=1.0)
+        s.add(p)
+    s.commit()
+    invalidate_config()
+    yield s
+    s.close()
+
+
+def _expected(session, project):
+    est = project.estimate
+    modules = [SimpleNamespace(name=m.name, estimated_hours=m.estimated_hours,
+                               hourly_rate_override=m.hourly_rate_override,
+                               employee=m.employee, cost=0) for m in project.modules]
+    region = project.region.multiplier if project.region else 1.0
+    return run_full_estimation(
+        session, modules, project.complexity, project.app_type, region,
+        [SimpleNamespace(cost=est.total_infra_cost if est else 0.0)],
+        [SimpleNamespace(cost=est.total_stack_cost if est else 0.0)],
+        project.maintenance_buffer_pct, project.risk_contingency_pct, project.profit_margin_pct,
+        function_points=project.function_points,
+        estimated_duration_months=project.estimated_duration_months,
+    )
+
+
+class TestRepricePortfolio:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_matches_scalar_engine(self, session, workers):
+        estimated = session.query(Project).filter(Project.estimate.has())
+        expected = {p.id: _expected(session, p) for p in estimated}
+        report = reprice_portfolio(session, workers=workers, chunk_size=7)
+        session.expire_all()
+        assert report["projects"] == 32
+        for p in estimated:
+            r = expected[p.id]
+            assert p.estimate.final_price == r["final_pricing"]["final_price"]
+            assert p.estimate.safe_cost == r["risk_buffer"]["safe_cost"]
+            assert p.estimate.burn_rate_monthly == r["analytics"]["burn_rate_monthly"]
+            assert [m.cost for m in p.modules] == [mc["cost"] for mc in r["labor"]["module_costs"]]
+            assert [(m.year, m.annual_cost) for m in sorted(p.maintenance_records, key=lambda m: m.year)] == \
+                [(f["year"], f["annual_cost"]) for f in r["maintenance_forecast"]]
+
+    def test_reports_deltas_and_is_idempotent(self, session):
+        first = reprice_portfolio(session, workers=1)
+        assert first["changed"] == 32
+        assert first["deltas"][0]["delta"] == max(abs(d["delta"]) for d in first["deltas"])
+        assert first["total_delta"] == round(first["total_new"] - first["total_old"], 2)
+        assert reprice_portfolio(session, workers=1)["changed"] == 0
+
+    def test_master_data_change_reprices(self, session):
+        reprice_portfolio(session, workers=1)
+        session.query(ComplexityMultiplier).filter_by(name="Complex").one().multiplier = 1.6
+        session.commit()
+        invalidate_config()
+        report = reprice_portfolio(session, workers=1, dry_run=True)
+        complex_ids = {p.id for p in session.query(Project).filter_by(complexity="Complex")
+                       if p.modules and p.estimate}
+        assert {d["project_id"] for d in report["deltas"]} == complex_ids
+        assert all(d["delta"] > 0 for d in report["deltas"])
+        # dry run leaves the stored estimates alone
+        assert reprice_portfolio(session, workers=1)["changed"] == len(complex_ids)
+
+    def test_empty_portfolio(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        report = reprice_portfolio(sessionmaker(bind=engine)(), workers=1)
+        assert report["projects"] == 0 and report["deltas"] == []
+
+    def test_maintenance_rows_replaced(self, session):
+        reprice_portfolio(session, workers=1)
+        reprice_portfolio(session, workers=1)
+        assert session.query(MaintenanceRecord).count() == 32 * 5
+
+    def test_unestimated_projects_are_left_alone(self, session):
+        drafts = {p.id for p in session.query(Project).filter(~Project.estimate.has())}
+        reprice_portfolio(session, workers=1)
+        assert session.query(Estimate).filter(Estimate.project_id.in_(drafts)).count() == 0
+        assert session.query(MaintenanceRecord).filter(
+            MaintenanceRecord.project_id.in_(drafts)).count() == 0
+        # opt-in prices them too, creating their estimates
+        report = reprice_portfolio(session, workers=1, include_unestimated=True)
+        assert report["projects"] == 40
+        assert session.query(Estimate).filter(Estimate.project_id.in_(drafts)).count() == len(drafts)
+
+    def test_records_revisions(self, session):
+        reprice_portfolio(session, workers=1, chunk_size=7)
+        reprice_portfolio(session, workers=1, chunk_size=7)          # unchanged: no new revisions
+        p = session.query(Project).filter(Project.name == "P7").one()
+        assert [(i.revision, i.note) for i in list_revisions(session, p.id)] == [(1, "Portfolio reprice")]
+        doc = load_revision(session, p.id)
+        assert doc["results"]["final_price"] == p.estimate.final_price
+        assert [(m["id"], m["name"], m["cost"]) for m in doc["modules"]] == \
+            [(m.id, m.name, m.cost) for m in p.modules]
+        assert doc["inputs"]["complexity"] == p.complexity
+
+        session.query(ComplexityMultiplier).filter_by(name="Complex").one().multiplier = 1.6
+        session.commit()
+        invalidate_config()
+        reprice_portfolio(session, workers=1)
+        for c in session.query(Project).filter_by(complexity="Complex").filter(Project.estimate.has()):
+            assert len(list_revisions(session, c.id)) == 2
@@ -0,0 +1,77 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for the Project Repository
+==================================================================
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import (
+    Base, Project, ProjectModule, Employee, Estimate, Actual, MaintenanceRecord,
+)
+from app.repository import (
+    load_project_for_analysis, load_project_for_proposal, load_projects_for_export,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    s = sessionmaker(bind=engine)()
+    emps = [Employee(name=f"E{i}", role="Dev", base_salary=90000, hourly_cost=650.0) for i in range(5)]
+    for i in range(6):
+        p = Project(name=f"P{i}", client_name="Acme", stage_development_pct=60.0)
+        p.modules = [ProjectModule(name=f"M{j}", estimated_hours=10.0 + j, cost=1000.0 * j,
+                                   employee=emps[j % 5] if j % 3 else None)
+                     for j in range(4 + 5 * i)]
+        if i % 2 == 0:
+            p.estimate = Estimate(gross_cost=100_000.0, final_price=150_000.0)
+            p.maintenance_records = [MaintenanceRecord(year=y, annual_cost=9000.0) for y in (3, 1, 2)]
+        if i % 3 == 0:
+            p.actual = Actual(actual_cost=160_000.0)
+        s.add(p)
+    s.commit()
+    s.expunge_all()
+    s.queries = []
+    event.listen(engine, "before_cursor_execute", lambda *a: s.queries.append(a[2]))
+    yield s
+    s.close()
+
+
+class TestProjectRepository:
+    def test_analysis_view_is_fully_hydrated(self, session):
+        p = load_project_for_analysis(session, 5)
+        assert len(session.queries) == 3
+        assert p.name == "P4" and len(p.modules) == 24
+        assert p.estimate.final_price == 150_000.0 and p.actual is None
+        assert [m.year for m in p.maintenance] == [1, 2, 3]
+        assert p.modules[1].employee_name == "E1" and p.modules[0].employee_name is None
+        assert p.stage_distribution()["Development"] == 60_000.0
+        assert p.maintenance_forecast()[2] == {"year": 3, "annual_cost": 9000.0, "cumulative_cost": 27000.0}
+        assert len(session.queries) == 3          # no lazy loads from the view
+
+    def test_query_count_independent_of_modules(self, session):
+        for pid in (1, 6):
+            session.queries.clear()
+            session.expunge_all()
+            load_project_for_proposal(session, pid)
+            assert len(session.queries) <= 3
+
+    def test_views_are_read_only(self, session):
+        p = load_project_for_analysis(session, 1)
+        with pytest.raises(AttributeError):
+            p.name = "changed"
+        with pytest.raises(AttributeError):
+            p.estimate.final_price = 0
+
+    def test_missing_project(self, session):
+        assert load_project_for_analysis(session, 999) is None
+
+    def test_export_batch_in_order(self, session):
+        views = load_projects_for_export(session, [5, 999, 1, 3])
+        assert [v.id for v in views] == [5, 1, 3]
+        assert [v.actual is not None for v in views] == [False, True, False]
+        assert len(session.queries) == 3
+        assert load_projects_for_export(session, []) == []
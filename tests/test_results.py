@@ -0,0 +1,112 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Estimation Result Types
+===================================================================
+"""
+
+import pickle
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.batch import run_batch_estimation, modules_to_arrays
+from app.logic import run_full_estimation
+from app.results import BatchEstimationResult, EstimationResult, ModuleCosts, MaintenanceForecast
+from tests.mocks import mock_config_session
+
+BASE = dict(
+    complexity="X", app_type="Y", region_multiplier=1.5,
+    infra_items=[SimpleNamespace(cost=12000.0)], stack_items=[SimpleNamespace(cost=3500.0)],
+    maintenance_buffer_pct=15, risk_contingency_pct=10, profit_margin_pct=20,
+    function_points=40, estimated_duration_months=5,
+)
+
+
+def _modules(k=4):
+    return [SimpleNamespace(name=f"M{i}", estimated_hours=10.0 + 7.25 * i,
+                            hourly_rate_override=300.0 + 45 * i, employee=None, cost=0)
+            for i in range(k)]
+
+
+def _estimate(profit=20, session=None):
+    session = session or mock_config_session({"X": 1.3}, {"Y": 1.15})
+    return run_full_estimation(session, _modules(), **dict(BASE, profit_margin_pct=profit))
+
+
+class TestEstimationResult:
+    def test_dict_style_access(self):
+        r = _estimate()
+        assert isinstance(r, EstimationResult)
+        assert r["risk_buffer"]["safe_cost"] == r.risk_buffer.safe_cost
+        assert list(r["stage_distribution"]) == ["Planning", "Design", "Development", "Testing", "Deployment"]
+        assert r["analytics"].get("person_months") > 0
+        assert r.get("missing", "x") == "x"
+        with pytest.raises(KeyError):
+            r["missing"]
+        assert [m["name"] for m in r["labor"]["module_costs"]] == ["M0", "M1", "M2", "M3"]
+        assert [mf["year"] for mf in r["maintenance_forecast"]] == [1, 2, 3, 4, 5]
+
+    def test_equals_nested_dicts(self):
+        r = _estimate()
+        plain = r.to_dict()
+        assert type(plain["labor"]["module_costs"]) is list
+        assert r == plain and plain == r
+        assert r != _estimate(profit=25)
+
+    def test_no_instance_dict_and_pickles(self):
+        r = _estimate()
+        assert not hasattr(r, "__dict__") and not hasattr(r["labor"], "__dict__")
+        assert pickle.loads(pickle.dumps(r)) == r
+
+    def test_maintenance_rows_match_logic(self):
+        rows = [{"year": y, "annual_cost": 1234.57, "cumulative_cost": round(1234.57 * y, 2)}
+                for y in range(1, 6)]
+        forecast = MaintenanceForecast.from_rows(rows)
+        assert forecast == rows and forecast[-1] == rows[-1]
+        assert ModuleCosts.from_rows([{"name": "A", "hours": 1.0, "cost": 2.0}])[0]["cost"] == 2.0
+
+
+class TestBatchEstimationResult:
+    def test_scenario_round_trip(self):
+        scalars = [_estimate(profit=p) for p in (0, 10, 20, 35)]
+        batch = BatchEstimationResult.from_results(scalars)
+        assert len(batch) == 4
+        np.testing.assert_array_equal(
+            batch["final_pricing"]["final_price"], [s["final_pricing"]["final_price"] for s in scalars])
+        assert [batch[i] for i in range(4)] == scalars
+
+    def test_engine_returns_columns(self):
+        hours, rates = modules_to_arrays(_modules())
+        res = run_batch_estimation(hours, rates, complexity_multiplier=1.3, app_type_adjustment=1.15,
+                                   region_multiplier=1.5, infra_total=12000.0, stack_total=3500.0,
+                                   maintenance_buffer_pct=15, risk_contingency_pct=10,
+                                   profit_margin_pct=np.array([0, 10, 20, 35]),
+                                   function_points=40, estimated_duration_months=5)
+        assert isinstance(res, BatchEstimationResult)
+        assert res["maintenance_forecast"]["cumulative_cost"].shape == (4, 5)
+        scalar = res[2]
+        expected = _estimate(profit=20)
+        assert scalar["final_pricing"] == expected["final_pricing"]
+        assert scalar["maintenance_forecast"] == expected["maintenance_forecast"]
+        assert [m["cost"] for m in scalar["labor"]["module_costs"]] == \
+            [m["cost"] for m in expected["labor"]["module_costs"]]
+
+    def test_memory_footprint(self):
+        n = 2_000
+        session = mock_config_session({"X": 1.3}, {"Y": 1.15})
+        scalars = [_estimate(profit=p % 50, session=session) for p in range(n)]
+
+        def footprint(build):
+            tracemalloc.start()
+            obj = build()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return size, obj
+
+        dict_bytes, _ = footprint(lambda: [s.to_dict() for s in scalars])
+        slotted_bytes, _ = footprint(lambda: [pickle.loads(pickle.dumps(s)) for s in scalars])
+        columnar_bytes, batch = footprint(lambda: BatchEstimationResult.from_results(scalars))
+        assert slotted_bytes < dict_bytes * 0.7
+        assert columnar_bytes < dict_bytes * 0.1
+        assert batch.nbytes / n < 400
@@ -0,0 +1,144 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Estimate Revision History
+=====================================================================
+"""
+
+import copy
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Project, EstimateRevision
+from app.revisions import (
+    KEYFRAME_INTERVAL, estimate_document, save_revision, save_revisions,
+    load_revision, list_revisions, diff_revisions, latest_revision, _decode,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    s = sessionmaker(bind=engine)()
+    s.add_all([Project(name="Alpha"), Project(name="Beta")])
+    s.commit()
+    yield s
+    s.close()
+
+
+def _document(n_modules=20, hours=40.0, margin=20.0):
+    modules = [{"id": i + 1, "name": f"Module {i}", "employee_id": 1 + i % 3,
+                "hours": hours, "rate": 650.0, "cost": hours * 650.0}
+               for i in range(n_modules)]
+    inputs = {"complexity": "Complex", "app_type": "AI", "region_id": 2,
+              "complexity_multiplier": 1.3, "app_type_adjustment": 1.35, "region_multiplier": 1.5,
+              "maintenance_buffer_pct": 15.0, "risk_contingency_pct": 10.0,
+              "profit_margin_pct": margin, "function_points": 25, "estimated_duration_months": 3.5,
+              "stage_pcts": {"Planning": 10.0, "Design": 15.0, "Development": 60.0,
+                             "Testing": 10.0, "Deployment": 5.0},
+              "infra_total": 12000.0, "stack_total": 3500.0}
+    labor = sum(m["cost"] for m in modules)
+    results = {"total_labor_cost": labor, "final_price": round(labor * (1 + margin / 100), 2),
+               "maintenance_annual": labor * 0.15}
+    return estimate_document(inputs, modules, results)
+
+
+class TestSaveAndLoad:
+    def test_round_trip(self, session):
+        doc = _document()
+        assert save_revision(session, 1, doc, note="first") == 1
+        session.commit()
+        assert load_revision(session, 1) == doc
+        assert load_revision(session, 1, 1) == doc
+        assert load_revision(session, 1, 2) is None
+        assert load_revision(session, 2) is None
+        info = list_revisions(session, 1)
+        assert [(i.revision, i.note, i.is_keyframe) for i in info] == [(1, "first", True)]
+        assert info[0].final_price == doc["results"]["final_price"]
+
+    def test_later_revisions_are_small_deltas(self, session):
+        doc = _document()
+        save_revision(session, 1, doc)
+        doc = copy.deepcopy(doc)
+        doc["modules"][4]["hours"] = 55.0
+        doc["inputs"]["profit_margin_pct"] = 25.0
+        assert save_revision(session, 1, doc) == 2
+        keyframe, delta = session.query(EstimateRevision).order_by(EstimateRevision.revision).all()
+        assert not delta.is_keyframe and len(delta.payload) < len(keyframe.payload) / 5
+        assert _decode(delta.payload) == {"set": {"modules[4].hours": 55.0,
+                                                  "inputs.profit_margin_pct": 25.0}, "del": []}
+        assert load_revision(session, 1) == doc
+
+    def test_unchanged_document_is_not_saved(self, session):
+        doc = _document()
+        save_revision(session, 1, doc)
+        # numpy scalars compare equal to the JSON values stored
+        again = copy.deepcopy(doc)
+        again["results"]["final_price"] = np.float64(doc["results"]["final_price"])
+        again["inputs"]["function_points"] = np.int64(25)
+        assert save_revision(session, 1, again) is None
+        assert latest_revision(session, 1) == 1
+
+    def test_removed_modules(self, session):
+        save_revision(session, 1, _document(n_modules=5))
+        smaller = _document(n_modules=3)
+        save_revision(session, 1, smaller)
+        assert load_revision(session, 1) == smaller
+        assert load_revision(session, 1, 1) == _document(n_modules=5)
+
+    def test_bulk_save(self, session):
+        saved = save_revisions(session, {1: _document(), 2: _document(margin=30.0)}, note="bulk")
+        assert saved == {1: 1, 2: 1}
+        saved = save_revisions(session, {1: _document(), 2: _document(margin=35.0)})
+        assert saved == {2: 2}
+        assert load_revision(session, 2)["inputs"]["profit_margin_pct"] == 35.0
+        assert save_revisions(session, {}) == {}
+
+
+class TestLongHistory:
+    N = 300
+
+    @pytest.fixture
+    def history(self, session):
+        for r in range(1, self.N + 1):
+            save_revision(session, 1, _document(hours=float(r)))
+        session.commit()
+        return session
+
+    def test_keyframes(self, history):
+        info = list_revisions(history, 1)
+        assert len(info) == self.N
+        assert [i.revision for i in info if i.is_keyframe] == \
+            list(range(1, self.N + 1, KEYFRAME_INTERVAL))
+
+    def test_any_revision_reads_one_keyframe_chain(self, history):
+        queries = []
+        engine = history.get_bind()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def count(conn, cursor, statement, params, context, executemany):
+            if "estimate_revisions" in statement:
+                queries.append(statement)
+
+        start = time.perf_counter()
+        for r in (1, 16, 17, 150, self.N):
+            before = len(queries)
+            assert load_revision(history, 1, r) == _document(hours=float(r))
+            assert len(queries) - before == 1                  # a single range query
+        assert time.perf_counter() - start < 0.5
+        event.remove(engine, "after_cursor_execute", count)
+        chain = history.query(EstimateRevision).filter(
+            EstimateRevision.project_id == 1, EstimateRevision.revision.between(289, self.N)).count()
+        assert chain <= KEYFRAME_INTERVAL
+
+    def test_diff(self, history):
+        diff = diff_revisions(history, 1, 10, 250)
+        assert diff["added"] == {} and diff["removed"] == {}
+        assert diff["changed"]["modules[0].hours"] == (10.0, 250.0)
+        assert set(diff["changed"]) >= {"results.final_price", "modules[19].cost"}
+        assert diff_revisions(history, 1, 42, 42) == {"added": {}, "removed": {}, "changed": {}}
+        with pytest.raises(ValueError):
+            diff_revisions(history, 1, 1, self.N + 1)
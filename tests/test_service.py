@@ -0,0 +1,144 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for the Local Estimation Service
+========================================================================
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app import cli, database, service
+from app.config_registry import invalidate_config
+from app.models import Employee
+from app.service import EstimationBackend, start_service
+
+SCENARIO = {"id": "Q1", "complexity": "Complex", "app_type": "AI", "region": "Asia",
+            "modules": [{"name": "API", "hours": 80, "employee_id": 1},
+                        {"name": "UI", "hours": 40, "rate": 900}],
+            "infra_total": 12000}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = tmp_path / "svc.db"
+    monkeypatch.setattr(database, "DB_DIR", str(tmp_path))
+    monkeypatch.setattr(database, "DB_PATH", str(path))
+    monkeypatch.setattr(database, "DB_URL", f"sqlite:///{path}")
+    database.init_database()
+    with database.session_scope() as s:
+        s.add(Employee(name="Asha", role="Dev", base_salary=90000, hourly_cost=650.0))
+    invalidate_config()
+    yield path
+    invalidate_config()
+    database.dispose_engines()
+
+
+async def _request(reader, writer, method, path, payload=None, raw=None):
+    body = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else b"")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+def _run(scenario):
+    async def main():
+        backend = EstimationBackend(workers=4)
+        server, _ = await start_service("127.0.0.1", 0, backend)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await scenario(port)
+        finally:
+            server.close()
+            await server.wait_closed()
+            backend.close()
+    return asyncio.run(main())
+
+
+class TestEstimationService:
+    def test_endpoints(self, db):
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            out = {
+                "health": await _request(reader, writer, "GET", "/health"),
+                "presets": await _request(reader, writer, "GET", "/presets"),
+                "pricing": await _request(reader, writer, "GET", "/pricing-strategies"),
+                "single": await _request(reader, writer, "POST", "/estimate", SCENARIO),
+                "batch": await _request(reader, writer, "POST", "/estimate",
+                                        {"scenarios": [SCENARIO, dict(SCENARIO, region="Mars")]}),
+            }
+            writer.close()
+            return out
+        out = _run(scenario)
+        assert out["health"] == (200, {"status": "ok", "version": out["health"][1]["version"]})
+        assert out["presets"][0] == 200 and out["presets"][1]["presets"][0]["modules"]
+        assert {m["name"] for m in out["pricing"][1]["pricing_strategies"]} >= {"Competitive"}
+        status, result = out["single"]
+        assert status == 200 and result["id"] == "Q1"
+        assert result["labor"]["raw_labor_total"] == (80 * 650 + 40 * 900) * 1.5
+        status, batch = out["batch"]
+        assert batch["results"][0] == result and "Unknown region" in batch["results"][1]["error"]
+
+    def test_errors(self, db):
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            out = [
+                await _request(reader, writer, "GET", "/nope"),
+                await _request(reader, writer, "GET", "/estimate"),
+                await _request(reader, writer, "POST", "/estimate", raw=b"{oops"),
+                await _request(reader, writer, "POST", "/estimate", dict(SCENARIO, region="Mars")),
+                await _request(reader, writer, "GET", "/health"),      # connection still usable
+            ]
+            writer.close()
+            return [status for status, _ in out]
+        assert _run(scenario) == [404, 405, 400, 422, 200]
+
+    @pytest.mark.parametrize("length", [b"abc", b"-5"])
+    def test_malformed_content_length(self, db, length):
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /estimate HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            writer.close()
+            return status
+        assert _run(scenario) == 400
+
+    def test_worker_process_reloads_rates(self, db, monkeypatch):
+        service._init_worker(database.DB_URL)
+        try:
+            price = lambda: service._price_in_worker([SCENARIO])[0][1]["labor"]["raw_labor_total"]
+            assert price() == (80 * 650 + 40 * 900) * 1.5
+            with database.session_scope() as s:
+                s.get(Employee, 1).hourly_cost = 700.0
+            assert price() == (80 * 650 + 40 * 900) * 1.5          # within CONFIG_TTL
+            monkeypatch.setattr(service, "CONFIG_TTL", 0.0)
+            assert price() == (80 * 700 + 40 * 900) * 1.5
+        finally:
+            cli._worker[0].close()
+            cli._worker = None
+
+    def test_sustains_hundreds_of_requests_per_second(self, db):
+        n_clients, per_client = 10, 40
+
+        async def client(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for _ in range(per_client):
+                status, _ = await _request(reader, writer, "POST", "/estimate", SCENARIO)
+                assert status == 200
+            writer.close()
+
+        async def scenario(port):
+            await client(port)                  # warm the config snapshot and connections
+            start = time.perf_counter()
+            await asyncio.gather(*(client(port) for _ in range(n_clients)))
+            return n_clients * per_client / (time.perf_counter() - start)
+
+        assert _run(scenario) > 200
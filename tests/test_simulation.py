@@ -0,0 +1,84 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Monte Carlo Risk Simulation
+=======================================================================
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.logic import run_full_estimation
+from app.simulation import run_risk_simulation, sample_labor_totals
+from tests.mocks import mock_config_session
+
+
+def _modules(n=3, hours=100.0, rate=500.0):
+    return [SimpleNamespace(name=f"M{i}", estimated_hours=hours, hourly_rate_override=rate,
+                            employee=None) for i in range(n)]
+
+
+def _simulate(modules, ranges, **kw):
+    kw.setdefault("n_samples", 20_000)
+    return run_risk_simulation(
+        None, modules, ranges, "Medium", "Productivity", 1.0, [], [],
+        maintenance_buffer_pct=15, profit_margin_pct=20, **kw,
+    )
+
+
+class TestSampling:
+    @pytest.mark.parametrize("method", ["pert", "triangular"])
+    def test_mean_matches_distribution(self, method):
+        ranges = np.array([[10.0, 20.0, 60.0]])
+        draws = sample_labor_totals(ranges, np.array([1.0]), 200_000, method,
+                                    np.random.default_rng(1))
+        expected = (10 + 4 * 20 + 60) / 6 if method == "pert" else (10 + 20 + 60) / 3
+        assert draws.mean() == pytest.approx(expected, rel=0.01)
+        assert draws.min() >= 10.0 and draws.max() <= 60.0
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            sample_labor_totals(np.array([[1.0, 2.0, 3.0]]), np.array([1.0]), 10, "normal")
+
+
+class TestRiskSimulation:
+    def test_seed_is_reproducible(self):
+        mods = _modules()
+        ranges = [(80, 100, 160)] * 3
+        a = _simulate(mods, ranges, seed=11)
+        b = _simulate(mods, ranges, seed=11)
+        assert a["percentiles"] == b["percentiles"]
+        assert a["histogram"] == b["histogram"]
+
+    def test_fixed_hours_collapse_to_baseline(self):
+        sim = _simulate(_modules(), None, seed=1)
+        # 3 × 100h × ₹500 = 150000 → ×1.15 buffer → ×1.2 profit
+        assert sim["baseline_final_price"] == 207000.0
+        assert set(sim["percentiles"].values()) == {207000.0}
+        assert set(sim["implied_contingency_pct"].values()) == {0.0}
+
+    def test_right_skew_implies_positive_contingency(self):
+        sim = _simulate(_modules(), [(90, 100, 200)] * 3, seed=5)
+        p = sim["percentiles"]
+        assert sim["baseline_final_price"] < p["P50"] < p["P80"] < p["P90"]
+        assert 0 < sim["implied_contingency_pct"]["P80"] < 100
+        assert sum(sim["histogram"]["counts"]) == 20_000
+
+    def test_baseline_matches_full_estimation(self):
+        mods = [SimpleNamespace(name=f"M{i}", estimated_hours=h, hourly_rate_override=r,
+                                employee=None, cost=0.0)
+                for i, (h, r) in enumerate([(33.33, 777.77), (12.5, 1234.57), (0.75, 999.99)])]
+        infra = [SimpleNamespace(cost=c) for c in (0.1, 0.2, 1999.995)]
+        stack = [SimpleNamespace(cost=c) for c in (0.7, 0.1)]
+        args = (mods, "Complex", "AI", 1.17, infra, stack)
+        pcts = dict(maintenance_buffer_pct=15, risk_contingency_pct=10, profit_margin_pct=20)
+        session = mock_config_session({"Complex": 1.3}, {"AI": 1.35})
+        expected = run_full_estimation(session, *args, **pcts)["final_pricing"]["final_price"]
+        sim = run_risk_simulation(session, mods, [(m.estimated_hours * 0.8, m.estimated_hours,
+                                                   m.estimated_hours * 1.5) for m in mods],
+                                  *args[1:], n_samples=1_000, seed=3, **pcts)
+        assert sim["baseline_final_price"] == expected
+
+    def test_invalid_range(self):
+        with pytest.raises(ValueError):
+            _simulate(_modules(1), [(120, 100, 160)])
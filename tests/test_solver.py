@@ -0,0 +1,74 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for the Goal-Seek Solver
+================================================================
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.logic import run_full_estimation
+from app.solver import solve_for_target
+from tests.mocks import mock_config_session
+
+
+def _modules(n):
+    return [SimpleNamespace(name=f"M{i}", estimated_hours=10.0 + i % 7,
+                            hourly_rate_override=300.0 + 25 * (i % 11), employee=None, cost=0)
+            for i in range(n)]
+
+
+BASE = dict(
+    complexity="Complex", app_type="AI", region_multiplier=1.5,
+    infra_items=[SimpleNamespace(cost=12000.0)], stack_items=[SimpleNamespace(cost=3500.0)],
+    maintenance_buffer_pct=15, risk_contingency_pct=10, profit_margin_pct=20,
+)
+
+
+def _final(session, modules, **overrides):
+    return run_full_estimation(session, modules, **dict(BASE, **overrides))["final_pricing"]["final_price"]
+
+
+class TestSolveForTarget:
+    def setup_method(self):
+        self.session = mock_config_session({"Complex": 1.3}, {"AI": 1.35})
+
+    @pytest.mark.parametrize("solve_for, scale", [
+        ("profit_margin_pct", 100), ("risk_contingency_pct", 100), ("region_multiplier", 10_000),
+    ])
+    def test_largest_value_within_target(self, solve_for, scale):
+        mods = _modules(30)
+        target = 1.1 * _final(self.session, mods)
+        r = solve_for_target(self.session, mods, target_price=target, solve_for=solve_for, **BASE)
+        assert r["feasible"] and 0 <= r["gap"]
+        assert r["final_price"] == _final(self.session, mods, **{solve_for: r["value"]})
+        # one grid step further overshoots
+        assert _final(self.session, mods, **{solve_for: r["value"] + 1 / scale}) > target
+
+    def test_hours_scale(self):
+        mods = _modules(30)
+        r = solve_for_target(self.session, mods, target_price=100_000, solve_for="hours_scale", **BASE)
+        assert r["feasible"] and r["value"] < 1
+        scaled = r["estimation"]["labor"]["module_costs"]
+        assert scaled[0]["hours"] == pytest.approx(mods[0].estimated_hours * r["value"], abs=0.01)
+        assert mods[0].cost == 0  # caller's modules untouched
+
+    def test_target_below_fixed_costs_is_infeasible(self):
+        r = solve_for_target(self.session, _modules(5), target_price=100,
+                             solve_for="hours_scale", **BASE)
+        assert not r["feasible"] and r["value"] == 0.0
+
+    def test_profit_margin_identity(self):
+        mods = _modules(10)
+        target = _final(self.session, mods, profit_margin_pct=27.5)
+        r = solve_for_target(self.session, mods, target_price=target, **BASE)
+        assert r["value"] == 27.5 and r["gap"] == 0
+
+    def test_unknown_variable(self):
+        with pytest.raises(ValueError):
+            solve_for_target(self.session, _modules(1), target_price=1, solve_for="discount", **BASE)
+
+    def test_few_evaluations_on_large_quote(self):
+        r = solve_for_target(self.session, _modules(500), target_price=5e6,
+                             solve_for="region_multiplier", **BASE)
+        assert r["evaluations"] < 30
@@ -0,0 +1,87 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Streaming Estimation
+================================================================
+"""
+
+import csv
+import os
+import tracemalloc
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.logic import run_full_estimation
+from app.models import Base, Project, ProjectModule, Employee
+from app.streaming import (
+    ModuleRecord, iter_csv_modules, iter_db_modules, run_streaming_estimation, stream_labor_cost,
+)
+from tests.mocks import mock_config_session
+
+BASE = dict(
+    complexity="Complex", app_type="AI", region_multiplier=1.5,
+    infra_items=[SimpleNamespace(cost=12000.0)], stack_items=[SimpleNamespace(cost=3500.0)],
+    maintenance_buffer_pct=15, risk_contingency_pct=10, profit_margin_pct=20,
+    function_points=40, estimated_duration_months=5,
+)
+
+
+def _records(n):
+    for i in range(n):
+        yield ModuleRecord(f"WBS-{i}", 1.25 + i % 13, 250.0 + 17 * (i % 29))
+
+
+class TestStreamingEstimation:
+    def setup_method(self):
+        self.session = mock_config_session({"Complex": 1.3}, {"AI": 1.35})
+
+    def test_matches_full_pipeline(self):
+        records = list(_records(300))
+        modules = [SimpleNamespace(name=r.name, estimated_hours=r.hours, hourly_rate_override=r.rate,
+                                   employee=None, cost=0) for r in records]
+        expected = run_full_estimation(self.session, modules, **BASE)
+        got = run_streaming_estimation(self.session, iter(records), **BASE)
+        assert list(got["labor"]["module_costs"]) == expected["labor"]["module_costs"]
+        got["labor"]["module_costs"] = expected["labor"]["module_costs"]
+        assert got == expected
+
+    def test_csv_source(self, tmp_path):
+        path = tmp_path / "wbs.csv"
+        with open(path, "w", newline="") as fh:
+            w = csv.writer(fh)
+            w.writerow(["Task", "Effort", "Rate"])
+            w.writerow(["Build", "10.5", "400"])
+            w.writerow(["Review", "", "900"])
+        recs = list(iter_csv_modules(str(path), columns={"name": "Task", "hours": "Effort", "rate": "Rate"}))
+        assert recs == [ModuleRecord("Build", 10.5, 400.0), ModuleRecord("Review", 0.0, 900.0)]
+
+    def test_db_source(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        s = sessionmaker(bind=engine)()
+        emp = Employee(name="A", role="Dev", base_salary=1, hourly_cost=500.0)
+        p = Project(name="Big")
+        p.modules = [ProjectModule(name="x", estimated_hours=8, employee=emp),
+                     ProjectModule(name="y", estimated_hours=2, hourly_rate_override=1000.0)]
+        s.add(p)
+        s.commit()
+        assert list(iter_db_modules(s, p.id, batch_size=1)) == [
+            ModuleRecord("x", 8.0, 500.0), ModuleRecord("y", 2.0, 1000.0)]
+
+    def test_spill_file_removed(self):
+        labor = stream_labor_cost(self.session, _records(10), "Complex", "AI")
+        path = labor["module_costs"].path
+        assert os.path.exists(path) and len(labor["module_costs"]) == 10
+        del labor
+        assert not os.path.exists(path)
+
+    def test_memory_flat_in_wbs_size(self):
+        def peak(n):
+            tracemalloc.start()
+            labor = stream_labor_cost(self.session, _records(n), "Complex", "AI")
+            _, top = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            labor["module_costs"].close()
+            return top
+        small, large = peak(2_000), peak(50_000)
+        assert large < small * 1.5
@@ -0,0 +1,72 @@
+"""
+Apeiron CostEstimation Pro – Unit Tests for Estimation Tracing
+==============================================================
+"""
+
+import json
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config_registry import invalidate_config
+from app.logic import run_full_estimation, trace_estimation, calculate_final_price
+from app.models import Base, ComplexityMultiplier
+from app.tracing import span, _NULL_SPAN
+from tests.mocks import mock_config_session
+
+STEPS = ["step1_labor", "step2_infra_stack", "step3_gross", "step4_risk_buffer",
+         "step5_final_price", "step6_stages", "step7_maintenance", "step8_analytics"]
+
+
+def _run(session, n_modules=3):
+    modules = [SimpleNamespace(name=f"M{i}", estimated_hours=10.0, hourly_rate_override=500.0,
+                               employee=None, cost=0) for i in range(n_modules)]
+    return run_full_estimation(session, modules, "Medium", "AI", 1.0,
+                               [SimpleNamespace(cost=100.0)], [], 15, 10, 20)
+
+
+class TestTracing:
+    def test_records_every_step_and_helper(self):
+        with trace_estimation() as tracer:
+            _run(mock_config_session({"Medium": 1.0}))
+            _run(mock_config_session({"Medium": 1.0}))
+        report = tracer.report()
+        assert [name for name in report if name.startswith("step")] == STEPS
+        assert all(report[s]["calls"] == 2 for s in STEPS)
+        assert report["calculate_total_labor_cost"]["calls"] == 2
+        assert report["get_complexity_multiplier"]["calls"] == 2
+        assert report["module_cost_loop"]["calls"] == 2
+        assert report["step1_labor"]["seconds"] >= report["calculate_total_labor_cost"]["seconds"]
+
+    def test_counts_queries_per_step(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add(ComplexityMultiplier(name="Medium", multiplier=1.2))
+        session.commit()
+        invalidate_config()
+        with trace_estimation() as tracer:
+            _run(session)
+            _run(session)      # config is cached now
+        report = tracer.report()
+        assert report["get_complexity_multiplier"]["queries"] > 0
+        assert report["step1_labor"]["queries"] == tracer.queries
+        assert report["step8_analytics"]["queries"] == 0
+        session.close()
+
+    def test_callback_and_json(self):
+        seen = []
+        with trace_estimation(on_span=lambda name, secs, q: seen.append(name)) as tracer:
+            calculate_final_price(1000.0, 20)
+        assert seen == ["calculate_final_price"]
+        exported = json.loads(tracer.to_json())
+        assert exported["spans"]["calculate_final_price"]["calls"] == 1
+        assert exported["total_queries"] == 0
+
+    def test_disabled_outside_block(self):
+        with trace_estimation() as tracer:
+            pass
+        _run(mock_config_session())
+        assert tracer.spans == {}
+        assert span("anything") is _NULL_SPAN